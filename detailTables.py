@@ -0,0 +1,243 @@
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
+from r8cartypes import NO_CAR_TYPES
+
+
+class TrackTableModel(QAbstractTableModel):
+    """Table model for the tracks of a single industry
+
+    Cells are read directly from the industry_track objects. Edits are held
+    in a per-track buffer until apply_edits() is called so that Cancel in the
+    detail dialog still discards them.
+    """
+    HEADERS = ['Route Prefix', 'Track Section', 'Track Direction']
+    FIELDS = ['route_prefix', 'track_section', 'track_direction']
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._tracks = []
+        self._edits = {}  # track -> {column: text}
+
+    def set_tracks(self, tracks):
+        """Replace the displayed tracks and drop any pending edits"""
+        self.beginResetModel()
+        self._tracks = list(tracks)
+        self._edits = {}
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._tracks)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            track = self._tracks[index.row()]
+            edits = self._edits.get(track)
+            if edits and index.column() in edits:
+                return edits[index.column()]
+            return str(getattr(track, self.FIELDS[index.column()]))
+
+        return None
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if not index.isValid() or role != Qt.ItemDataRole.EditRole:
+            return False
+        track = self._tracks[index.row()]
+        self._edits.setdefault(track, {})[index.column()] = str(value).strip()
+        self.dataChanged.emit(index, index, [Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole])
+        return True
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        return super().flags(index) | Qt.ItemFlag.ItemIsEditable
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole:
+            if orientation == Qt.Orientation.Horizontal:
+                return self.HEADERS[section]
+            else:
+                return str(section + 1)
+        return None
+
+    def removeRows(self, row, count, parent=QModelIndex()):
+        if parent.isValid() or row < 0 or row + count > len(self._tracks):
+            return False
+        self.beginRemoveRows(parent, row, row + count - 1)
+        for track in self._tracks[row:row + count]:
+            self._edits.pop(track, None)
+        del self._tracks[row:row + count]
+        self.endRemoveRows()
+        return True
+
+    def apply_edits(self):
+        """Write pending edits into the track objects
+
+        Returns (remaining tracks, whether any track value changed).
+        Raises ValueError if an edited cell does not hold an integer.
+        """
+        # Convert everything first so a bad cell leaves the tracks untouched
+        converted = {}
+        for track, edits in self._edits.items():
+            converted[track] = {col: int(text) for col, text in edits.items()}
+
+        changed = False
+        for track, values in converted.items():
+            for col, value in values.items():
+                if getattr(track, self.FIELDS[col]) != value:
+                    setattr(track, self.FIELDS[col], value)
+                    changed = True
+        self._edits = {}
+        return list(self._tracks), changed
+
+
+class ProducerTableModel(QAbstractTableModel):
+    """Table model for the producers (incoming cars) of a single industry
+
+    Rows are sorted by car type name and read directly from the producer
+    objects. Edits are buffered per producer until apply_edits() is called.
+    """
+    HEADERS = ['ID', 'Car Type', 'Processed Tags', 'Capacity', 'Hours', 'Produces']
+    ID_COL = 0
+    CAR_TYPE_COL = 1
+    TAGS_COL = 2
+    CAPACITY_COL = 3
+    HOURS_COL = 4
+    PRODUCES_COL = 5
+
+    def __init__(self, cartypes=None, parent=None):
+        super().__init__(parent)
+        self.cartypes = cartypes or NO_CAR_TYPES
+        self._producers = []
+        self._row_by_producer = {}  # producer -> display row
+        self._edits = {}  # producer -> {column: text}
+
+    def car_type_name(self, prod):
+        return self.cartypes.name(prod.bIndex)
+
+    def set_producers(self, producers):
+        """Replace the displayed producers and drop any pending edits"""
+        self.beginResetModel()
+        # Sort producers alphabetically by car type name
+        self._producers = sorted(producers, key=lambda prod: self.cartypes.sort_key(prod.bIndex))
+        self._row_by_producer = {prod: row for row, prod in enumerate(self._producers)}
+        self._edits = {}
+        self.endResetModel()
+
+    def producer(self, row):
+        """Return the producer shown at a display row"""
+        return self._producers[row]
+
+    def row_for_producer(self, prod):
+        """Return the display row of a producer object, or -1"""
+        return self._row_by_producer.get(prod, -1)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._producers)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            prod = self._producers[index.row()]
+            col = index.column()
+            edits = self._edits.get(prod)
+            if edits and col in edits:
+                return edits[col]
+
+            if col == self.ID_COL:
+                return str(prod.bIndex)
+            elif col == self.CAR_TYPE_COL:
+                return self.car_type_name(prod)
+            elif col == self.TAGS_COL:
+                # Tags are displayed comma-separated, can be entered with spaces or commas
+                return prod.returnTags() if prod.num_tags > 0 else ""
+            elif col == self.CAPACITY_COL:
+                return str(prod.capacity)
+            elif col == self.HOURS_COL:
+                return str(prod.proc_hours)
+            elif col == self.PRODUCES_COL:
+                return "Empties" if prod.produce_empties else "Loads"
+
+        return None
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if not index.isValid() or role != Qt.ItemDataRole.EditRole:
+            return False
+        if index.column() in (self.ID_COL, self.CAR_TYPE_COL):
+            return False
+        prod = self._producers[index.row()]
+        self._edits.setdefault(prod, {})[index.column()] = str(value)
+        self.dataChanged.emit(index, index, [Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole])
+        return True
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        flags = super().flags(index)
+        # Car type ID and name are read-only
+        if index.column() not in (self.ID_COL, self.CAR_TYPE_COL):
+            flags |= Qt.ItemFlag.ItemIsEditable
+        return flags
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole:
+            if orientation == Qt.Orientation.Horizontal:
+                return self.HEADERS[section]
+            else:
+                return str(section + 1)
+        return None
+
+    def refresh_row(self, row):
+        """Drop the pending tags edit of a row and repaint it from the producer object"""
+        if not 0 <= row < len(self._producers):
+            return
+        edits = self._edits.get(self._producers[row])
+        if edits:
+            edits.pop(self.TAGS_COL, None)
+        self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.HEADERS) - 1))
+
+    def apply_edits(self):
+        """Write pending edits into the producer objects
+
+        Returns a list of (producer, tag_list) for the producers that changed,
+        tag_list being None when their tags stayed the same.
+        Raises ValueError if an edited capacity or hours cell does not hold an integer.
+        """
+        # Convert everything first so a bad cell leaves the producers untouched
+        pending = []
+        for prod, edits in self._edits.items():
+            values = {}
+            if self.CAPACITY_COL in edits:
+                values['capacity'] = int(edits[self.CAPACITY_COL])
+            if self.HOURS_COL in edits:
+                values['proc_hours'] = int(edits[self.HOURS_COL])
+            if self.PRODUCES_COL in edits:
+                produce_empties_text = edits[self.PRODUCES_COL].strip().lower()
+                values['produce_empties'] = produce_empties_text in ['empties', 'empty', 'yes', 'y', '1', 'true']
+            tag_list = None
+            if self.TAGS_COL in edits:
+                # Replace commas with spaces, then split by whitespace
+                tags_text = edits[self.TAGS_COL].strip().replace(',', ' ')
+                tag_list = [tag for tag in tags_text.split() if tag]
+            pending.append((prod, values, tag_list))
+
+        changed = []
+        for prod, values, tag_list in pending:
+            values = {attr: value for attr, value in values.items() if getattr(prod, attr) != value}
+            for attr, value in values.items():
+                setattr(prod, attr, value)
+            if tag_list == [tag.name for tag in prod.tags]:
+                tag_list = None
+            if values or tag_list is not None:
+                changed.append((prod, tag_list))
+        self._edits = {}
+        return changed
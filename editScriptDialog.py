@@ -0,0 +1,41 @@
+from PySide6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPlainTextEdit, QPushButton
+from PySide6.QtGui import QFontDatabase
+
+
+class EditScriptDialog(QDialog):
+    """Preview of an edit script: per-rule summary and dry-run diff, applied on request"""
+
+    def __init__(self, plan, script_name, cartypes=None, parent=None):
+        super().__init__(parent)
+        self.plan = plan
+        self.setWindowTitle(f"Edit Script - {script_name}")
+        self.resize(800, 500)
+
+        layout = QVBoxLayout(self)
+
+        # Per-rule match counts
+        summary_label = QLabel("\n".join(plan.summary()))
+        layout.addWidget(summary_label)
+
+        # Dry-run diff, one planned change per line
+        self.diff_view = QPlainTextEdit()
+        self.diff_view.setReadOnly(True)
+        self.diff_view.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
+        self.diff_view.setFont(QFontDatabase.systemFont(QFontDatabase.SystemFont.FixedFont))
+        self.diff_view.setPlainText("\n".join(plan.diff(cartypes)) or "No changes")
+        layout.addWidget(self.diff_view)
+
+        # Buttons
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+
+        self.apply_button = QPushButton("Apply")
+        self.apply_button.clicked.connect(self.accept)
+        self.apply_button.setEnabled(len(plan.changes) > 0)
+        button_layout.addWidget(self.apply_button)
+
+        cancel_button = QPushButton("Cancel")
+        cancel_button.clicked.connect(self.reject)
+        button_layout.addWidget(cancel_button)
+
+        layout.addLayout(button_layout)
@@ -1,7 +1,38 @@
 from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel,
                                QLineEdit, QPushButton, QComboBox, QGroupBox,
-                               QFormLayout, QMessageBox)
-from PySide6.QtCore import Qt
+                               QFormLayout, QMessageBox, QCheckBox)
+from r8typos import get_typo_checker
+from similarTagsDialog import SimilarTagsDialog
+from resultsPanel import SearchHit
+from r8profile import PROFILER
+from r8search import (SearchPattern, search_values, MODES, MODE_EXACT, MODE_SUBSTRING, MODE_WILDCARD,
+                      FIELD_NAME, FIELD_SYMBOL, FIELD_LOCAL, FIELD_TAG)
+
+TAG_SEARCH = "Processed tags in all industries"
+
+# Main table fields: combo text -> (search field, table column, Industry attribute)
+COLUMN_FIELDS = {
+    "Tag": (FIELD_SYMBOL, 1, 'trk_sym'),
+    "Local Name": (FIELD_LOCAL, 2, 'local_name'),
+    "Industry Name": (FIELD_NAME, 0, 'name'),
+}
+
+MODE_NOTES = {
+    MODE_EXACT: "Note: Only exact matches (entire field) will be found",
+    MODE_SUBSTRING: "Note: Text is matched anywhere in the field; only the matched text is replaced",
+    MODE_WILDCARD: "Note: * and ? wildcards must match the entire field",
+}
+REGEX_NOTE = "Note: Regex matches anywhere in the field; use \\1 or \\g<name> in the replacement"
+
+
+def replace_field(industry, attr, new_value):
+    """Write a new value to a searchable Industry field"""
+    if attr == 'trk_sym':
+        industry.replaceSymbol(new_value)
+    elif attr == 'local_name':
+        industry.replaceLocalName(new_value)
+    elif attr == 'name':
+        industry.replaceName(new_value)
 
 
 class FindReplaceDialog(QDialog):
@@ -25,12 +56,23 @@ class FindReplaceDialog(QDialog):
 
         # Field selector
         self.field_combo = QComboBox()
-        self.field_combo.addItems(["Tag", "Local Name", "Processed tags in all industries"])
+        self.field_combo.addItems(["Tag", "Local Name", "Industry Name", TAG_SEARCH])
         criteria_layout.addRow("Search in:", self.field_combo)
 
+        # Match mode
+        mode_layout = QHBoxLayout()
+        self.mode_combo = QComboBox()
+        self.mode_combo.addItems(MODES)
+        mode_layout.addWidget(self.mode_combo)
+        self.case_check = QCheckBox("Match case")
+        self.case_check.setChecked(True)
+        mode_layout.addWidget(self.case_check)
+        mode_layout.addStretch()
+        criteria_layout.addRow("Match:", mode_layout)
+
         # Find what
         self.find_edit = QLineEdit()
-        self.find_edit.setPlaceholderText("Enter exact text to find")
+        self.find_edit.setPlaceholderText("Enter text to find")
         criteria_layout.addRow("Find what:", self.find_edit)
 
         # Replace with
@@ -46,6 +88,18 @@ class FindReplaceDialog(QDialog):
         self.note_label.setStyleSheet("color: gray; font-style: italic;")
         main_layout.addWidget(self.note_label)
 
+        # Possible misspelling of the find or replace tag, with a one-click fix
+        typo_layout = QHBoxLayout()
+        self.typo_label = QLabel("")
+        self.typo_label.setStyleSheet("color: darkorange;")
+        self.typo_label.setWordWrap(True)
+        typo_layout.addWidget(self.typo_label, 1)
+        self.typo_button = QPushButton("Use Suggestion")
+        self.typo_button.clicked.connect(self.use_typo_suggestion)
+        typo_layout.addWidget(self.typo_button)
+        main_layout.addLayout(typo_layout)
+        self.typo_suggestion = None
+
         # Buttons
         button_layout = QHBoxLayout()
 
@@ -62,6 +116,14 @@ class FindReplaceDialog(QDialog):
         self.replace_all_button.clicked.connect(self.replace_all)
         button_layout.addWidget(self.replace_all_button)
 
+        self.find_all_button = QPushButton("Find All")
+        self.find_all_button.clicked.connect(self.find_all)
+        button_layout.addWidget(self.find_all_button)
+
+        self.similar_button = QPushButton("Similar Tags...")
+        self.similar_button.clicked.connect(self.show_similar_tags)
+        button_layout.addWidget(self.similar_button)
+
         button_layout.addStretch()
 
         close_button = QPushButton("Close")
@@ -73,10 +135,18 @@ class FindReplaceDialog(QDialog):
         # Connect field/text changes to reset search
         self.field_combo.currentIndexChanged.connect(self.reset_search)
         self.field_combo.currentIndexChanged.connect(self.update_button_states)
+        self.mode_combo.currentIndexChanged.connect(self.reset_search)
+        self.mode_combo.currentIndexChanged.connect(self.update_button_states)
+        self.case_check.toggled.connect(self.reset_search)
         self.find_edit.textChanged.connect(self.reset_search)
+        self.field_combo.currentIndexChanged.connect(self.update_typo_warning)
+        self.mode_combo.currentIndexChanged.connect(self.update_typo_warning)
+        self.find_edit.textChanged.connect(self.update_typo_warning)
+        self.replace_edit.textChanged.connect(self.update_typo_warning)
 
         # Set initial button states
         self.update_button_states()
+        self.update_typo_warning()
 
     def reset_search(self):
         """Reset search state when criteria changes"""
@@ -87,7 +157,7 @@ class FindReplaceDialog(QDialog):
     def update_button_states(self):
         """Update button enabled states based on selected field"""
         field_name = self.field_combo.currentText()
-        is_tag_search = field_name == "Processed tags in all industries"
+        is_tag_search = field_name == TAG_SEARCH
 
         # For tag search, only allow Replace All
         self.find_button.setEnabled(not is_tag_search)
@@ -98,66 +168,179 @@ class FindReplaceDialog(QDialog):
         if is_tag_search:
             self.note_label.setText("Note: Only 'replace all' allowed in this mode.")
         else:
-            self.note_label.setText("Note: Only exact matches (entire field) will be found")
+            self.note_label.setText(MODE_NOTES.get(self.mode_combo.currentText(), REGEX_NOTE))
+
+    def update_typo_warning(self):
+        """Warn when the find or replace tag looks like a misspelling of a more common tag"""
+        self.typo_suggestion = None
+        message = ""
+        if self.field_combo.currentText() == TAG_SEARCH:
+            import sys
+            indFile1 = sys.modules['__main__'].indFile1
+            checker = get_typo_checker(indFile1)
+            find_text = self.find_edit.text().strip()
+            replace_text = self.replace_edit.text().strip()
+            if find_text and self.mode_combo.currentText() == MODE_EXACT:
+                suggestions = checker.suggestions(find_text)
+                if suggestions:
+                    best, best_count, distance = suggestions[0]
+                    uses = checker.counts.get(find_text, 0)
+                    message = f"'{find_text}' is used {uses} times; did you mean '{best}' ({best_count} uses)?"
+                    self.typo_suggestion = best
+            if not message and replace_text and ' ' not in replace_text:
+                suggestions = checker.suggestions(replace_text)
+                if suggestions:
+                    best, best_count, distance = suggestions[0]
+                    message = f"Warning: '{replace_text}' looks like a misspelling of '{best}' ({best_count} uses)"
+                    self.typo_suggestion = best
+        self.typo_label.setText(message)
+        self.typo_label.setVisible(bool(message))
+        self.typo_button.setVisible(self.typo_suggestion is not None)
+
+    def use_typo_suggestion(self):
+        # Fixing a misspelled tag means replacing it with the suggestion
+        if self.typo_suggestion is not None:
+            self.replace_edit.setText(self.typo_suggestion)
+
+    def show_similar_tags(self):
+        """Show the report of likely misspelled tags in the loaded file"""
+        import sys
+        indFile1 = sys.modules['__main__'].indFile1
+        dialog = SimilarTagsDialog(get_typo_checker(indFile1), self)
+        dialog.tag_chosen.connect(self.fill_tag_fix)
+        dialog.show()
+
+    def fill_tag_fix(self, tag, suggestion):
+        """Set up an exact Replace All of a misspelled tag with its suggestion"""
+        self.field_combo.setCurrentText(TAG_SEARCH)
+        self.mode_combo.setCurrentText(MODE_EXACT)
+        self.case_check.setChecked(True)
+        self.find_edit.setText(tag)
+        self.replace_edit.setText(suggestion)
+        self.raise_()
+        self.activateWindow()
 
     def get_column_index(self):
         """Get the column index for the selected field"""
-        field_name = self.field_combo.currentText()
-        if field_name == "Tag":
-            return 1  # Column 1 is Tag
-        elif field_name == "Local Name":
-            return 2  # Column 2 is Local Name
-        return -1
-
-    def find_matches(self):
-        """Find all exact matches in the selected column or tags"""
+        field = COLUMN_FIELDS.get(self.field_combo.currentText())
+        return field[1] if field else -1
+
+    def build_pattern(self, replacing=False):
+        """Compile the search text in the selected mode (raises ValueError on a bad pattern)
+
+        With replacing, the replacement text is checked as well, before anything is changed.
+        """
+        pattern = SearchPattern(self.find_edit.text(), self.mode_combo.currentText(), self.case_check.isChecked())
+        if replacing:
+            pattern.check_replacement(self.replace_edit.text())
+        return pattern
+
+    def find_matches(self, pattern=None):
+        """Find all matches in the selected column or tags"""
         search_text = self.find_edit.text()
         if not search_text:
             return []
+        if pattern is None:
+            pattern = self.build_pattern()
 
         field_name = self.field_combo.currentText()
 
         # Handle processed tags search
-        if field_name == "Processed tags in all industries":
-            return self.find_tag_matches(search_text)
+        if field_name == TAG_SEARCH:
+            return self.find_tag_matches(pattern)
 
         # Handle regular column search
-        col_index = self.get_column_index()
-        if col_index < 0:
+        field = COLUMN_FIELDS.get(field_name)
+        if field is None:
             return []
 
+        import sys
+        indFile1 = sys.modules['__main__'].indFile1
+
+        # Match against the distinct values of the field, then expand through the file's hash index
         matches = []
+        for value in search_values(indFile1, field[0], pattern):
+            matches.extend(indFile1.position(industry) for industry in indFile1.find(field[0], value))
+
+        # Step through matches in table display order
         model = self.main_window.table_model
+        matches.sort(key=model.get_display_row)
+        return matches
 
-        for display_row in range(model.rowCount()):
-            cell_value = model.data(model.index(display_row, col_index), Qt.ItemDataRole.DisplayRole)
-            if cell_value == search_text:  # Exact match only
-                # Store the original index, not the display row
-                original_index = model.get_original_index(display_row)
-                matches.append(original_index)
+    def find_tag_matches(self, pattern):
+        """Find all tag matches across all industries"""
+        import sys
+        indFile1 = sys.modules['__main__'].indFile1
 
+        # Match against the distinct tag names, then expand through the file's tag index
+        tag_index = indFile1.tag_index
+        matches = []
+        for tag_name in search_values(indFile1, FIELD_TAG, pattern):
+            for industry, producer_idx, producer, tag_idx in tag_index.locate(tag_name):
+                matches.append({
+                    'industry_idx': tag_index.position(industry),
+                    'producer_idx': producer_idx,
+                    'tag_idx': tag_idx,
+                    'tag_name': tag_name,
+                    'industry_name': industry.name
+                })
+
+        matches.sort(key=lambda m: (m['industry_idx'], m['producer_idx'], m['tag_idx']))
         return matches
 
-    def find_tag_matches(self, search_text):
-        """Find all exact tag matches across all industries"""
+    def iter_hits(self, pattern):
+        """Yield a SearchHit for every match, in file order, without building a match list first"""
         import sys
         indFile1 = sys.modules['__main__'].indFile1
 
-        matches = []
-        for industry_idx, industry in enumerate(indFile1.industries):
-            for producer_idx, producer in enumerate(industry.producer):
-                # Only check tags if the producer has any
-                if hasattr(producer, 'tags') and producer.num_tags > 0:
-                    for tag_idx, tag in enumerate(producer.tags):
-                        if tag.name == search_text:  # Exact match only
-                            matches.append({
-                                'industry_idx': industry_idx,
-                                'producer_idx': producer_idx,
-                                'tag_idx': tag_idx,
-                                'industry_name': industry.name
-                            })
+        field_name = self.field_combo.currentText()
+        if field_name == TAG_SEARCH:
+            tag_names = search_values(indFile1, FIELD_TAG, pattern)
+            if len(tag_names) == 1:
+                # A single tag name: the index lookup is already in file order
+                for industry, producer, tag_idx in indFile1.tag_index.lookup(tag_names[0]):
+                    yield SearchHit(industry, producer, producer.tags[tag_idx])
+                return
+            tag_names = set(tag_names)
+            for industry in indFile1.industries:
+                for producer in industry.producer:
+                    for tag in producer.tags:
+                        if tag.name in tag_names:
+                            yield SearchHit(industry, producer, tag)
+            return
 
-        return matches
+        field = COLUMN_FIELDS.get(field_name)
+        if field is None:
+            return
+        for value in search_values(indFile1, field[0], pattern):
+            for industry in indFile1.find(field[0], value):
+                yield SearchHit(industry, attr=field[2])
+
+    def find_all(self):
+        """List every match in the main window's search results panel"""
+        search_text = self.find_edit.text()
+        if not search_text:
+            QMessageBox.warning(self, "Find All", "Please enter text to find.")
+            return
+        try:
+            pattern = self.build_pattern()
+        except ValueError as e:
+            QMessageBox.warning(self, "Find All", str(e))
+            return
+        description = f"{self.field_combo.currentText()} matching '{search_text}' ({pattern.mode})"
+        with PROFILER.action('find all'):
+            self.main_window.show_search_results(self.iter_hits(pattern), pattern, description,
+                                                 self.replace_edit.text())
+
+    def _match_tag(self, producer, match):
+        """Return the tag object for a match, even if earlier deletions shifted its position"""
+        tag_idx = match['tag_idx']
+        if tag_idx < producer.num_tags and producer.tags[tag_idx].name == match['tag_name']:
+            return producer.tags[tag_idx]
+        for tag in producer.tags:
+            if tag.name == match['tag_name']:
+                return tag
+        return None
 
     def find_next(self):
         """Find the next occurrence"""
@@ -168,11 +351,16 @@ class FindReplaceDialog(QDialog):
 
         # Get all matches if not already found
         if not self.matches:
-            self.matches = self.find_matches()
+            try:
+                with PROFILER.action('find'):
+                    self.matches = self.find_matches()
+            except ValueError as e:
+                QMessageBox.warning(self, "Find", str(e))
+                return
             self.current_match_index = -1
 
         if not self.matches:
-            QMessageBox.information(self, "Find", f"No exact matches found for '{search_text}'")
+            QMessageBox.information(self, "Find", f"No matches found for '{search_text}'")
             return
 
         # Move to next match (circular)
@@ -182,22 +370,21 @@ class FindReplaceDialog(QDialog):
         field_name = self.field_combo.currentText()
 
         # Handle tag matches - open industry detail dialog
-        if field_name == "Processed tags in all industries":
+        if field_name == TAG_SEARCH:
             import sys
             indFile1 = sys.modules['__main__'].indFile1
-            cardict = sys.modules['__main__'].cardict
 
             industry = indFile1.industries[match['industry_idx']]
 
-            # Import and open the industry detail dialog
+            # Rebind and open the shared industry detail dialog
             from industryDetailDialog import IndustryDetailDialog
-            dialog = IndustryDetailDialog(industry, cardict, self.main_window)
+            dialog = self.main_window.get_detail_dialog(industry, match['industry_idx'])
+            self.main_window.open_detail_dialog = dialog
             result = dialog.exec()
+            self.main_window.open_detail_dialog = None
 
-            # If user saved changes, refresh the table
+            # If user saved changes, the main table was refreshed through the file's change listener
             if result == IndustryDetailDialog.DialogCode.Accepted:
-                industry_data = [ind.to_dict() for ind in indFile1.industries]
-                self.main_window.table_model.update_data(industry_data)
                 self.main_window.statusBar().showMessage(f'Updated: {industry.name}', 3000)
 
             # Enable replace button
@@ -211,7 +398,7 @@ class FindReplaceDialog(QDialog):
             # Handle regular column matches - select row in table
             original_index = match
             # Convert original index to display row
-            display_row = self.main_window.table_model._original_indices.index(original_index)
+            display_row = self.main_window.table_model.get_display_row(original_index)
 
             table_view = self.main_window.ui.tableView
             model_index = self.main_window.table_model.index(display_row, self.get_column_index())
@@ -235,27 +422,34 @@ class FindReplaceDialog(QDialog):
         replace_text = self.replace_edit.text()
         match = self.matches[self.current_match_index]
         field_name = self.field_combo.currentText()
+        try:
+            pattern = self.build_pattern(replacing=True)
+        except ValueError as e:
+            QMessageBox.warning(self, "Replace", str(e))
+            return
 
         # Access indFile1 from globals (it's in the same running process)
         import sys
         indFile1 = sys.modules['__main__'].indFile1
 
         # Handle tag replacement
-        if field_name == "Processed tags in all industries":
-            industry = indFile1.industries[match['industry_idx']]
+        if field_name == TAG_SEARCH:
+            industry = indFile1.industries[match['industry_idx']]  # Each edit below notifies the table once
             producer = industry.producer[match['producer_idx']]
+            tag = self._match_tag(producer, match)
 
-            if replace_text.strip():
+            new_name = pattern.replace(tag.name, replace_text) if tag is not None else ''
+            if tag is None:
+                pass  # Tag was already removed
+            elif new_name.strip():
                 # Replace with new value
-                tag = producer.tags[match['tag_idx']]
-                tag.replaceName(replace_text)
+                tag.replaceName(new_name)
                 self.main_window.statusBar().showMessage(
                     f"Replaced tag in '{match['industry_name']}'", 3000
                 )
             else:
-                # Delete the tag if replacing with empty string
-                tag_to_delete = producer.tags[match['tag_idx']]
-                producer.deleteTag(tag_to_delete.name)
+                # Delete the tag if the replacement leaves it empty
+                producer.removeTag(tag)
                 self.main_window.statusBar().showMessage(
                     f"Deleted tag in '{match['industry_name']}'", 3000
                 )
@@ -264,31 +458,17 @@ class FindReplaceDialog(QDialog):
             original_index = match
             industry = indFile1.industries[original_index]
 
-            if field_name == "Tag":
-                industry.replaceSymbol(replace_text)
-            elif field_name == "Local Name":
-                industry.replaceLocalName(replace_text)
+            attr = COLUMN_FIELDS[field_name][2]
+            replace_field(industry, attr, pattern.replace(getattr(industry, attr), replace_text))
 
             self.main_window.statusBar().showMessage("Replaced 1 occurrence", 3000)
 
-        # Refresh the main table to show the replacement
-        industry_data = [ind.to_dict() for ind in indFile1.industries]
-        self.main_window.table_model.update_data(industry_data)
+        # The main table row was refreshed and marked dirty through the file's change listener
 
         # Refresh the Industry Detail Dialog if it's open
         if self.main_window.open_detail_dialog is not None:
             self.main_window.open_detail_dialog.refresh()
 
-        # Mark the row as dirty (unsaved changes)
-        if field_name == "Processed tags in all industries":
-            # Convert original index to display row
-            display_row = self.main_window.table_model._original_indices.index(match['industry_idx'])
-            self.main_window.table_model.mark_row_dirty(display_row)
-        else:
-            # Convert original index to display row
-            display_row = self.main_window.table_model._original_indices.index(original_index)
-            self.main_window.table_model.mark_row_dirty(display_row)
-
         # Remove this match from the list
         self.matches.pop(self.current_match_index)
         if self.current_match_index >= len(self.matches):
@@ -310,20 +490,29 @@ class FindReplaceDialog(QDialog):
             QMessageBox.warning(self, "Replace All", "Please enter text to find.")
             return
 
+        try:
+            pattern = self.build_pattern(replacing=True)
+        except ValueError as e:
+            QMessageBox.warning(self, "Replace All", str(e))
+            return
+
         # Find all matches
-        matches = self.find_matches()
+        with PROFILER.action('find'):
+            matches = self.find_matches(pattern)
 
         if not matches:
-            QMessageBox.information(self, "Replace All", f"No exact matches found for '{search_text}'")
+            QMessageBox.information(self, "Replace All", f"No matches found for '{search_text}'")
             return
 
         field_name = self.field_combo.currentText()
+        # Whole-field modes leave nothing behind when the replacement is empty
+        deleting = not replace_text.strip() and pattern.mode in (MODE_EXACT, MODE_WILDCARD)
 
         # Confirm replace all
-        if field_name == "Processed tags in all industries":
+        if field_name == TAG_SEARCH:
             # Count unique industries for better message
             unique_industries = len(set(m['industry_idx'] for m in matches))
-            if replace_text.strip():
+            if not deleting:
                 message = f"Replace all {len(matches)} tag occurrences of '{search_text}' with '{replace_text}' across {unique_industries} industries?"
             else:
                 message = f"Delete all {len(matches)} tag occurrences of '{search_text}' across {unique_industries} industries?"
@@ -335,7 +524,7 @@ class FindReplaceDialog(QDialog):
                 QMessageBox.StandardButton.No
             )
         else:
-            if replace_text.strip():
+            if not deleting:
                 message = f"Replace all {len(matches)} occurrences of '{search_text}' with '{replace_text}'?"
             else:
                 message = f"Delete all {len(matches)} occurrences of '{search_text}'?"
@@ -354,67 +543,55 @@ class FindReplaceDialog(QDialog):
         import sys
         indFile1 = sys.modules['__main__'].indFile1
 
-        if field_name == "Processed tags in all industries":
-            # Replace or delete all tag occurrences
-            affected_industries = set()
-            if replace_text.strip():
-                # Replace with new value
-                for match in matches:
-                    industry = indFile1.industries[match['industry_idx']]
-                    producer = industry.producer[match['producer_idx']]
-                    tag = producer.tags[match['tag_idx']]
-                    tag.replaceName(replace_text)
-                    affected_industries.add(match['industry_idx'])
-            else:
-                # Delete tags (use original search text)
-                for match in matches:
-                    industry = indFile1.industries[match['industry_idx']]
-                    producer = industry.producer[match['producer_idx']]
-                    producer.deleteTag(search_text)
-                    affected_industries.add(match['industry_idx'])
+        if field_name == TAG_SEARCH:
+            # Work out each distinct tag's new name once, then apply it to every occurrence
+            new_names = {}
+            for match in matches:
+                tag_name = match['tag_name']
+                if tag_name not in new_names:
+                    new_names[tag_name] = pattern.replace(tag_name, replace_text)
+
+            # Blank replacements delete the tag
+            mapping = {tag_name: (new_name if new_name.strip() else '') for tag_name, new_name in new_names.items()}
+
+            # Every occurrence of a matched name is a match, so each producer is rewritten in one pass
+            producers = dict()
+            for match in matches:
+                producers.setdefault(indFile1.industries[match['industry_idx']].producer[match['producer_idx']], None)
 
-            action = "Deleted" if not replace_text.strip() else "Replaced"
+            # Replace or delete all tag occurrences as one batch: the main table gets
+            # a single coalesced refresh and dirty-row update when the batch ends
+            with indFile1.batch():
+                for producer in producers:
+                    producer.replace_tags(mapping)
 
-            # Refresh the table FIRST
-            industry_data = [ind.to_dict() for ind in indFile1.industries]
-            self.main_window.table_model.update_data(industry_data)
+            action = "Deleted" if not any(mapping.values()) else "Replaced"
 
             # Refresh the Industry Detail Dialog if it's open
             if self.main_window.open_detail_dialog is not None:
                 self.main_window.open_detail_dialog.refresh()
 
-            # Mark all affected industries as dirty (after refresh)
-            for industry_idx in affected_industries:
-                display_row = self.main_window.table_model._original_indices.index(industry_idx)
-                self.main_window.table_model.mark_row_dirty(display_row)
-
             QMessageBox.information(self, "Replace All",
                 f"{action} {len(matches)} tag occurrences across {unique_industries} industries.")
             self.main_window.statusBar().showMessage(
                 f"{action} {len(matches)} tag occurrences", 5000
             )
         else:
-            # Replace all column occurrences
-            for original_index in matches:
-                industry = indFile1.industries[original_index]
-                if field_name == "Tag":
-                    industry.replaceSymbol(replace_text)
-                elif field_name == "Local Name":
-                    industry.replaceLocalName(replace_text)
-
-            # Refresh the table FIRST
-            industry_data = [ind.to_dict() for ind in indFile1.industries]
-            self.main_window.table_model.update_data(industry_data)
+            # Replace all column occurrences, computing each distinct value's replacement once
+            attr = COLUMN_FIELDS[field_name][2]
+            new_values = {}
+            with indFile1.batch():
+                for original_index in matches:
+                    industry = indFile1.industries[original_index]
+                    old_value = getattr(industry, attr)
+                    if old_value not in new_values:
+                        new_values[old_value] = pattern.replace(old_value, replace_text)
+                    replace_field(industry, attr, new_values[old_value])
 
             # Refresh the Industry Detail Dialog if it's open
             if self.main_window.open_detail_dialog is not None:
                 self.main_window.open_detail_dialog.refresh()
 
-            # Mark all affected rows as dirty (after refresh)
-            for original_index in matches:
-                display_row = self.main_window.table_model._original_indices.index(original_index)
-                self.main_window.table_model.mark_row_dirty(display_row)
-
             QMessageBox.information(self, "Replace All", f"Replaced {len(matches)} occurrences.")
             self.main_window.statusBar().showMessage(f"Replaced {len(matches)} occurrences", 5000)
 
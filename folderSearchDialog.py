@@ -0,0 +1,223 @@
+import os
+import threading
+
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton,
+                               QComboBox, QGroupBox, QFormLayout, QCheckBox, QTreeWidget,
+                               QTreeWidgetItem, QFileDialog, QMessageBox)
+from PySide6.QtCore import Signal, QObject
+from r8folder import search_folder
+from r8search import SearchPattern, MODES, FIELD_NAME, FIELD_SYMBOL, FIELD_LOCAL, FIELD_TAG
+from r8cartypes import NO_CAR_TYPES
+
+FIELD_LABELS = {FIELD_NAME: "Name", FIELD_LOCAL: "Local Name", FIELD_SYMBOL: "Tag"}
+
+
+class FolderSearchWorker(QObject):
+    """Runs a folder search in a background thread and reports each file as it finishes"""
+    file_done = Signal(str, object, str)  # (path, [FolderMatch], error message)
+    finished = Signal(int)  # (number of files searched)
+
+    def __init__(self, root, text, mode, case_sensitive, fields):
+        super().__init__()
+        self.args = (root, text, mode, case_sensitive, fields)
+        self.stopped = False
+
+    def run(self):
+        """Perform the search (runs in background thread)"""
+        searched = 0
+        results = search_folder(*self.args)
+        try:
+            for path, matches, error in results:
+                if self.stopped:
+                    break
+                searched += 1
+                self.file_done.emit(path, matches, error or "")
+        finally:
+            results.close()
+        self.finished.emit(searched)
+
+
+class FolderSearchDialog(QDialog):
+    def __init__(self, cartypes=None, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Search in Folder")
+        self.setModal(False)  # Allow interaction with main window
+        self.resize(700, 500)
+
+        self.cartypes = cartypes or NO_CAR_TYPES
+        self.worker = None
+        self.match_count = 0
+        self.file_count = 0
+
+        # Main layout
+        main_layout = QVBoxLayout(self)
+
+        # Search criteria group
+        criteria_group = QGroupBox("Search Criteria")
+        criteria_layout = QFormLayout()
+
+        # Folder
+        folder_layout = QHBoxLayout()
+        self.folder_edit = QLineEdit()
+        self.folder_edit.setPlaceholderText("Folder containing .ind files")
+        folder_layout.addWidget(self.folder_edit)
+        browse_button = QPushButton("Browse...")
+        browse_button.clicked.connect(self.browse_folder)
+        folder_layout.addWidget(browse_button)
+        criteria_layout.addRow("Folder:", folder_layout)
+
+        # Find what
+        self.find_edit = QLineEdit()
+        self.find_edit.setPlaceholderText("Enter tag or name to find")
+        criteria_layout.addRow("Find what:", self.find_edit)
+
+        # Match mode
+        mode_layout = QHBoxLayout()
+        self.mode_combo = QComboBox()
+        self.mode_combo.addItems(MODES)
+        mode_layout.addWidget(self.mode_combo)
+        self.case_check = QCheckBox("Match case")
+        self.case_check.setChecked(True)
+        mode_layout.addWidget(self.case_check)
+        mode_layout.addStretch()
+        criteria_layout.addRow("Match:", mode_layout)
+
+        # Fields
+        fields_layout = QHBoxLayout()
+        self.tags_check = QCheckBox("Processed tags")
+        self.tags_check.setChecked(True)
+        fields_layout.addWidget(self.tags_check)
+        self.names_check = QCheckBox("Names")
+        self.names_check.setChecked(True)
+        fields_layout.addWidget(self.names_check)
+        fields_layout.addStretch()
+        criteria_layout.addRow("Search in:", fields_layout)
+
+        criteria_group.setLayout(criteria_layout)
+        main_layout.addWidget(criteria_group)
+
+        # Results grouped by file, industry and producer
+        self.results_tree = QTreeWidget()
+        self.results_tree.setHeaderLabels(["Match", "Details"])
+        self.results_tree.setColumnWidth(0, 350)
+        main_layout.addWidget(self.results_tree)
+
+        self.status_label = QLabel("")
+        self.status_label.setStyleSheet("color: gray; font-style: italic;")
+        main_layout.addWidget(self.status_label)
+
+        # Buttons
+        button_layout = QHBoxLayout()
+
+        self.search_button = QPushButton("Search")
+        self.search_button.clicked.connect(self.start_search)
+        self.search_button.setDefault(True)
+        button_layout.addWidget(self.search_button)
+
+        self.stop_button = QPushButton("Stop")
+        self.stop_button.clicked.connect(self.stop_search)
+        self.stop_button.setEnabled(False)
+        button_layout.addWidget(self.stop_button)
+
+        button_layout.addStretch()
+
+        close_button = QPushButton("Close")
+        close_button.clicked.connect(self.accept)
+        button_layout.addWidget(close_button)
+
+        main_layout.addLayout(button_layout)
+
+    def browse_folder(self):
+        folder = QFileDialog.getExistingDirectory(self, "Select Folder", self.folder_edit.text())
+        if folder:
+            self.folder_edit.setText(folder)
+
+    def start_search(self):
+        """Start searching every .ind file under the selected folder"""
+        root = self.folder_edit.text()
+        text = self.find_edit.text()
+        if not os.path.isdir(root):
+            QMessageBox.warning(self, "Search in Folder", "Please select an existing folder.")
+            return
+        if not text:
+            QMessageBox.warning(self, "Search in Folder", "Please enter text to find.")
+            return
+
+        fields = []
+        if self.tags_check.isChecked():
+            fields.append(FIELD_TAG)
+        if self.names_check.isChecked():
+            fields.extend([FIELD_NAME, FIELD_LOCAL, FIELD_SYMBOL])
+        if not fields:
+            QMessageBox.warning(self, "Search in Folder", "Please select at least one field to search.")
+            return
+
+        mode = self.mode_combo.currentText()
+        case_sensitive = self.case_check.isChecked()
+        try:
+            SearchPattern(text, mode, case_sensitive)
+        except ValueError as e:
+            QMessageBox.warning(self, "Search in Folder", str(e))
+            return
+
+        self.stop_search()
+        self.results_tree.clear()
+        self.match_count = 0
+        self.file_count = 0
+        self.status_label.setText("Searching...")
+        self.search_button.setEnabled(False)
+        self.stop_button.setEnabled(True)
+
+        # Create worker and keep reference to prevent garbage collection
+        self.worker = FolderSearchWorker(root, text, mode, case_sensitive, fields)
+        self.worker.file_done.connect(self.on_file_done)
+        self.worker.finished.connect(self.on_search_finished)
+
+        # Run search in background thread
+        thread = threading.Thread(target=self.worker.run, daemon=True)
+        thread.start()
+
+    def stop_search(self):
+        if self.worker is not None:
+            self.worker.stopped = True
+
+    def on_file_done(self, path, matches, error):
+        """Add the results of one file to the tree as soon as they arrive"""
+        if self.sender() is not self.worker:
+            return  # Late result from a stopped search
+        if error:
+            item = QTreeWidgetItem([path, f"Could not be read: {error}"])
+            self.results_tree.addTopLevelItem(item)
+            return
+        if not matches:
+            return
+
+        count = sum(match.count() for match in matches)
+        self.match_count += count
+        self.file_count += 1
+        file_item = QTreeWidgetItem([path, f"{count} matches in {len(matches)} industries"])
+        for match in matches:
+            industry_item = QTreeWidgetItem(file_item, [match.name, f"Record {match.position}"])
+            for field, value in match.fields:
+                QTreeWidgetItem(industry_item, [value, FIELD_LABELS.get(field, field)])
+            for bIndex, tags in match.producers:
+                car_name = self.cartypes.name(bIndex)
+                QTreeWidgetItem(industry_item, [", ".join(tags), f"{car_name} ({bIndex})"])
+        self.results_tree.addTopLevelItem(file_item)
+        self.status_label.setText(f"Searching... {self.match_count} matches in {self.file_count} files")
+
+    def on_search_finished(self, searched):
+        if self.sender() is not self.worker:
+            return
+        stopped = " (stopped)" if self.worker.stopped else ""
+        self.status_label.setText(f"{self.match_count} matches in {self.file_count} of {searched} files searched{stopped}")
+        self.search_button.setEnabled(True)
+        self.stop_button.setEnabled(False)
+
+    def closeEvent(self, event):
+        self.stop_search()
+        super().closeEvent(event)
+
+    def accept(self):
+        self.stop_search()
+        super().accept()
@@ -1,7 +1,7 @@
-from PySide6.QtWidgets import QDialog, QTableWidgetItem, QMessageBox, QPushButton, QHBoxLayout, QStyledItemDelegate, QLineEdit
+from PySide6.QtWidgets import QDialog, QMessageBox, QPushButton, QHBoxLayout, QStyledItemDelegate, QLineEdit
 from PySide6.QtCore import Qt, QTimer
 from industryDetailDialog_ui import Ui_IndustryDetailDialog
-from r8lib import industry_track, producer, industry_tag, industry_filter, encode_run8string
+from detailTables import TrackTableModel, ProducerTableModel
 from industryFindReplaceDialog import IndustryFindReplaceDialog
 
 
@@ -17,18 +17,22 @@ class VisualSelectDelegate(QStyledItemDelegate):
 
 
 class IndustryDetailDialog(QDialog):
-    def __init__(self, industry, cardict, parent=None, industry_row=None):
+    def __init__(self, industry, cartypes, parent=None, industry_row=None):
         super().__init__(parent)
         self.industry = industry
-        self.cardict = cardict
+        self.cartypes = cartypes
         self.industry_row = industry_row  # Row index in main table
+        self.find_dialog = None  # Open tag find/replace dialog, if any
 
         # Setup UI from generated file
         self.ui = Ui_IndustryDetailDialog()
         self.ui.setupUi(self)
 
-        # Set window title with industry name
-        self.setWindowTitle(f"Industry Details - {industry.name}")
+        # Table models read directly from the industry's track and producer objects
+        self.tracks_model = TrackTableModel(self)
+        self.ui.tracks_table.setModel(self.tracks_model)
+        self.producers_model = ProducerTableModel(cartypes, self)
+        self.ui.producers_table.setModel(self.producers_model)
 
         # Configure table headers
         from PySide6.QtWidgets import QHeaderView
@@ -101,8 +105,27 @@ class IndustryDetailDialog(QDialog):
         self.ui.cancel_button.setAutoDefault(False)
 
         # Load data
+        self.set_industry(industry, industry_row)
+
+    def set_industry(self, industry, industry_row=None):
+        """Rebind the dialog to another industry so one instance can be reused"""
+        # A tag find dialog left open for the previous industry no longer applies
+        if self.find_dialog is not None:
+            self.find_dialog.close()
+            self.find_dialog = None
+
+        self.industry = industry
+        self.industry_row = industry_row
+
+        # Set window title with industry name
+        self.setWindowTitle(f"Industry Details - {industry.name}")
+
         self.load_data()
 
+        # Start each industry at the top of the form
+        self.ui.scrollArea.verticalScrollBar().setValue(0)
+        self.ui.name_edit.setFocus()
+
     def load_data(self):
         """Load industry data into the form"""
         # Basic information
@@ -127,68 +150,35 @@ class IndustryDetailDialog(QDialog):
 
     def load_tracks(self):
         """Load tracks into the table"""
-        # Clear the table first to avoid duplicates
-        self.ui.tracks_table.clearContents()
-
-        if self.industry.number_of_tracks > 0:
-            self.ui.tracks_table.setRowCount(self.industry.number_of_tracks)
-            for i, track in enumerate(self.industry.track):
-                self.ui.tracks_table.setItem(i, 0, QTableWidgetItem(str(track.route_prefix)))
-                self.ui.tracks_table.setItem(i, 1, QTableWidgetItem(str(track.track_section)))
-                self.ui.tracks_table.setItem(i, 2, QTableWidgetItem(str(track.track_direction)))
-        else:
-            self.ui.tracks_table.setRowCount(0)
+        self.tracks_model.set_tracks(self.industry.track if self.industry.number_of_tracks > 0 else [])
 
     def load_producers(self):
         """Load producers into the table"""
-        # Clear the table first to avoid duplicates
-        self.ui.producers_table.clearContents()
-
-        if self.industry.num_producers > 0:
-            # Sort producers alphabetically by car type name
-            sorted_producers = sorted(
-                self.industry.producer,
-                key=lambda prod: self.cardict.get(str(prod.bIndex), "Unknown").lower()
-            )
-
-            self.ui.producers_table.setRowCount(self.industry.num_producers)
-            for i, prod in enumerate(sorted_producers):
-                # Car Type ID (read-only)
-                car_id_item = QTableWidgetItem(str(prod.bIndex))
-                car_id_item.setFlags(car_id_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-                self.ui.producers_table.setItem(i, 0, car_id_item)
-
-                # Car Type Name (read-only)
-                car_type_name = self.cardict.get(str(prod.bIndex), "Unknown")
-                car_name_item = QTableWidgetItem(car_type_name)
-                car_name_item.setFlags(car_name_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-                self.ui.producers_table.setItem(i, 1, car_name_item)
-
-                # Tags (displayed comma-separated, can be entered with spaces or commas)
-                tags_str = prod.returnTags() if prod.num_tags > 0 else ""
-                self.ui.producers_table.setItem(i, 2, QTableWidgetItem(tags_str))
-
-                # Capacity
-                self.ui.producers_table.setItem(i, 3, QTableWidgetItem(str(prod.capacity)))
-
-                # Hours
-                self.ui.producers_table.setItem(i, 4, QTableWidgetItem(str(prod.proc_hours)))
-
-                # Produce Empties
-                self.ui.producers_table.setItem(i, 5, QTableWidgetItem("Empties" if prod.produce_empties else "Loads"))
-        else:
-            self.ui.producers_table.setRowCount(0)
+        self.producers_model.set_producers(self.industry.producer if self.industry.num_producers > 0 else [])
+
+    def select_producer(self, producer):
+        """Select the tags cell of a producer's row"""
+        row = self.producers_model.row_for_producer(producer)
+        if row >= 0:
+            tags_index = self.producers_model.index(row, ProducerTableModel.TAGS_COL)
+            self.ui.producers_table.setCurrentIndex(tags_index)
+            self.ui.producers_table.scrollTo(tags_index)
 
     def remove_track(self):
         """Remove selected track row"""
-        current_row = self.ui.tracks_table.currentRow()
+        current_row = self.ui.tracks_table.currentIndex().row()
         if current_row >= 0:
-            self.ui.tracks_table.removeRow(current_row)
+            self.tracks_model.removeRows(current_row, 1)
         else:
             QMessageBox.warning(self, "No Selection", "Please select a track to remove.")
 
     def save_data(self):
         """Save form data back to the industry object"""
+        # Report all edits of this save as one change
+        with self.industry.batch():
+            self._save_fields()
+
+    def _save_fields(self):
         # Update basic information
         if self.ui.name_edit.text() != self.industry.name:
             self.industry.replaceName(self.ui.name_edit.text())
@@ -199,106 +189,59 @@ class IndustryDetailDialog(QDialog):
         if self.ui.symbol_edit.text() != self.industry.trk_sym:
             self.industry.replaceSymbol(self.ui.symbol_edit.text())
 
-        self.industry.process_in_blocks = self.ui.process_blocks_check.isChecked()
+        changed = False
+        if self.ui.process_blocks_check.isChecked() != self.industry.process_in_blocks:
+            self.industry.process_in_blocks = self.ui.process_blocks_check.isChecked()
+            changed = True
 
         # Save tracks
-        self.save_tracks()
+        changed = self.save_tracks() or changed
 
         # Save producers
-        self.save_producers()
-
-    def save_tracks(self):
-        """Save tracks from table to industry object"""
-        # Clear existing tracks
-        self.industry.track = []
-        self.industry.number_of_tracks = self.ui.tracks_table.rowCount()
-
-        # Read each row and create industry_track objects
-        for i in range(self.ui.tracks_table.rowCount()):
-            # Create a mock memory map for the industry_track constructor
-            track_data = bytearray()
+        changed = self.save_producers() or changed
 
-            # unk1 (use 0 as default for new tracks)
-            unk1 = 0
-            track_data.extend(unk1.to_bytes(4, 'little', signed=True))
+        # Direct attribute edits above do not notify the file on their own;
+        # an Update without changes keeps the industry unmodified
+        if changed:
+            self.industry.touch()
 
-            # route_prefix
-            route_prefix = int(self.ui.tracks_table.item(i, 0).text())
-            track_data.extend(route_prefix.to_bytes(4, 'little', signed=True))
-
-            # track_section
-            track_section = int(self.ui.tracks_table.item(i, 1).text())
-            track_data.extend(track_section.to_bytes(4, 'little', signed=True))
-
-            # track_direction
-            track_direction = int(self.ui.tracks_table.item(i, 2).text())
-            track_data.extend(track_direction.to_bytes(4, 'little', signed=True))
-
-            # Create the track object
-            new_track = industry_track(track_data, 0)
-            self.industry.track.append(new_track)
+    def save_tracks(self):
+        """Save tracks from table to industry object; returns True if anything changed"""
+        # Edited cells are written into the existing track objects, removed rows are dropped
+        tracks, changed = self.tracks_model.apply_edits()
+        if tracks != self.industry.track:
+            self.industry.track = tracks
+            self.industry.number_of_tracks = len(tracks)
+            changed = True
+        return changed
 
     def save_producers(self):
-        """Save producers from table to industry object"""
-        # Update existing producers (preserving rec_type and other internal fields)
-        # NOTE: Table displays producers in sorted order, but we need to match by bIndex
-        for i in range(self.ui.producers_table.rowCount()):
-            # Get the car type ID from the table row
-            bIndex = int(self.ui.producers_table.item(i, 0).text())
-
-            # Find the producer with this bIndex in the original list
-            prod = None
-            for p in self.industry.producer:
-                if p.bIndex == bIndex:
-                    prod = p
-                    break
-
-            if prod is None:
-                continue  # Skip if producer not found (shouldn't happen)
-
-            # Parse tags (space or comma separated) - column 2
-            tags_text = self.ui.producers_table.item(i, 2).text().strip()
-            # Replace commas with spaces, then split by whitespace
-            tags_text = tags_text.replace(',', ' ')
-            tag_list = [tag for tag in tags_text.split() if tag]
-
-            # capacity - column 3
-            prod.capacity = int(self.ui.producers_table.item(i, 3).text())
-
-            # proc_hours - column 4
-            prod.proc_hours = int(self.ui.producers_table.item(i, 4).text())
-
-            # produce_empties - column 5
-            produce_empties_text = self.ui.producers_table.item(i, 5).text().strip().lower()
-            prod.produce_empties = produce_empties_text in ['yes', 'y', '1', 'true']
-
-            # Rebuild tags list
-            prod.tags = []
-            prod.num_tags = len(tag_list)
-            for tag_name in tag_list:
-                # Create tag data
-                tag_data = bytearray()
-                enc_tag = encode_run8string(tag_name)
-                tag_len = len(enc_tag)
-                tag_data.extend(tag_len.to_bytes(4, 'little', signed=True))
-                tag_data.extend(enc_tag)
-
-                # Create tag object
-                new_tag = industry_tag(tag_data, 0)
-                prod.tags.append(new_tag)
+        """Save producers from table to industry object; returns True if anything changed"""
+        # Only producers with changed cells are returned; rows map straight to producer objects
+        changed = self.producers_model.apply_edits()
+        for prod, tag_list in changed:
+            if tag_list is None:
+                continue
+
+            # Rebuild tags list (keeps the file's tag index current)
+            prod.setTags(tag_list)
+        return bool(changed)
 
     def show_find_replace(self):
         """Show the find and replace dialog for tags in this industry"""
         # Get the main window reference
         main_window = self.parent()
+        if self.find_dialog is not None:
+            self.find_dialog.close()
         dialog = IndustryFindReplaceDialog(
             self.industry,
             self.ui.producers_table,
             self,
             main_window=main_window,
             industry_row=self.industry_row,
-            cardict=self.cardict
+            cartypes=self.cartypes
         )
+        self.find_dialog = dialog
         dialog.show()
 
     def accept(self):
@@ -18,8 +18,7 @@ from PySide6.QtGui import (QBrush, QColor, QConicalGradient, QCursor,
 from PySide6.QtWidgets import (QApplication, QCheckBox, QDialog, QFormLayout,
     QGroupBox, QHBoxLayout, QHeaderView, QLabel,
     QLineEdit, QPushButton, QScrollArea, QSizePolicy,
-    QSpacerItem, QTableWidget, QTableWidgetItem, QVBoxLayout,
-    QWidget)
+    QSpacerItem, QTableView, QVBoxLayout, QWidget)
 
 class Ui_IndustryDetailDialog(object):
     def setupUi(self, IndustryDetailDialog):
@@ -92,18 +91,9 @@ class Ui_IndustryDetailDialog(object):
         self.tracksGroup.setSizePolicy(sizePolicy)
         self.verticalLayout_3 = QVBoxLayout(self.tracksGroup)
         self.verticalLayout_3.setObjectName(u"verticalLayout_3")
-        self.tracks_table = QTableWidget(self.tracksGroup)
-        if (self.tracks_table.columnCount() < 3):
-            self.tracks_table.setColumnCount(3)
-        __qtablewidgetitem = QTableWidgetItem()
-        self.tracks_table.setHorizontalHeaderItem(0, __qtablewidgetitem)
-        __qtablewidgetitem1 = QTableWidgetItem()
-        self.tracks_table.setHorizontalHeaderItem(1, __qtablewidgetitem1)
-        __qtablewidgetitem2 = QTableWidgetItem()
-        self.tracks_table.setHorizontalHeaderItem(2, __qtablewidgetitem2)
+        self.tracks_table = QTableView(self.tracksGroup)
         self.tracks_table.setObjectName(u"tracks_table")
         self.tracks_table.setMaximumSize(QSize(16777215, 120))
-        self.tracks_table.setColumnCount(3)
 
         self.verticalLayout_3.addWidget(self.tracks_table)
 
@@ -133,23 +123,8 @@ class Ui_IndustryDetailDialog(object):
         self.producersGroup.setSizePolicy(sizePolicy1)
         self.verticalLayout_4 = QVBoxLayout(self.producersGroup)
         self.verticalLayout_4.setObjectName(u"verticalLayout_4")
-        self.producers_table = QTableWidget(self.producersGroup)
-        if (self.producers_table.columnCount() < 6):
-            self.producers_table.setColumnCount(6)
-        __qtablewidgetitem3 = QTableWidgetItem()
-        self.producers_table.setHorizontalHeaderItem(0, __qtablewidgetitem3)
-        __qtablewidgetitem4 = QTableWidgetItem()
-        self.producers_table.setHorizontalHeaderItem(1, __qtablewidgetitem4)
-        __qtablewidgetitem5 = QTableWidgetItem()
-        self.producers_table.setHorizontalHeaderItem(2, __qtablewidgetitem5)
-        __qtablewidgetitem6 = QTableWidgetItem()
-        self.producers_table.setHorizontalHeaderItem(3, __qtablewidgetitem6)
-        __qtablewidgetitem7 = QTableWidgetItem()
-        self.producers_table.setHorizontalHeaderItem(4, __qtablewidgetitem7)
-        __qtablewidgetitem8 = QTableWidgetItem()
-        self.producers_table.setHorizontalHeaderItem(5, __qtablewidgetitem8)
+        self.producers_table = QTableView(self.producersGroup)
         self.producers_table.setObjectName(u"producers_table")
-        self.producers_table.setColumnCount(6)
 
         self.verticalLayout_4.addWidget(self.producers_table)
 
@@ -194,26 +169,8 @@ class Ui_IndustryDetailDialog(object):
         self.labelProcessBlocks.setText(QCoreApplication.translate("IndustryDetailDialog", u"Process in Blocks:", None))
         self.process_blocks_check.setText("")
         self.tracksGroup.setTitle(QCoreApplication.translate("IndustryDetailDialog", u"Tracks", None))
-        ___qtablewidgetitem = self.tracks_table.horizontalHeaderItem(0)
-        ___qtablewidgetitem.setText(QCoreApplication.translate("IndustryDetailDialog", u"Route Prefix", None));
-        ___qtablewidgetitem1 = self.tracks_table.horizontalHeaderItem(1)
-        ___qtablewidgetitem1.setText(QCoreApplication.translate("IndustryDetailDialog", u"Track Section", None));
-        ___qtablewidgetitem2 = self.tracks_table.horizontalHeaderItem(2)
-        ___qtablewidgetitem2.setText(QCoreApplication.translate("IndustryDetailDialog", u"Track Direction", None));
         self.remove_track_button.setText(QCoreApplication.translate("IndustryDetailDialog", u"Remove Selected Track", None))
         self.producersGroup.setTitle(QCoreApplication.translate("IndustryDetailDialog", u"Incoming cars", None))
-        ___qtablewidgetitem3 = self.producers_table.horizontalHeaderItem(0)
-        ___qtablewidgetitem3.setText(QCoreApplication.translate("IndustryDetailDialog", u"ID", None));
-        ___qtablewidgetitem4 = self.producers_table.horizontalHeaderItem(1)
-        ___qtablewidgetitem4.setText(QCoreApplication.translate("IndustryDetailDialog", u"Car Type", None));
-        ___qtablewidgetitem5 = self.producers_table.horizontalHeaderItem(2)
-        ___qtablewidgetitem5.setText(QCoreApplication.translate("IndustryDetailDialog", u"Processed Tags", None));
-        ___qtablewidgetitem6 = self.producers_table.horizontalHeaderItem(3)
-        ___qtablewidgetitem6.setText(QCoreApplication.translate("IndustryDetailDialog", u"Capacity", None));
-        ___qtablewidgetitem7 = self.producers_table.horizontalHeaderItem(4)
-        ___qtablewidgetitem7.setText(QCoreApplication.translate("IndustryDetailDialog", u"Hours", None));
-        ___qtablewidgetitem8 = self.producers_table.horizontalHeaderItem(5)
-        ___qtablewidgetitem8.setText(QCoreApplication.translate("IndustryDetailDialog", u"Produces", None));
         self.save_button.setText(QCoreApplication.translate("IndustryDetailDialog", u"Update", None))
         self.cancel_button.setText(QCoreApplication.translate("IndustryDetailDialog", u"Cancel", None))
     # retranslateUi
@@ -1,11 +1,13 @@
 from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel,
                                QLineEdit, QPushButton, QGroupBox,
-                               QFormLayout, QMessageBox)
+                               QFormLayout, QMessageBox, QComboBox, QCheckBox)
 from PySide6.QtCore import Qt
+from r8search import SearchPattern, MODES, MODE_EXACT, MODE_WILDCARD
+from r8cartypes import NO_CAR_TYPES
 
 
 class IndustryFindReplaceDialog(QDialog):
-    def __init__(self, industry, producers_table, parent=None, main_window=None, industry_row=None, cardict=None):
+    def __init__(self, industry, producers_table, parent=None, main_window=None, industry_row=None, cartypes=None):
         super().__init__(parent)
         self.setWindowTitle(f"Find and Replace Tags - {industry.name}")
         self.setModal(False)  # Allow interaction with parent dialog
@@ -17,7 +19,7 @@ class IndustryFindReplaceDialog(QDialog):
         self.parent_dialog = parent
         self.main_window = main_window
         self.industry_row = industry_row
-        self.cardict = cardict or {}
+        self.cartypes = cartypes or NO_CAR_TYPES
         self.current_match_index = -1
         self.matches = []
 
@@ -28,9 +30,20 @@ class IndustryFindReplaceDialog(QDialog):
         criteria_group = QGroupBox("Search in Processed Tags")
         criteria_layout = QFormLayout()
 
+        # Match mode
+        mode_layout = QHBoxLayout()
+        self.mode_combo = QComboBox()
+        self.mode_combo.addItems(MODES)
+        mode_layout.addWidget(self.mode_combo)
+        self.case_check = QCheckBox("Match case")
+        self.case_check.setChecked(True)
+        mode_layout.addWidget(self.case_check)
+        mode_layout.addStretch()
+        criteria_layout.addRow("Match:", mode_layout)
+
         # Find what
         self.find_edit = QLineEdit()
-        self.find_edit.setPlaceholderText("Enter exact tag to find")
+        self.find_edit.setPlaceholderText("Enter tag to find")
         criteria_layout.addRow("Find what:", self.find_edit)
 
         # Replace with
@@ -41,10 +54,10 @@ class IndustryFindReplaceDialog(QDialog):
         criteria_group.setLayout(criteria_layout)
         main_layout.addWidget(criteria_group)
 
-        # Note about exact matching
-        note_label = QLabel("Note: Only exact tag matches (entire tag) will be found")
-        note_label.setStyleSheet("color: gray; font-style: italic;")
-        main_layout.addWidget(note_label)
+        # Note about the matching mode
+        self.note_label = QLabel("Note: Only exact tag matches (entire tag) will be found")
+        self.note_label.setStyleSheet("color: gray; font-style: italic;")
+        main_layout.addWidget(self.note_label)
 
         # Buttons
         button_layout = QHBoxLayout()
@@ -70,8 +83,33 @@ class IndustryFindReplaceDialog(QDialog):
 
         main_layout.addLayout(button_layout)
 
-        # Connect text changes to reset search
+        # Connect text and mode changes to reset search
         self.find_edit.textChanged.connect(self.reset_search)
+        self.mode_combo.currentIndexChanged.connect(self.reset_search)
+        self.mode_combo.currentIndexChanged.connect(self.update_note)
+        self.case_check.toggled.connect(self.reset_search)
+
+        # Keep the recorded table rows valid when the detail dialog reloads its producers
+        self.producers_table.model().modelReset.connect(self.remap_table_rows)
+
+    def update_note(self):
+        """Describe the selected matching mode"""
+        notes = {
+            MODE_EXACT: "Note: Only exact tag matches (entire tag) will be found",
+            MODE_WILDCARD: "Note: * and ? wildcards must match the entire tag",
+        }
+        self.note_label.setText(notes.get(self.mode_combo.currentText(),
+                                          "Note: Matches anywhere in a tag; only the matched text is replaced"))
+
+    def build_pattern(self, replacing=False):
+        """Compile the search text in the selected mode (raises ValueError on a bad pattern)
+
+        With replacing, the replacement text is checked as well, before anything is changed.
+        """
+        pattern = SearchPattern(self.find_edit.text(), self.mode_combo.currentText(), self.case_check.isChecked())
+        if replacing:
+            pattern.check_replacement(self.replace_edit.text())
+        return pattern
 
     def reset_search(self):
         """Reset search state when criteria changes"""
@@ -79,33 +117,35 @@ class IndustryFindReplaceDialog(QDialog):
         self.matches = []
         self.replace_button.setEnabled(False)
 
-    def find_table_row_for_producer(self, bIndex):
-        """Find the table row for a producer with the given bIndex (car type ID)"""
-        # Search through table rows to find the one with matching bIndex in column 0
-        for row in range(self.producers_table.rowCount()):
-            item = self.producers_table.item(row, 0)  # Column 0 contains bIndex
-            if item and int(item.text()) == bIndex:
-                return row
-        return -1  # Not found
-
-    def find_tag_matches(self, search_text):
-        """Find all exact tag matches in this industry"""
+    def remap_table_rows(self):
+        """Look up the table row of every pending match again after the producers were reloaded"""
+        for match in self.matches:
+            if match['producer_idx'] < len(self.industry.producer):
+                match['table_row'] = self.table_row(self.industry.producer[match['producer_idx']])
+            else:
+                match['table_row'] = -1
+
+    def table_row(self, producer):
+        """Return the table row showing a producer object, or -1"""
+        return self.producers_table.model().row_for_producer(producer)
+
+    def find_tag_matches(self, pattern):
+        """Find all tag matches in this industry"""
         matches = []
         for producer_idx, producer in enumerate(self.industry.producer):
             # Only check tags if the producer has any
             if hasattr(producer, 'tags') and producer.num_tags > 0:
                 for tag_idx, tag in enumerate(producer.tags):
-                    if tag.name == search_text:  # Exact match only
+                    if pattern.matches(tag.name):
                         matches.append({
                             'producer_idx': producer_idx,
-                            'tag_idx': tag_idx
+                            'tag_idx': tag_idx,
+                            'tag_name': tag.name,
+                            'table_row': self.table_row(producer)
                         })
 
-        # Sort matches by car type name (same order as table display)
-        matches.sort(key=lambda m: self.cardict.get(
-            str(self.industry.producer[m['producer_idx']].bIndex),
-            "Unknown"
-        ).lower())
+        # Sort matches in table display order (stable, so tags keep their order within a row)
+        matches.sort(key=lambda m: m['table_row'])
 
         return matches
 
@@ -116,36 +156,40 @@ class IndustryFindReplaceDialog(QDialog):
             QMessageBox.warning(self, "Find", "Please enter a tag to find.")
             return
 
+        try:
+            pattern = self.build_pattern()
+        except ValueError as e:
+            QMessageBox.warning(self, "Find", str(e))
+            return
+
         # Get all matches if not already found
         if not self.matches:
-            self.matches = self.find_tag_matches(search_text)
+            self.matches = self.find_tag_matches(pattern)
             self.current_match_index = -1
 
         if not self.matches:
-            QMessageBox.information(self, "Find", f"No exact matches found for tag '{search_text}'")
+            QMessageBox.information(self, "Find", f"No matches found for tag '{search_text}'")
             return
 
         # Move to next match (circular)
         self.current_match_index = (self.current_match_index + 1) % len(self.matches)
         match = self.matches[self.current_match_index]
 
-        # Find the table row for this producer (table is sorted, so row != producer_idx)
-        producer = self.industry.producer[match['producer_idx']]
-        table_row = self.find_table_row_for_producer(producer.bIndex)
+        # Table row of this producer, recorded when the matches were collected
+        table_row = match['table_row']
 
         if table_row >= 0:
             # Select the producer row in the table and the tags cell
-            self.producers_table.setCurrentCell(table_row, 2)  # Column 2 is tags
-            self.producers_table.scrollToItem(
-                self.producers_table.item(table_row, 0)
-            )
+            tags_index = self.producers_table.model().index(table_row, 2)  # Column 2 is tags
+            self.producers_table.setCurrentIndex(tags_index)
+            self.producers_table.scrollTo(tags_index)
 
             # Enter edit mode and highlight just the search text
-            self.producers_table.editItem(self.producers_table.item(table_row, 2))
+            self.producers_table.edit(tags_index)
 
             # Delay selection to run after the delegate has set up the editor
             from PySide6.QtCore import QTimer
-            QTimer.singleShot(0, lambda: self._select_found_tag(table_row, search_text))
+            QTimer.singleShot(0, lambda: self._select_found_tag(table_row, pattern))
 
         # Enable replace button
         self.replace_button.setEnabled(True)
@@ -164,27 +208,28 @@ class IndustryFindReplaceDialog(QDialog):
 
         replace_text = self.replace_edit.text()
         match = self.matches[self.current_match_index]
+        try:
+            pattern = self.build_pattern(replacing=True)
+        except ValueError as e:
+            QMessageBox.warning(self, "Replace", str(e))
+            return
 
-        # Replace or delete the tag
+        # Replace or delete the tag; skip it if it is already gone
         producer = self.industry.producer[match['producer_idx']]
+        tag = self._match_tag(producer, match)
+        if tag is not None:
+            new_name = pattern.replace(tag.name, replace_text)
 
-        if replace_text.strip():
-            # Replace with new value
-            tag = producer.tags[match['tag_idx']]
-            tag.replaceName(replace_text)
-        else:
-            # Delete the tag if replacing with empty string
-            tag_to_delete = producer.tags[match['tag_idx']]
-            producer.deleteTag(tag_to_delete.name)
-
-        # Refresh the producers table display
-        self.refresh_producer_row(match['producer_idx'])
+            if new_name.strip():
+                # Replace with new value
+                tag.replaceName(new_name)
+            else:
+                # Delete the tag if the replacement leaves it empty
+                producer.removeTag(tag)
 
-        # Mark the industry as dirty in the main window
-        if self.main_window and self.industry_row is not None:
-            # Convert original index to display row
-            display_row = self.main_window.table_model._original_indices.index(self.industry_row)
-            self.main_window.table_model.mark_row_dirty(display_row)
+            # Refresh the producers table display
+            # (the main window row is marked dirty through the file's change listener)
+            self.refresh_producer_row(match['producer_idx'])
 
         # Remove this match from the list
         self.matches.pop(self.current_match_index)
@@ -198,6 +243,16 @@ class IndustryFindReplaceDialog(QDialog):
             self.replace_button.setEnabled(False)
             QMessageBox.information(self, "Replace", "No more matches to replace.")
 
+    def _match_tag(self, producer, match):
+        """Return the tag object for a match, even if earlier deletions shifted its position"""
+        tag_idx = match['tag_idx']
+        if tag_idx < producer.num_tags and producer.tags[tag_idx].name == match['tag_name']:
+            return producer.tags[tag_idx]
+        for tag in producer.tags:
+            if tag.name == match['tag_name']:
+                return tag
+        return None
+
     def replace_all(self):
         """Replace all occurrences in this industry"""
         search_text = self.find_edit.text()
@@ -207,15 +262,21 @@ class IndustryFindReplaceDialog(QDialog):
             QMessageBox.warning(self, "Replace All", "Please enter a tag to find.")
             return
 
+        try:
+            pattern = self.build_pattern(replacing=True)
+        except ValueError as e:
+            QMessageBox.warning(self, "Replace All", str(e))
+            return
+
         # Find all matches
-        matches = self.find_tag_matches(search_text)
+        matches = self.find_tag_matches(pattern)
 
         if not matches:
-            QMessageBox.information(self, "Replace All", f"No exact matches found for tag '{search_text}'")
+            QMessageBox.information(self, "Replace All", f"No matches found for tag '{search_text}'")
             return
 
         # Confirm replace all
-        if replace_text.strip():
+        if replace_text.strip() or pattern.mode not in (MODE_EXACT, MODE_WILDCARD):
             message = f"Replace all {len(matches)} occurrences of tag '{search_text}' with '{replace_text}' in this industry?"
         else:
             message = f"Delete all {len(matches)} occurrences of tag '{search_text}' in this industry?"
@@ -233,20 +294,23 @@ class IndustryFindReplaceDialog(QDialog):
         # Track which producer rows need refreshing
         affected_producers = set()
 
-        # Perform replacements or deletions
-        if replace_text.strip():
-            # Replace with new value
-            for match in matches:
-                producer = self.industry.producer[match['producer_idx']]
-                tag = producer.tags[match['tag_idx']]
-                tag.replaceName(replace_text)
-                affected_producers.add(match['producer_idx'])
-        else:
-            # Delete tags (use original search text since all matches have this name)
-            for match in matches:
-                producer = self.industry.producer[match['producer_idx']]
-                producer.deleteTag(search_text)
-                affected_producers.add(match['producer_idx'])
+        # Work out each distinct tag's new name once; blank replacements delete the tag
+        mapping = dict()
+        for match in matches:
+            tag_name = match['tag_name']
+            if tag_name not in mapping:
+                new_name = pattern.replace(tag_name, replace_text)
+                mapping[tag_name] = new_name if new_name.strip() else ''
+            affected_producers.add(match['producer_idx'])
+
+        # Perform replacements or deletions as one change of the industry, one pass per producer
+        deleted = 0
+        with self.industry.batch():
+            for producer_idx in affected_producers:
+                producer = self.industry.producer[producer_idx]
+                before = producer.num_tags
+                producer.replace_tags(mapping)
+                deleted += before - producer.num_tags
 
         # Refresh affected producer rows
         for producer_idx in affected_producers:
@@ -256,49 +320,43 @@ class IndustryFindReplaceDialog(QDialog):
         if self.parent_dialog is not None:
             self.parent_dialog.load_producers()
 
-        # Mark the industry as dirty in the main window
-        if self.main_window and self.industry_row is not None:
-            # Convert original index to display row
-            display_row = self.main_window.table_model._original_indices.index(self.industry_row)
-            self.main_window.table_model.mark_row_dirty(display_row)
-
         # Reset search
         self.reset_search()
 
-        action = "Deleted" if not replace_text.strip() else "Replaced"
+        action = "Deleted" if deleted == len(matches) else "Replaced"
         QMessageBox.information(self, "Replace All", f"{action} {len(matches)} tag occurrences.")
 
-    def _select_found_tag(self, table_row, search_text):
+    def _select_found_tag(self, table_row, pattern):
         """Select only the found tag in the editor, not the entire cell"""
         from PySide6.QtWidgets import QLineEdit
 
         # Get the cell editor
-        editor = self.producers_table.cellWidget(table_row, 2)
+        model = self.producers_table.model()
+        editor = self.producers_table.indexWidget(model.index(table_row, 2))
         if editor is None:
             editor = self.producers_table.findChild(QLineEdit)
 
         if editor and isinstance(editor, QLineEdit):
             # Find position of search text in comma-separated tags
-            tags_text = self.producers_table.item(table_row, 2).text()
+            tags_text = model.data(model.index(table_row, 2))
             tags_list = [tag.strip() for tag in tags_text.split(',')]
 
             pos = 0
             for tag in tags_list:
-                if tag == search_text:
-                    # Found it - select this tag only
-                    editor.setSelection(pos, len(search_text))
+                span = pattern.span(tag)
+                if span is not None:
+                    # Found it - select the matched text of this tag only
+                    editor.setSelection(pos + span[0], span[1])
                     break
                 pos += len(tag) + 2  # +2 for ", " separator
 
     def refresh_producer_row(self, producer_idx):
         """Refresh the tags display for a specific producer row"""
         producer = self.industry.producer[producer_idx]
-        tags_str = producer.returnTags() if producer.num_tags > 0 else ""
 
         # Find the table row for this producer (table is sorted, so row != producer_idx)
-        table_row = self.find_table_row_for_producer(producer.bIndex)
+        table_row = self.table_row(producer)
 
         if table_row >= 0:
-            # Update the tags cell (column 2)
-            from PySide6.QtWidgets import QTableWidgetItem
-            self.producers_table.setItem(table_row, 2, QTableWidgetItem(tags_str))
+            # Repaint the tags cell (column 2) from the producer object
+            self.producers_table.model().refresh_row(table_row)
@@ -1,5 +1,6 @@
 from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
 from PySide6.QtGui import QBrush, QColor
+from r8profile import PROFILER, PHASE_SORT
 
 
 class DictTableModel(QAbstractTableModel):
@@ -9,6 +10,7 @@ class DictTableModel(QAbstractTableModel):
         self._headers = list(self._data[0].keys()) if self._data else []
         self._dirty_rows = set()  # Track rows with unsaved changes
         self._original_indices = []  # Map display row to original data structure index
+        self._display_rows = {}  # Map original data structure index to display row
         self._sort_column = -1  # Track current sort column
         self._sort_order = Qt.SortOrder.AscendingOrder  # Track current sort order
 
@@ -68,6 +70,7 @@ class DictTableModel(QAbstractTableModel):
         self._data = new_data
         self._original_indices = list(range(len(new_data)))
         self._headers = list(new_data[0].keys()) if new_data else []
+        self._display_rows = {i: i for i in range(len(new_data))}
 
         # Restore dirty rows as original indices (which are now also display indices since unsorted)
         self._dirty_rows = dirty_original_indices
@@ -114,10 +117,11 @@ class DictTableModel(QAbstractTableModel):
         # Separate the sorted data and original indices
         self._original_indices = [idx for idx, _ in indexed_data]
         self._data = [data for _, data in indexed_data]
+        self._display_rows = {orig_idx: display_row for display_row, orig_idx in enumerate(self._original_indices)}
 
         # Remap dirty rows from original indices to new display positions
         if dirty_original_indices:
-            reverse_map = {orig_idx: display_row for display_row, orig_idx in enumerate(self._original_indices)}
+            reverse_map = self._display_rows
             self._dirty_rows = {reverse_map[orig_idx] for orig_idx in dirty_original_indices if orig_idx in reverse_map}
 
     def get_original_index(self, display_row):
@@ -126,6 +130,10 @@ class DictTableModel(QAbstractTableModel):
             return self._original_indices[display_row]
         return display_row  # Fallback to display row if mapping doesn't exist
 
+    def get_display_row(self, original_index):
+        """Get the display row for an original data structure index (-1 if unknown)"""
+        return self._display_rows.get(original_index, -1)
+
     def sort(self, column, order):
         """Sort the table by the specified column"""
         if not self._data or column < 0 or column >= len(self._headers):
@@ -137,42 +145,86 @@ class DictTableModel(QAbstractTableModel):
 
         self.layoutAboutToBeChanged.emit()
 
+        # Convert dirty rows from old display positions to original indices before reordering
+        old_dirty_original = {self._original_indices[row] for row in self._dirty_rows if row < len(self._original_indices)}
+
         # Get the column key
         column_key = self._headers[column]
 
-        # Create list of (original_index, data) tuples
-        indexed_data = list(zip(self._original_indices, self._data))
-
-        # Define sort key function that handles different data types
-        def sort_key(item):
-            value = item[1].get(column_key, '')
-            # Convert to string and lowercase for consistent sorting
-            if isinstance(value, str):
-                return value.lower()
-            elif isinstance(value, (int, float)):
-                # For numbers, return them as-is (will sort numerically)
-                return value
-            else:
-                return str(value).lower()
-
-        # Sort the data
-        indexed_data.sort(key=sort_key, reverse=(order == Qt.SortOrder.DescendingOrder))
-
-        # Separate the sorted data and original indices
-        self._original_indices = [idx for idx, _ in indexed_data]
-        self._data = [data for _, data in indexed_data]
+        with PROFILER.phase(PHASE_SORT):
+            # Create list of (original_index, data) tuples
+            indexed_data = list(zip(self._original_indices, self._data))
+
+            # Define sort key function that handles different data types
+            def sort_key(item):
+                value = item[1].get(column_key, '')
+                # Convert to string and lowercase for consistent sorting
+                if isinstance(value, str):
+                    return value.lower()
+                elif isinstance(value, (int, float)):
+                    # For numbers, return them as-is (will sort numerically)
+                    return value
+                else:
+                    return str(value).lower()
+
+            # Sort the data
+            indexed_data.sort(key=sort_key, reverse=(order == Qt.SortOrder.DescendingOrder))
+
+            # Separate the sorted data and original indices
+            self._original_indices = [idx for idx, _ in indexed_data]
+            self._data = [data for _, data in indexed_data]
+            # Reverse mapping: original_index -> new display_row
+            self._display_rows = {orig_idx: display_row for display_row, orig_idx in enumerate(self._original_indices)}
 
         # Remap dirty rows to new display positions
-        if self._dirty_rows:
-            # Convert dirty rows from old display positions to original indices
-            old_dirty_original = {self._original_indices[row] for row in self._dirty_rows if row < len(self._original_indices)}
-            # Create reverse mapping: original_index -> new display_row
-            reverse_map = {orig_idx: display_row for display_row, orig_idx in enumerate(self._original_indices)}
+        if old_dirty_original:
+            reverse_map = self._display_rows
             # Update dirty rows to use new display row indices
             self._dirty_rows = {reverse_map[orig_idx] for orig_idx in old_dirty_original if orig_idx in reverse_map}
 
         self.layoutChanged.emit()
 
+    def update_rows(self, changed_rows, mark_dirty=True):
+        """Replace the records of several rows at once and mark them dirty
+
+        changed_rows maps original data structure index -> new record dict.
+        Emits a single change notification for the whole set.
+        """
+        # Collect the changes first: when rows may move, views must be told before the data changes
+        updates = []  # (display row, new record)
+        resort = False
+        sort_key = self._headers[self._sort_column] if 0 <= self._sort_column < len(self._headers) else None
+        for original_index, record in changed_rows.items():
+            display_row = self._display_rows.get(original_index)
+            if display_row is None:
+                continue
+            if sort_key is not None and self._data[display_row].get(sort_key) != record.get(sort_key):
+                resort = True
+            updates.append((display_row, record))
+
+        if not updates:
+            return
+
+        if resort:
+            # A sort key changed, so rows may move: one layout change instead of per-row updates
+            self.layoutAboutToBeChanged.emit()
+            self._store_rows(updates, mark_dirty)
+            self._apply_sort(self._sort_column, self._sort_order)
+            self.layoutChanged.emit()
+        else:
+            self._store_rows(updates, mark_dirty)
+            display_rows = [display_row for display_row, record in updates]
+            left_index = self.index(min(display_rows), 0)
+            right_index = self.index(max(display_rows), self.columnCount() - 1)
+            self.dataChanged.emit(left_index, right_index)
+
+    def _store_rows(self, updates, mark_dirty):
+        # Put new records at their display rows
+        for display_row, record in updates:
+            self._data[display_row] = record
+            if mark_dirty:
+                self._dirty_rows.add(display_row)
+
     def mark_row_dirty(self, row):
         """Mark a row as having unsaved changes"""
         self._dirty_rows.add(row)
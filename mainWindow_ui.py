@@ -41,6 +41,24 @@ class Ui_MainWindow(object):
         self.actionCheckUpdates.setObjectName(u"actionCheckUpdates")
         self.actionQuit_3 = QAction(MainWindow)
         self.actionQuit_3.setObjectName(u"actionQuit_3")
+        self.actionFolderSearch = QAction(MainWindow)
+        self.actionFolderSearch.setObjectName(u"actionFolderSearch")
+        self.actionProfiling = QAction(MainWindow)
+        self.actionProfiling.setObjectName(u"actionProfiling")
+        self.actionProfiling.setCheckable(True)
+        self.actionProfileNext = QAction(MainWindow)
+        self.actionProfileNext.setObjectName(u"actionProfileNext")
+        self.actionSaveProfile = QAction(MainWindow)
+        self.actionSaveProfile.setObjectName(u"actionSaveProfile")
+        self.actionWatchFile = QAction(MainWindow)
+        self.actionWatchFile.setObjectName(u"actionWatchFile")
+        self.actionWatchFile.setCheckable(True)
+        self.actionValidate = QAction(MainWindow)
+        self.actionValidate.setObjectName(u"actionValidate")
+        self.actionStatistics = QAction(MainWindow)
+        self.actionStatistics.setObjectName(u"actionStatistics")
+        self.actionEditScript = QAction(MainWindow)
+        self.actionEditScript.setObjectName(u"actionEditScript")
         self.centralwidget = QWidget(MainWindow)
         self.centralwidget.setObjectName(u"centralwidget")
         self.verticalLayout = QVBoxLayout(self.centralwidget)
@@ -61,6 +79,8 @@ class Ui_MainWindow(object):
         self.menubar.setGeometry(QRect(0, 0, 800, 33))
         self.menuFile = QMenu(self.menubar)
         self.menuFile.setObjectName(u"menuFile")
+        self.menuTools = QMenu(self.menubar)
+        self.menuTools.setObjectName(u"menuTools")
         self.menuHelp = QMenu(self.menubar)
         self.menuHelp.setObjectName(u"menuHelp")
         MainWindow.setMenuBar(self.menubar)
@@ -69,13 +89,24 @@ class Ui_MainWindow(object):
         MainWindow.setStatusBar(self.statusbar)
 
         self.menubar.addAction(self.menuFile.menuAction())
+        self.menubar.addAction(self.menuTools.menuAction())
         self.menubar.addAction(self.menuHelp.menuAction())
         self.menuFile.addAction(self.actionOpen)
         self.menuFile.addAction(self.actionSave)
         self.menuFile.addAction(self.actionQuit_2)
         self.menuFile.addAction(self.actionQuit_3)
+        self.menuTools.addAction(self.actionEditScript)
+        self.menuTools.addAction(self.actionFolderSearch)
+        self.menuTools.addAction(self.actionStatistics)
+        self.menuTools.addAction(self.actionValidate)
+        self.menuTools.addSeparator()
+        self.menuTools.addAction(self.actionWatchFile)
         self.menuHelp.addAction(self.actionInstructions)
         self.menuHelp.addSeparator()
+        self.menuHelp.addAction(self.actionProfiling)
+        self.menuHelp.addAction(self.actionProfileNext)
+        self.menuHelp.addAction(self.actionSaveProfile)
+        self.menuHelp.addSeparator()
         self.menuHelp.addAction(self.actionCheckUpdates)
         self.menuHelp.addAction(self.actionAbout)
 
@@ -103,7 +134,16 @@ class Ui_MainWindow(object):
 #if QT_CONFIG(shortcut)
         self.actionQuit_3.setShortcut(QCoreApplication.translate("MainWindow", u"Ctrl+Q", None))
 #endif // QT_CONFIG(shortcut)
+        self.actionFolderSearch.setText(QCoreApplication.translate("MainWindow", u"Search in Folder...", None))
+        self.actionProfiling.setText(QCoreApplication.translate("MainWindow", u"Profiling", None))
+        self.actionProfileNext.setText(QCoreApplication.translate("MainWindow", u"cProfile Next Action", None))
+        self.actionSaveProfile.setText(QCoreApplication.translate("MainWindow", u"Save Profile Timings...", None))
+        self.actionWatchFile.setText(QCoreApplication.translate("MainWindow", u"Watch File for Changes", None))
+        self.actionValidate.setText(QCoreApplication.translate("MainWindow", u"Validate...", None))
+        self.actionStatistics.setText(QCoreApplication.translate("MainWindow", u"Statistics...", None))
+        self.actionEditScript.setText(QCoreApplication.translate("MainWindow", u"Run Edit Script...", None))
         self.menuFile.setTitle(QCoreApplication.translate("MainWindow", u"File", None))
+        self.menuTools.setTitle(QCoreApplication.translate("MainWindow", u"Tools", None))
         self.menuHelp.setTitle(QCoreApplication.translate("MainWindow", u"Help", None))
     # retranslateUi
 
@@ -0,0 +1,256 @@
+"""Benchmarks of parsing, writing, searching and the main table model, with results saved as JSON
+
+    python r8bench.py -o bench-1.1.0.json                 # synthetic file, see r8synth.py
+    python r8bench.py --file Config.ind --compare bench-1.1.0.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import sys
+import timeit
+
+from r8lib import IndustryFile, Industry, encode_run8string, record_spans
+from r8search import SearchPattern, SearchCorpus, search_values, FIELD_TAG, MODE_EXACT, MODE_SUBSTRING
+from r8synth import SynthSpec, generate
+from version import VERSION
+
+RESULT_FORMAT = 'r8-bench'
+DEFAULT_REPEAT = 5
+DEFAULT_THRESHOLD = 0.10  # Slowdown reported as a regression by --compare
+
+# Registered benchmarks: [(name, setup)]; setup(ctx) returns the function to time
+BENCHMARKS = []
+
+_app = None  # QApplication for the table model benchmarks, created on first use
+
+
+class SkipBenchmark(Exception):
+    """Raised by a setup when the benchmark cannot run here (e.g. PySide6 missing)"""
+
+
+def benchmark(name):
+    def register(setup):
+        BENCHMARKS.append((name, setup))
+        return setup
+    return register
+
+
+class BenchContext:
+    """The file under test, parsed once for the benchmarks that need a loaded IndustryFile"""
+
+    def __init__(self, content, source):
+        self.content = content
+        self.source = source  # File name, or the SynthSpec the content was generated from
+        self.indfile = IndustryFile()
+        self.indfile.from_bytes(content)
+        self.spans = record_spans(content)
+        # Most used tag, and a fragment of it for the substring search
+        counts = self.indfile.tag_index.counts()
+        self.tag = max(counts, key=counts.get) if counts else ''
+        self._rows = None
+
+    def rows(self):
+        if self._rows is None:
+            self._rows = [industry.to_dict() for industry in self.indfile.industries]
+        return self._rows
+
+
+@benchmark('parse file')
+def bench_parse_file(ctx):
+    return lambda: IndustryFile().from_bytes(ctx.content)
+
+
+@benchmark('parse industries')
+def bench_parse_industries(ctx):
+    # Industry records alone, without building the file's indexes
+    def run():
+        for start, end in ctx.spans:
+            Industry(ctx.content, start)
+    return run
+
+
+@benchmark('to_bytes')
+def bench_to_bytes(ctx):
+    return ctx.indfile.to_bytes
+
+
+@benchmark('encode strings')
+def bench_encode(ctx):
+    names = [industry.name for industry in ctx.indfile.industries]
+    return lambda: [encode_run8string(name) for name in names]
+
+
+@benchmark('decode strings')
+def bench_decode(ctx):
+    encoded = [industry.enc_name for industry in ctx.indfile.industries]
+    decode = Industry._decodeString
+    return lambda: [decode(None, enc, 0, len(enc)) for enc in encoded]
+
+
+@benchmark('tag search exact')
+def bench_tag_exact(ctx):
+    pattern = SearchPattern(ctx.tag, MODE_EXACT)
+    tag_index = ctx.indfile.tag_index
+
+    def run():
+        for tag_name in search_values(ctx.indfile, FIELD_TAG, pattern):
+            tag_index.lookup(tag_name)
+    return run
+
+
+@benchmark('tag search substring')
+def bench_tag_substring(ctx):
+    pattern = SearchPattern(ctx.tag[:3], MODE_SUBSTRING, case_sensitive=False)
+    search_values(ctx.indfile, FIELD_TAG, pattern)  # Build the cached search corpus first
+    return lambda: search_values(ctx.indfile, FIELD_TAG, pattern)
+
+
+@benchmark('search corpus build')
+def bench_corpus(ctx):
+    return lambda: SearchCorpus(ctx.indfile)
+
+
+def _table_model():
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    try:
+        from PySide6.QtWidgets import QApplication
+        from mainTable import DictTableModel
+    except ImportError as e:
+        raise SkipBenchmark(f'PySide6 is not available [{e}]')
+    global _app
+    if _app is None:
+        _app = QApplication.instance() or QApplication([])
+    return DictTableModel()
+
+
+@benchmark('model update_data')
+def bench_update_data(ctx):
+    model = _table_model()
+    rows = ctx.rows()
+    return lambda: model.update_data(rows)
+
+
+@benchmark('model sort')
+def bench_sort(ctx):
+    model = _table_model()
+    from PySide6.QtCore import Qt
+    model.update_data(ctx.rows())
+    columns = [0, 2, 1]  # Name, local name, symbol
+    orders = [Qt.SortOrder.AscendingOrder, Qt.SortOrder.DescendingOrder]
+    calls = [0]
+
+    def run():
+        # A different column each call, so no call sorts data that is already in order
+        n = calls[0]
+        calls[0] += 1
+        model.sort(columns[n % len(columns)], orders[n // len(columns) % 2])
+    return run
+
+
+def time_benchmark(func, repeat):
+    """Return {number, repeat, best_s, median_s} for func, timed with timeit"""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    times = [t / number for t in timer.repeat(repeat, number)]
+    return {'number': number, 'repeat': repeat, 'best_s': min(times), 'median_s': statistics.median(times)}
+
+
+def run_benchmarks(ctx, names=None, repeat=DEFAULT_REPEAT, out=sys.stderr):
+    """Run the selected benchmarks; returns {name: result}, with {'skipped': reason} for skipped ones"""
+    results = dict()
+    for name, setup in BENCHMARKS:
+        if names and name not in names:
+            continue
+        try:
+            func = setup(ctx)
+        except SkipBenchmark as e:
+            results[name] = {'skipped': str(e)}
+            print(f'{name:<22} skipped: {e}', file=out)
+            continue
+        results[name] = result = time_benchmark(func, repeat)
+        print(f'{name:<22} {result["best_s"] * 1000:>10.2f} ms  (median {result["median_s"] * 1000:.2f} ms, '
+              f'{result["number"]} x {repeat})', file=out)
+    return results
+
+
+def result_document(ctx, results):
+    source = ctx.source.to_dict() if isinstance(ctx.source, SynthSpec) else {'file': ctx.source}
+    return {
+        'format': RESULT_FORMAT,
+        'version': VERSION,
+        'date': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'source': source,
+        'industries': ctx.indfile.num_rec,
+        'bytes': len(ctx.content),
+        'results': results,
+    }
+
+
+def compare(old, new, threshold=DEFAULT_THRESHOLD):
+    """Return printable lines comparing two result documents, and the names that got slower than threshold"""
+    lines = [f'{"Benchmark":<22} {"Before":>11} {"After":>11} {"Change":>8}']
+    regressions = []
+    for name, result in new['results'].items():
+        before = old['results'].get(name, {})
+        if 'best_s' not in result or 'best_s' not in before:
+            continue
+        change = result['best_s'] / before['best_s'] - 1
+        if change > threshold:
+            regressions.append(name)
+        lines.append(f'{name:<22} {before["best_s"] * 1000:>8.2f} ms {result["best_s"] * 1000:>8.2f} ms '
+                     f'{change:>+8.1%}{"  SLOWER" if name in regressions else ""}')
+    if old.get('source') != new.get('source'):
+        lines.append('Note: the two runs used different input files')
+    return lines, regressions
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='r8bench', description='Time parsing, writing, searching and the table '
+                                                                 'model, on a real or a synthetic industry file.')
+    parser.add_argument('--file', help='industry file to benchmark (default: a synthetic one)')
+    parser.add_argument('-n', '--industries', type=int, default=5000, help='industries of the synthetic file')
+    parser.add_argument('-p', '--producers', type=float, default=3)
+    parser.add_argument('-t', '--tags', type=float, default=4)
+    parser.add_argument('-v', '--vocabulary', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('-b', '--benchmark', action='append', choices=[name for name, setup in BENCHMARKS],
+                        help='run only this benchmark (repeatable)')
+    parser.add_argument('-r', '--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('-o', '--output', help='write the results to this JSON file')
+    parser.add_argument('--compare', metavar='JSON', help='compare with the results of an earlier run')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='slowdown counted as a regression by --compare (default: %(default)s)')
+    return parser
+
+
+def main(argv=None):
+    """Run the benchmarks; exit code 1 when --compare found a regression"""
+    args = build_parser().parse_args(argv)
+    if args.file:
+        with open(args.file, 'rb') as ifp:
+            ctx = BenchContext(ifp.read(), args.file)
+    else:
+        spec = SynthSpec(args.industries, args.producers, args.tags, args.vocabulary, seed=args.seed)
+        ctx = BenchContext(generate(spec), spec)
+    print(f'{ctx.indfile.num_rec} industries, {len(ctx.content)} bytes, Python {platform.python_version()}',
+          file=sys.stderr)
+    document = result_document(ctx, run_benchmarks(ctx, args.benchmark, args.repeat))
+    if args.output:
+        with open(args.output, 'w') as ofp:
+            json.dump(document, ofp, indent=2)
+    if args.compare:
+        with open(args.compare) as ifp:
+            lines, regressions = compare(json.load(ifp), document, args.threshold)
+        for line in lines:
+            print(line)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
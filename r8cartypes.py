@@ -0,0 +1,93 @@
+import csv
+import os
+
+CARFILE = 'r8CarTypes.csv'
+UNKNOWN = 'Unknown'  # Name shown for car type IDs missing from the csv
+SLOTS = 256  # A producer's car type (bIndex) is one byte
+
+
+class CarTypeRegistry:
+    """Car type names looked up by the byte value of a producer's bIndex
+
+    Names and their lowercase sort keys sit in arrays indexed by ID, with a
+    reverse index for looking an ID up by name. IDs missing from the csv, or
+    outside 0-255, are named UNKNOWN instead of failing.
+    """
+
+    def __init__(self, entries=()):
+        self._names = [UNKNOWN] * SLOTS
+        self._sort_keys = [UNKNOWN.lower()] * SLOTS
+        self._known = [False] * SLOTS
+        self._ids = dict()  # lowercase name -> ID
+        for bIndex, name in entries:
+            self.add(bIndex, name)
+
+    @classmethod
+    def from_csv(cls, path):
+        """Read "ID,name" rows of a car types csv; rows without a numeric ID (the header) are skipped"""
+        registry = cls()
+        with open(path, mode='r', newline='') as ifp:
+            for row in csv.reader(ifp):
+                if len(row) > 1 and row[0].strip().isdigit():
+                    registry.add(int(row[0]), row[1].strip())
+        return registry
+
+    def add(self, bIndex, name):
+        if not 0 <= bIndex < SLOTS:
+            raise ValueError(f'car type ID {bIndex} is not between 0 and {SLOTS - 1}')
+        self._names[bIndex] = name
+        self._sort_keys[bIndex] = name.lower()
+        self._known[bIndex] = True
+        self._ids.setdefault(name.lower(), bIndex)
+
+    def name(self, bIndex):
+        return self._names[bIndex] if 0 <= bIndex < SLOTS else UNKNOWN
+
+    def label(self, bIndex):
+        # Name and ID as shown in reports, e.g. "Box Car (5)"
+        return f'{self.name(bIndex)} ({bIndex})'
+
+    def sort_key(self, bIndex):
+        return self._sort_keys[bIndex] if 0 <= bIndex < SLOTS else UNKNOWN.lower()
+
+    def lookup(self, name):
+        """Return the ID of a car type name (any case), or None"""
+        return self._ids.get(name.strip().lower())
+
+    def ids(self):
+        return [bIndex for bIndex in range(SLOTS) if self._known[bIndex]]
+
+    def __contains__(self, bIndex):
+        return 0 <= bIndex < SLOTS and self._known[bIndex]
+
+    def __len__(self):
+        return sum(self._known)
+
+    def __iter__(self):
+        # (ID, name) of the known car types, by ID
+        return ((bIndex, self._names[bIndex]) for bIndex in self.ids())
+
+
+NO_CAR_TYPES = CarTypeRegistry()  # Used when no registry is passed: every ID is UNKNOWN
+
+_loaded = dict()  # path -> CarTypeRegistry
+
+
+def default_carfile():
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), CARFILE)
+
+
+def load_car_types(path=None):
+    """Return the registry of a car types csv, read once and shared by every caller
+
+    A missing or unreadable file gives an empty registry, so all IDs show as UNKNOWN.
+    """
+    path = os.path.abspath(path or default_carfile())
+    registry = _loaded.get(path)
+    if registry is None:
+        try:
+            registry = CarTypeRegistry.from_csv(path)
+        except (OSError, ValueError):
+            registry = CarTypeRegistry()
+        _loaded[path] = registry
+    return registry
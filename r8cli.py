@@ -0,0 +1,499 @@
+import argparse
+import os
+import struct
+import sys
+import time
+
+from r8cartypes import load_car_types, default_carfile
+from r8diff import diff_files
+from r8edit import plan_script
+from r8export import export, export_file, read_json, FORMATS, LEVELS, LEVEL_INDUSTRY
+from r8lib import IndustryFile
+from r8memory import measure, TOP_LINES
+from r8patch import make_patch, read_patch, apply_patch
+from r8profile import PROFILER, PHASE_READ
+from r8stats import IndustryStats
+from r8validate import validate, get_validation, update_validation
+from r8watch import FileWatcher, reload_file, POLL_INTERVAL
+
+# Exit codes of the command line interface
+EXIT_OK = 0
+EXIT_NO_MATCH = 1  # Nothing matched (like grep), nothing was written; diff found differences
+EXIT_ERROR = 2  # Bad arguments or a file that could not be read, parsed or written
+EXIT_INVALID = 3  # validate found errors (or warnings with --strict)
+
+STDIO = '-'  # File name standing for stdin / stdout
+
+
+class CliError(Exception):
+    """An error reported on stderr that ends the command with EXIT_ERROR"""
+
+
+def _read_bytes(path):
+    # Bytes of a file, or of stdin for '-'; raises OSError
+    with PROFILER.phase(PHASE_READ):
+        if path == STDIO:
+            return sys.stdin.buffer.read()
+        with open(path, mode='rb') as ifp:
+            return ifp.read()
+
+
+def read_ind(path):
+    """Return the bytes of an industry file, or of stdin for '-'"""
+    try:
+        return _read_bytes(path)
+    except OSError as e:
+        raise CliError(f'{path}: could not be read [{e.strerror}]')
+
+
+def load_ind(path):
+    """Parse an industry file into a new IndustryFile"""
+    fcontent = read_ind(path)
+    indfile = IndustryFile()
+    try:
+        indfile.from_bytes(fcontent)
+    except (ValueError, IndexError, struct.error, UnicodeDecodeError) as e:
+        raise CliError(f'{path}: not a valid industry file [{e}]')
+    return indfile
+
+
+def write_ind(indfile, path):
+    """Write an IndustryFile to path, or to stdout for '-'"""
+    content = indfile.to_bytes()
+    try:
+        if path == STDIO:
+            sys.stdout.buffer.write(content)
+            sys.stdout.buffer.flush()
+        else:
+            with open(path, mode='wb') as ofp:
+                ofp.write(content)
+    except OSError as e:
+        raise CliError(f'{path}: could not be written [{e.strerror}]')
+
+
+def report_stream(args):
+    # Keep stdout clean for the file itself when it is written there
+    return sys.stderr if getattr(args, 'output', None) == STDIO else sys.stdout
+
+
+def save_changes(indfile, args, changed, out):
+    """Write the edited file to --output or back to the input with --in-place"""
+    if not changed:
+        print('No matches - file not written', file=sys.stderr)
+        return EXIT_NO_MATCH
+    if args.in_place:
+        if args.file == STDIO:
+            raise CliError('--in-place cannot be used when reading stdin')
+        output = args.file
+    else:
+        output = args.output
+    if output is None:
+        print('Dry run - use --output or --in-place to write the changes', file=out)
+        return EXIT_OK
+    write_ind(indfile, output)
+    if output != STDIO:
+        print(f'Wrote {output}', file=out)
+    return EXIT_OK
+
+
+def cmd_list(args, cartypes):
+    indfile = load_ind(args.file)
+    if args.what == 'industries':
+        for c, industry in enumerate(indfile.industries):
+            print(f'{c}\t{industry.name}\t{industry.local_name}\t{industry.trk_sym}')
+    elif args.what == 'locals':
+        for local_name in sorted(indfile.local_index.values(), key=str.lower):
+            print(f'{local_name}\t{indfile.local_index.count(local_name)}')
+    elif args.what == 'tags':
+        tag_counts = indfile.tag_index.counts()
+        for tag_name in sorted(tag_counts, key=str.lower):
+            print(f'{tag_name}\t{tag_counts[tag_name]}')
+    return EXIT_OK
+
+
+def cmd_show(args, cartypes):
+    indfile = load_ind(args.file)
+    records = args.records if args.records else range(len(indfile.industries))
+    for rnum in records:
+        if not 0 <= rnum < len(indfile.industries):
+            raise CliError(f'{args.file}: no record {rnum} (file has {len(indfile.industries)})')
+        print(f'--- Record[{rnum}] ---')
+        indfile.industries[rnum].printAttrs(cartypes)
+    return EXIT_OK
+
+
+def cmd_replace_local(args, cartypes):
+    indfile = load_ind(args.file)
+    out = report_stream(args)
+    matches = indfile.find('local_name', args.old)
+    with indfile.batch():
+        for industry in matches:
+            print(f'Replacing local name {args.old} in rec[{indfile.position(industry)}] '
+                  f'(ind: {industry.name}) with {args.new}', file=out)
+            industry.replaceLocalName(args.new)
+    return save_changes(indfile, args, len(matches), out)
+
+
+def cmd_replace_tag(args, cartypes):
+    indfile = load_ind(args.file)
+    out = report_stream(args)
+    matches = indfile.tag_index.lookup(args.old)
+    with indfile.batch():
+        for producer in dict.fromkeys(producer for industry, producer, tag_pos in matches):
+            producer.replaceTag(args.old, args.new)
+    print(f'{"Replaced" if args.new else "Deleted"} {len(matches)} occurrences of {args.old}', file=out)
+    return save_changes(indfile, args, len(matches), out)
+
+
+def cmd_export(args, cartypes):
+    indfile = load_ind(args.file)
+    if args.output in (None, STDIO):
+        export(indfile, sys.stdout, args.format, args.level, cartypes)
+        return EXIT_OK
+    try:
+        export_file(indfile, args.output, args.format, args.level, cartypes)
+    except OSError as e:
+        raise CliError(f'{args.output}: could not be written [{e.strerror}]')
+    print(f'Wrote {args.output}', file=sys.stderr)
+    return EXIT_OK
+
+
+def cmd_import(args, cartypes):
+    try:
+        if args.file == STDIO:
+            indfile = read_json(sys.stdin)
+        else:
+            with open(args.file, mode='r', encoding='utf-8') as fp:
+                indfile = read_json(fp)
+    except OSError as e:
+        raise CliError(f'{args.file}: could not be read [{e.strerror}]')
+    except ValueError as e:
+        raise CliError(f'{args.file}: {e}')
+    write_ind(indfile, args.output)
+    if args.output != STDIO:
+        print(f'Wrote {args.output} ({indfile.num_rec} records)', file=sys.stderr)
+    return EXIT_OK
+
+
+def cmd_stats(args, cartypes):
+    for line in IndustryStats(load_ind(args.file)).report(cartypes):
+        print(line)
+    return EXIT_OK
+
+
+def cmd_validate(args, cartypes):
+    result = EXIT_OK
+    for path in args.files:
+        try:
+            fcontent = _read_bytes(path)
+        except OSError as e:
+            print(f'{path}: INVALID - could not be read [{e.strerror}]')
+            result = EXIT_INVALID
+            continue
+        indfile = IndustryFile()
+        try:
+            indfile.from_bytes(fcontent)
+        except (ValueError, IndexError, struct.error, UnicodeDecodeError) as e:
+            print(f'{path}: INVALID - could not be parsed [{e}]')
+            result = EXIT_INVALID
+            continue
+        # Writing may normalise legacy files (e.g. space-separated tags), so the bytes can differ;
+        # what is written must read back as the same industries
+        written = bytes(indfile.to_bytes())
+        reparsed = IndustryFile()
+        try:
+            reparsed.from_bytes(written)
+        except ValueError as e:
+            print(f'{path}: INVALID - the written file could not be parsed again [{e}]')
+            result = EXIT_INVALID
+            continue
+        if diff_files(indfile, reparsed):
+            print(f'{path}: INVALID - does not survive a read/write round trip')
+            result = EXIT_INVALID
+            continue
+        normalised = written != fcontent
+        report = validate(indfile, cartypes)
+        if not args.summary:
+            if normalised:
+                print(f'{path}: Warning: writing the file changes its bytes (legacy records are normalised)')
+            for line in report.report():
+                print(f'{path}: {line}')
+        failed = report.errors() or (args.strict and (report.warnings() or normalised))
+        print(f'{path}: {"INVALID" if failed else "OK"} ({indfile.num_rec} records, {report.summary()}'
+              f'{", not byte-exact on writing" if normalised else ""})')
+        if failed:
+            result = EXIT_INVALID
+    return result
+
+
+def cmd_memory(args, cartypes):
+    try:
+        report = measure(read_ind(args.file), args.top)
+    except (ValueError, IndexError, struct.error, UnicodeDecodeError) as e:
+        raise CliError(f'{args.file}: not a valid industry file [{e}]')
+    for line in report.report():
+        print(line)
+    if args.json:
+        try:
+            report.dump_json(args.json)
+        except OSError as e:
+            raise CliError(f'{args.json}: could not be written [{e.strerror}]')
+    return EXIT_OK
+
+
+def cmd_watch(args, cartypes):
+    if args.file == STDIO:
+        raise CliError('watch needs a file name')
+    indfile = load_ind(args.file)
+    report = get_validation(indfile, cartypes)
+    print(f'Watching {args.file} ({indfile.num_rec} records, {report.summary()}) - press Ctrl+C to stop', flush=True)
+    watcher = FileWatcher(args.file)
+    try:
+        while True:
+            time.sleep(args.interval)
+            if not watcher.changed():
+                continue
+            started = time.perf_counter()
+            try:
+                result = reload_file(indfile, args.file)
+            except (OSError, ValueError) as e:
+                # Often a file still being written; it is read again when it changes next
+                print(f'{args.file}: could not be reloaded [{e}]', file=sys.stderr, flush=True)
+                continue
+            report = update_validation(indfile, result, cartypes)
+            elapsed = (time.perf_counter() - started) * 1000
+            print(f'{time.strftime("%H:%M:%S")} {args.file}: {result.summary()} in {elapsed:.0f} ms; '
+                  f'{indfile.num_rec} records, {report.summary()}')
+            for position, industry in result.added:
+                for issue in report.by_industry.get(industry, ()):
+                    print(f'    {issue}')
+            sys.stdout.flush()
+    except KeyboardInterrupt:
+        return EXIT_OK
+
+
+def cmd_diff(args, cartypes):
+    if args.old == STDIO and args.new == STDIO:
+        raise CliError('only one file can be read from stdin')
+    file_diff = diff_files(load_ind(args.old), load_ind(args.new))
+    if not args.summary:
+        for line in file_diff.report(cartypes):
+            print(line)
+    print(file_diff.summary())
+    return EXIT_NO_MATCH if file_diff else EXIT_OK
+
+
+def cmd_make_patch(args, cartypes):
+    if args.base == STDIO and args.new == STDIO:
+        raise CliError('only one file can be read from stdin')
+    try:
+        patch, file_diff = make_patch(read_ind(args.base), read_ind(args.new))
+    except ValueError as e:
+        raise CliError(str(e))
+    content = patch.to_bytes()
+    out = report_stream(args)
+    try:
+        if args.output == STDIO:
+            sys.stdout.buffer.write(content)
+            sys.stdout.buffer.flush()
+        else:
+            with open(args.output, mode='wb') as ofp:
+                ofp.write(content)
+    except OSError as e:
+        raise CliError(f'{args.output}: could not be written [{e.strerror}]')
+    print(file_diff.summary(), file=out)
+    print(f'Patch: {patch.summary()} records, {len(content)} bytes', file=out)
+    return EXIT_OK if file_diff else EXIT_NO_MATCH
+
+
+def cmd_apply_patch(args, cartypes):
+    if args.output is None and not args.in_place:
+        raise CliError('apply-patch needs --output or --in-place')
+    if args.base == STDIO and (args.patch == STDIO or args.in_place):
+        raise CliError('the base file cannot be read from stdin here')
+    base = read_ind(args.base)
+    try:
+        patch = read_patch(read_ind(args.patch))
+    except ValueError as e:
+        raise CliError(f'{args.patch}: {e}')
+    output = args.base if args.in_place else args.output
+    try:
+        if output == STDIO:
+            apply_patch(base, patch, sys.stdout.buffer)
+            sys.stdout.buffer.flush()
+        else:
+            # Written next to the output first, so a failed patch leaves the output as it was
+            partial = output + '.partial'
+            try:
+                with open(partial, mode='wb') as ofp:
+                    apply_patch(base, patch, ofp)
+                os.replace(partial, output)
+            finally:
+                if os.path.exists(partial):
+                    os.remove(partial)
+    except ValueError as e:
+        raise CliError(f'{args.patch}: {e}')
+    except OSError as e:
+        raise CliError(f'{output}: could not be written [{e.strerror}]')
+    if output != STDIO:
+        print(f'Wrote {output} ({patch.summary()} records)', file=report_stream(args))
+    return EXIT_OK
+
+
+def cmd_write(args, cartypes):
+    if args.output is None and not args.in_place:
+        raise CliError('write needs --output or --in-place')
+    indfile = load_ind(args.file)
+    out = report_stream(args)
+    if args.script:
+        try:
+            plan = plan_script(indfile, args.script, cartypes)
+        except (OSError, ValueError) as e:
+            raise CliError(f'Could not read edit script {args.script} [{e}]')
+        for line in plan.summary():
+            print(line, file=out)
+        changed = plan.apply()
+        print(f'Applied {changed} changes', file=out)
+    # A plain write re-serialises the file even without changes
+    return save_changes(indfile, args, True, out)
+
+
+def add_output_options(parser):
+    parser.add_argument('-o', '--output', help="file to write the result to ('-' for stdout)")
+    parser.add_argument('-i', '--in-place', action='store_true', help='overwrite the input file')
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='r8industryUtility',
+        description="Run 8 industry file utility. Use '-' as a file name to read stdin or write stdout. "
+                    "Without a command the interactive prompt is started.")
+    parser.add_argument('--cartypes', default=default_carfile(), help='car types csv (default: %(default)s)')
+    parser.add_argument('--profile', action='store_true', help='print the time spent per phase on stderr')
+    parser.add_argument('--profile-json', metavar='FILE', help='write the phase timings to a JSON file')
+    parser.add_argument('--cprofile', action='store_true', help='run the command under cProfile and print the '
+                                                                 'slowest functions on stderr')
+    commands = parser.add_subparsers(dest='command', metavar='command')
+    commands.required = True
+
+    p = commands.add_parser('list', help='list industries, local names or processed tags (tab separated)')
+    p.add_argument('file')
+    p.add_argument('what', nargs='?', choices=['industries', 'locals', 'tags'], default='industries')
+    p.set_defaults(func=cmd_list)
+
+    p = commands.add_parser('show', help='print the contents of industry records')
+    p.add_argument('file')
+    p.add_argument('records', nargs='*', type=int, help='record numbers (default: all)')
+    p.set_defaults(func=cmd_show)
+
+    p = commands.add_parser('replace-local', help='replace local name OLD with NEW')
+    p.add_argument('file')
+    p.add_argument('old')
+    p.add_argument('new')
+    add_output_options(p)
+    p.set_defaults(func=cmd_replace_local)
+
+    p = commands.add_parser('replace-tag', help='replace processed tag OLD with NEW (omit NEW to delete)')
+    p.add_argument('file')
+    p.add_argument('old')
+    p.add_argument('new', nargs='?', default='')
+    add_output_options(p)
+    p.set_defaults(func=cmd_replace_tag)
+
+    p = commands.add_parser('export', help='export one industry or producer per line, or a JSON document')
+    p.add_argument('file')
+    p.add_argument('-f', '--format', choices=FORMATS, default='ndjson',
+                   help='json keeps everything needed to import the file again (default: %(default)s)')
+    p.add_argument('-l', '--level', choices=LEVELS, default=LEVEL_INDUSTRY,
+                   help='one line per industry or per producer for ndjson/csv (default: %(default)s)')
+    p.add_argument('-o', '--output', help="file to write to (default: stdout)")
+    p.set_defaults(func=cmd_export)
+
+    p = commands.add_parser('import', help='write the .ind file of a JSON export')
+    p.add_argument('file', help="JSON export ('-' for stdin)")
+    p.add_argument('-o', '--output', required=True, help="file to write to ('-' for stdout)")
+    p.set_defaults(func=cmd_import)
+
+    p = commands.add_parser('stats', help='print statistics per local, per car type and per tag')
+    p.add_argument('file')
+    p.set_defaults(func=cmd_stats)
+
+    p = commands.add_parser('memory', help='load a file under tracemalloc and report the memory held per record type')
+    p.add_argument('file')
+    p.add_argument('--top', type=int, default=TOP_LINES, help='source lines listed by allocated size (default: %(default)s)')
+    p.add_argument('--json', metavar='FILE', help='also save the report as JSON')
+    p.set_defaults(func=cmd_memory)
+
+    p = commands.add_parser('validate', help='check that files parse, write back unchanged and pass the validation rules')
+    p.add_argument('files', nargs='+')
+    p.add_argument('--strict', action='store_true', help='fail on warnings as well as errors')
+    p.add_argument('--summary', action='store_true', help='only print one line per file')
+    p.set_defaults(func=cmd_validate)
+
+    p = commands.add_parser('diff', help='compare two files industry by industry (exit code 1 if they differ)')
+    p.add_argument('old')
+    p.add_argument('new')
+    p.add_argument('--summary', action='store_true', help='only print the counts')
+    p.set_defaults(func=cmd_diff)
+
+    p = commands.add_parser('make-patch', help='write a record-level patch turning BASE into NEW (exit code 1 if they are equal)')
+    p.add_argument('base')
+    p.add_argument('new')
+    p.add_argument('-o', '--output', required=True, help="patch file to write ('-' for stdout)")
+    p.set_defaults(func=cmd_make_patch)
+
+    p = commands.add_parser('apply-patch', help='apply a patch from make-patch to the file it was made from')
+    p.add_argument('base')
+    p.add_argument('patch')
+    add_output_options(p)
+    p.set_defaults(func=cmd_apply_patch)
+
+    p = commands.add_parser('watch', help='reload a file whenever it changes on disk and report new problems')
+    p.add_argument('file')
+    p.add_argument('--interval', type=float, default=POLL_INTERVAL, help='seconds between checks (default: %(default)s)')
+    p.set_defaults(func=cmd_watch)
+
+    p = commands.add_parser('write', help='write a file, optionally after applying an edit script')
+    p.add_argument('file')
+    p.add_argument('-s', '--script', help='edit script (.csv or .json) to apply first')
+    add_output_options(p)
+    p.set_defaults(func=cmd_write)
+    return parser
+
+
+def main(argv=None):
+    """Run one command line command and return its exit code"""
+    args = build_parser().parse_args(argv)
+    if getattr(args, 'output', None) is not None and getattr(args, 'in_place', False):
+        print('error: --output and --in-place cannot be combined', file=sys.stderr)
+        return EXIT_ERROR
+    PROFILER.enabled = args.profile or args.profile_json is not None
+    PROFILER.profile_next(args.cprofile)
+    try:
+        with PROFILER.action(args.command):
+            return args.func(args, load_car_types(args.cartypes))
+    except CliError as e:
+        print(f'error: {e}', file=sys.stderr)
+        return EXIT_ERROR
+    except BrokenPipeError:
+        # Output piped into head etc. was closed early: point stdout at devnull so
+        # flushing it at exit does not fail again; stderr stays open for --profile
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return EXIT_OK
+    finally:
+        report_profile(args)
+
+
+def report_profile(args):
+    """Print and save what --profile, --profile-json and --cprofile collected"""
+    if args.profile:
+        for line in PROFILER.report():
+            print(line, file=sys.stderr)
+    if args.cprofile and PROFILER.last_cprofile:
+        print(PROFILER.last_cprofile, file=sys.stderr)
+    if args.profile_json is not None:
+        try:
+            PROFILER.dump_json(args.profile_json)
+        except OSError as e:
+            print(f'error: {args.profile_json}: could not be written [{e.strerror}]', file=sys.stderr)
@@ -0,0 +1,163 @@
+from collections import Counter, deque
+
+from r8cartypes import NO_CAR_TYPES
+
+# Fields compared by a diff, with the labels used in reports (industries are matched by name)
+INDUSTRY_FIELDS = [('local_name', 'Local name'), ('trk_sym', 'Symbol'),
+                   ('process_in_blocks', 'Process in blocks')]
+PRODUCER_FIELDS = [('rec_type', 'Record type'), ('produce_empties', 'Produce empties'),
+                   ('proc_hours', 'Hours'), ('capacity', 'Capacity')]
+
+
+def pair_by(old_items, new_items, key):
+    """Match two lists by key with a hash join
+
+    Items sharing a key are paired in order. Returns ([(old, new)], [unmatched old], [unmatched new]),
+    each in the order of its input list.
+    """
+    waiting = dict()  # key -> deque of new items not yet paired, in order
+    for item in new_items:
+        waiting.setdefault(key(item), deque()).append(item)
+    pairs = []
+    removed = []
+    paired = set()
+    for item in old_items:
+        candidates = waiting.get(key(item))
+        if candidates:
+            match = candidates.popleft()
+            pairs.append((item, match))
+            paired.add(id(match))
+        else:
+            removed.append(item)
+    added = [item for item in new_items if id(item) not in paired]
+    return pairs, removed, added
+
+
+class ProducerDiff:
+    """Differences between two producers of the same car type"""
+
+    def __init__(self, bIndex, fields, tags_added, tags_removed, filters_changed):
+        self.bIndex = bIndex
+        self.fields = fields  # [(label, old value, new value)]
+        self.tags_added = tags_added
+        self.tags_removed = tags_removed
+        self.filters_changed = filters_changed
+
+    def __bool__(self):
+        return bool(self.fields or self.tags_added or self.tags_removed or self.filters_changed)
+
+
+class IndustryDiff:
+    """Differences between two industries with the same name"""
+
+    def __init__(self, old, new, old_position, new_position):
+        self.old = old
+        self.new = new
+        self.old_position = old_position
+        self.new_position = new_position
+        self.fields = []  # [(label, old value, new value)]
+        self.tracks_changed = False
+        self.producers_added = []
+        self.producers_removed = []
+        self.producers_changed = []  # [ProducerDiff]
+
+    def __bool__(self):
+        return bool(self.fields or self.tracks_changed or self.producers_added
+                    or self.producers_removed or self.producers_changed)
+
+
+def diff_producers(old, new):
+    fields = [(label, getattr(old, attr), getattr(new, attr)) for attr, label in PRODUCER_FIELDS
+              if getattr(old, attr) != getattr(new, attr)]
+    old_tags = Counter(tag.name for tag in old.tags)
+    new_tags = Counter(tag.name for tag in new.tags)
+    tags_added = sorted((new_tags - old_tags).elements())
+    tags_removed = sorted((old_tags - new_tags).elements())
+    filters_changed = [f.name for f in old.filter] != [f.name for f in new.filter]
+    return ProducerDiff(old.bIndex, fields, tags_added, tags_removed, filters_changed)
+
+
+def diff_industries(old, new, old_position=-1, new_position=-1):
+    """Return the IndustryDiff of two industries (empty when they are equal)"""
+    result = IndustryDiff(old, new, old_position, new_position)
+    result.fields = [(label, getattr(old, attr), getattr(new, attr)) for attr, label in INDUSTRY_FIELDS
+                     if getattr(old, attr) != getattr(new, attr)]
+    result.tracks_changed = [t.to_bytes() for t in old.track] != [t.to_bytes() for t in new.track]
+    pairs, removed, added = pair_by(old.producer, new.producer, lambda prod: prod.bIndex)
+    result.producers_removed = removed
+    result.producers_added = added
+    for old_prod, new_prod in pairs:
+        change = diff_producers(old_prod, new_prod)
+        if change:
+            result.producers_changed.append(change)
+    return result
+
+
+class FileDiff:
+    """Structural differences between two IndustryFiles, matching industries by name"""
+
+    def __init__(self, old_file, new_file):
+        self.old_file = old_file
+        self.new_file = new_file
+        self.added = []  # industries only in new_file
+        self.removed = []  # industries only in old_file
+        self.changed = []  # [IndustryDiff]
+        self.unchanged = 0
+        self._compare()
+
+    def _compare(self):
+        pairs, self.removed, self.added = pair_by(self.old_file.industries, self.new_file.industries,
+                                                  lambda industry: industry.name)
+        for old, new in pairs:
+            # Records with identical bytes are equal; skip comparing them field by field
+            if old.content_hash() == new.content_hash():
+                self.unchanged += 1
+                continue
+            change = diff_industries(old, new, self.old_file.position(old), self.new_file.position(new))
+            if change:
+                self.changed.append(change)
+            else:
+                self.unchanged += 1
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed)
+
+    def summary(self):
+        return (f'{len(self.added)} added, {len(self.removed)} removed, {len(self.changed)} changed, '
+                f'{self.unchanged} unchanged industries')
+
+    def report(self, cartypes=None):
+        """Return the differences as printable lines"""
+        car_name = (cartypes or NO_CAR_TYPES).label
+
+        lines = []
+        for industry in self.removed:
+            lines.append(f'- rec[{self.old_file.position(industry)}] {industry.name}')
+        for industry in self.added:
+            lines.append(f'+ rec[{self.new_file.position(industry)}] {industry.name}')
+        for change in self.changed:
+            lines.append(f'~ rec[{change.old_position}] -> rec[{change.new_position}] {change.old.name}')
+            for label, old_value, new_value in change.fields:
+                lines.append(f'    {label}: {old_value} -> {new_value}')
+            if change.tracks_changed:
+                lines.append(f'    Tracks changed ({change.old.number_of_tracks} -> {change.new.number_of_tracks} segments)')
+            for prod in change.producers_removed:
+                lines.append(f'    - {car_name(prod.bIndex)}: {prod.returnTags()}')
+            for prod in change.producers_added:
+                lines.append(f'    + {car_name(prod.bIndex)}: {prod.returnTags()}')
+            for prod in change.producers_changed:
+                lines.append(f'    ~ {car_name(prod.bIndex)}')
+                for label, old_value, new_value in prod.fields:
+                    lines.append(f'        {label}: {old_value} -> {new_value}')
+                if prod.tags_removed:
+                    lines.append(f'        - tags: {", ".join(prod.tags_removed)}')
+                if prod.tags_added:
+                    lines.append(f'        + tags: {", ".join(prod.tags_added)}')
+                if prod.filters_changed:
+                    lines.append('        filters changed')
+        return lines
+
+
+def diff_files(old_file, new_file):
+    """Return the FileDiff of two IndustryFiles"""
+    return FileDiff(old_file, new_file)
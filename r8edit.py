@@ -0,0 +1,240 @@
+import csv
+import json
+import os
+
+from r8cartypes import NO_CAR_TYPES, SLOTS
+from r8search import SearchPattern, search_values, MODE_WILDCARD, FIELD_NAME
+
+# Operations understood by an edit script
+OP_RENAME_LOCAL = 'rename_local'
+OP_REPLACE_TAG = 'replace_tag'
+OP_DELETE_TAG = 'delete_tag'
+OP_SET_CAPACITY = 'set_capacity'
+OP_SET_HOURS = 'set_hours'
+OPS = [OP_RENAME_LOCAL, OP_REPLACE_TAG, OP_DELETE_TAG, OP_SET_CAPACITY, OP_SET_HOURS]
+
+# Columns of a CSV script (keys of a JSON script entry)
+SCRIPT_FIELDS = ['op', 'find', 'replace', 'car_type', 'industry']
+
+# Capacity and processing hours are stored as 4-byte signed ints
+VALUE_MIN = -(1 << 31)
+VALUE_MAX = (1 << 31) - 1
+
+
+class EditRule:
+    """One operation of an edit script
+
+    rename_local / replace_tag : find -> replace
+    delete_tag                 : find
+    set_capacity / set_hours   : replace is the new value, applied to producers of
+                                 car_type at industries whose name matches the
+                                 industry wildcard (all industries when blank)
+    """
+
+    def __init__(self, op, find='', replace='', car_type='', industry='', where=''):
+        self.op = op.strip().lower()
+        self.find = find
+        self.replace = replace
+        self.car_type = car_type
+        self.industry = industry or '*'
+        self.where = where  # Location in the script, for error messages
+        self.matched = 0  # Records changed by this rule
+
+    def __str__(self):
+        if self.op in (OP_RENAME_LOCAL, OP_REPLACE_TAG):
+            return f'{self.op} {self.find} -> {self.replace}'
+        if self.op == OP_DELETE_TAG:
+            return f'{self.op} {self.find}'
+        return f'{self.op} {self.replace} for car type {self.car_type} at {self.industry}'
+
+    def validate(self, cartypes=None):
+        # Raise ValueError naming the rule's place in the script when it cannot be applied
+        where = f'{self.where}: ' if self.where else ''
+        if self.op not in OPS:
+            raise ValueError(f'{where}unknown operation "{self.op}" (expected one of {", ".join(OPS)})')
+        if self.op in (OP_RENAME_LOCAL, OP_REPLACE_TAG, OP_DELETE_TAG) and not self.find:
+            raise ValueError(f'{where}{self.op} needs a "find" value')
+        if self.op == OP_RENAME_LOCAL and not self.replace:
+            raise ValueError(f'{where}{self.op} needs a "replace" value')
+        if self.op == OP_REPLACE_TAG and (not self.replace or ' ' in self.replace or ',' in self.replace):
+            raise ValueError(f'{where}{self.op} needs a single-word "replace" tag (use delete_tag to remove)')
+        if self.op in (OP_SET_CAPACITY, OP_SET_HOURS):
+            try:
+                self.value = int(self.replace)
+            except (TypeError, ValueError):
+                raise ValueError(f'{where}{self.op} needs an integer "replace" value') from None
+            if not VALUE_MIN <= self.value <= VALUE_MAX:
+                raise ValueError(f'{where}{self.op} value {self.value} is not between {VALUE_MIN} and {VALUE_MAX}')
+            self.bIndex = parse_car_type(self.car_type, cartypes)
+            if self.bIndex is None:
+                raise ValueError(f'{where}unknown car type "{self.car_type}"')
+            if not 0 <= self.bIndex < SLOTS:
+                raise ValueError(f'{where}car type ID {self.bIndex} is not between 0 and {SLOTS - 1}')
+            # Raises ValueError for a malformed pattern
+            self.pattern = SearchPattern(self.industry, MODE_WILDCARD)
+
+
+def parse_car_type(car_type, cartypes=None):
+    """Return the bIndex for a car type given by ID or by name, or None"""
+    text = str(car_type).strip()
+    if text.isdigit():
+        return int(text)
+    return (cartypes or NO_CAR_TYPES).lookup(text)
+
+
+def load_script(path, cartypes=None):
+    """Read an edit script from a .csv or .json file and return its validated rules
+
+    A CSV script has a header row naming the SCRIPT_FIELDS columns it uses.
+    A JSON script is a list of objects with the same keys (or {"operations": [...]}).
+    Raises ValueError for a malformed script.
+    """
+    rules = []
+    if os.path.splitext(path)[1].lower() == '.json':
+        with open(path, 'r', encoding='utf-8') as f:
+            entries = json.load(f)
+        if isinstance(entries, dict):
+            entries = entries.get('operations', [])
+        for i, entry in enumerate(entries, start=1):
+            if not isinstance(entry, dict):
+                raise ValueError(f'entry {i}: expected an object')
+            # A missing or null field is blank, like an empty CSV cell
+            rules.append(EditRule(where=f'entry {i}',
+                                  **{k: '' if entry.get(k) is None else str(entry[k]) for k in SCRIPT_FIELDS}))
+    else:
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            reader = csv.DictReader(f)
+            if reader.fieldnames is None or 'op' not in reader.fieldnames:
+                raise ValueError('missing header row with an "op" column')
+            for row in reader:
+                if not (row.get('op') or '').strip() or row['op'].lstrip().startswith('#'):
+                    continue
+                rules.append(EditRule(where=f'line {reader.line_num}',
+                                      **{k: (row.get(k) or '').strip() for k in SCRIPT_FIELDS}))
+    for rule in rules:
+        rule.validate(cartypes)
+    return rules
+
+
+class EditChange:
+    """A planned change to one industry field or one producer"""
+
+    def __init__(self, industry, prod, field, old, new):
+        self.industry = industry
+        self.prod = prod
+        self.field = field
+        self.old = old
+        self.new = new
+
+    def describe(self, position, cartypes=None):
+        where = f'rec[{position}] {self.industry.name}'
+        if self.prod is not None:
+            car_name = (cartypes or NO_CAR_TYPES).name(self.prod.bIndex)
+            where += f' / {car_name} ({self.prod.bIndex})'
+        if self.field == 'tags':
+            return f'{where}: tags "{", ".join(self.old)}" -> "{", ".join(self.new)}"'
+        return f'{where}: {self.field} "{self.old}" -> "{self.new}"'
+
+
+class EditPlan:
+    """The changes an edit script makes to an IndustryFile, computed without touching it
+
+    Rules of the same kind are applied simultaneously: a tag or local name
+    is mapped once, so A -> B and B -> C do not chain into A -> C.
+    When several set rules hit the same producer the last one wins.
+    """
+
+    def __init__(self, indfile, rules):
+        self.indfile = indfile
+        self.rules = rules
+        self.changes = []
+        for rule in rules:
+            rule.matched = 0
+        self._plan_locals()
+        self._plan_tags()
+        self._plan_producer_values()
+        self.changes.sort(key=lambda change: indfile.position(change.industry))
+
+    def _plan_locals(self):
+        renames = {}
+        for rule in self.rules:
+            if rule.op == OP_RENAME_LOCAL:
+                renames[rule.find] = rule
+        for old_name, rule in renames.items():
+            # Hash lookup: only the industries using this local name are visited
+            for industry in self.indfile.find('local_name', old_name):
+                if rule.replace != old_name:
+                    self.changes.append(EditChange(industry, None, 'local_name', old_name, rule.replace))
+                    rule.matched += 1
+
+    def _plan_tags(self):
+        mapping = {}  # tag name -> replace_tag or delete_tag rule
+        for rule in self.rules:
+            if rule.op in (OP_REPLACE_TAG, OP_DELETE_TAG):
+                mapping[rule.find] = rule
+        # Collect the producers using any mapped tag from the tag index
+        producers = {}
+        for tag_name in mapping:
+            for industry, prod, tag_pos in self.indfile.tag_index.lookup(tag_name):
+                producers[prod] = industry
+        for prod, industry in producers.items():
+            old_tags = [tag.name for tag in prod.tags]
+            new_tags = []
+            for name in old_tags:
+                rule = mapping.get(name)
+                if rule is None:
+                    new_tags.append(name)
+                    continue
+                rule.matched += 1
+                if rule.op == OP_REPLACE_TAG:
+                    new_tags.append(rule.replace)
+            if new_tags != old_tags:
+                self.changes.append(EditChange(industry, prod, 'tags', old_tags, new_tags))
+
+    def _plan_producer_values(self):
+        planned = {}  # (producer, attr) -> change, so the last rule wins
+        for rule in self.rules:
+            if rule.op not in (OP_SET_CAPACITY, OP_SET_HOURS):
+                continue
+            attr = 'capacity' if rule.op == OP_SET_CAPACITY else 'proc_hours'
+            # Match the pattern against distinct industry names, then expand through the name index
+            for name in search_values(self.indfile, FIELD_NAME, rule.pattern):
+                for industry in self.indfile.find('name', name):
+                    for prod in industry.producer:
+                        if prod.bIndex != rule.bIndex:
+                            continue
+                        rule.matched += 1
+                        planned[(prod, attr)] = EditChange(industry, prod, attr, getattr(prod, attr), rule.value)
+        self.changes.extend(change for change in planned.values() if change.old != change.new)
+
+    def diff(self, cartypes=None):
+        """Return the planned changes as one line each, in file order"""
+        return [change.describe(self.indfile.position(change.industry), cartypes) for change in self.changes]
+
+    def summary(self):
+        """Return one line per rule with the number of records it changes"""
+        lines = []
+        for rule in self.rules:
+            note = '' if rule.matched else '  (no match)'
+            lines.append(f'{str(rule)}: {rule.matched}{note}')
+        industries = {change.industry for change in self.changes}
+        lines.append(f'{len(self.changes)} changes in {len(industries)} industries')
+        return lines
+
+    def apply(self):
+        """Write the planned changes into the file, reported as one batch of edits"""
+        with self.indfile.batch():
+            for change in self.changes:
+                if change.field == 'local_name':
+                    change.industry.replaceLocalName(change.new)
+                elif change.field == 'tags':
+                    change.prod.setTags(change.new)
+                else:
+                    setattr(change.prod, change.field, change.new)
+                    change.prod.touch()
+        return len(self.changes)
+
+
+def plan_script(indfile, path, cartypes=None):
+    """Load an edit script and return the EditPlan it makes for indfile"""
+    return EditPlan(indfile, load_script(path, cartypes))
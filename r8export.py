@@ -0,0 +1,199 @@
+import csv
+import json
+
+from r8lib import IndustryFile, encode_run8string, INTLEN, BYTLEN
+from r8cartypes import NO_CAR_TYPES
+
+FORMATS = ['ndjson', 'csv', 'json']
+LEVEL_INDUSTRY = 'industries'
+LEVEL_PRODUCER = 'producers'
+LEVELS = [LEVEL_INDUSTRY, LEVEL_PRODUCER]
+
+JSON_FORMAT = 'r8-industries'  # "format" marker of a JSON export
+JSON_VERSION = 1
+WRITE_BUFFER = 1 << 16
+
+INDUSTRY_COLUMNS = ['record', 'name', 'local_name', 'trk_sym', 'process_in_blocks', 'tracks', 'producers']
+PRODUCER_COLUMNS = ['record', 'industry', 'local_name', 'trk_sym', 'car_id', 'car_type', 'produce_empties',
+                    'proc_hours', 'capacity', 'tags', 'filters']
+TRACK_FIELDS = ['unk1', 'route_prefix', 'track_section', 'track_direction']
+_LOW_NIBBLE_SET = bytes(b & 0x0F for b in range(256))
+
+
+def _string(text, enc, length):
+    # Exported form of an encoded run8 string: its text, plus the raw bytes when
+    # encoding the text again would not reproduce them exactly
+    enc = bytes(enc[:length])
+    high = enc[0::2]
+    # encode_run8string() writes each character as 0x0H 0xL0, so any other byte pattern needs the raw bytes
+    if len(enc) % 2 == 0 and (not high or max(high) <= 0x0F) and not enc[1::2].translate(_LOW_NIBBLE_SET).strip(b'\0'):
+        return text
+    return {'text': text, 'enc': enc.hex()}
+
+
+def _string_bytes(value):
+    enc = bytes.fromhex(value['enc']) if isinstance(value, dict) else bytes(encode_run8string(value))
+    return len(enc).to_bytes(INTLEN, 'little', signed=True) + enc
+
+
+def _text(value):
+    return value['text'] if isinstance(value, dict) else value
+
+
+def producer_record(prod, cartypes=None):
+    """Return the exported dict of a producer"""
+    return {
+        'rec_type': prod.rec_type,
+        'car_id': prod.bIndex,
+        'car_type': (cartypes or NO_CAR_TYPES).name(prod.bIndex),
+        'produce_empties': prod.produce_empties,
+        'proc_hours': prod.proc_hours,
+        'capacity': prod.capacity,
+        'tags': [_string(tag.name, tag.enc_name, tag.name_len) for tag in prod.tags],
+        'filters': [_string(f.name, f.enc_name, f.name_len) for f in prod.filter],
+    }
+
+
+def industry_record(industry, position, cartypes=None):
+    """Return the exported dict of an industry, holding everything needed to write it back"""
+    return {
+        'record': position,
+        'unk1': bytes(industry.unk1).hex(),
+        'name': _string(industry.name, industry.enc_name, industry.name_len),
+        'local_name': _string(industry.local_name, industry.enc_local_name, industry.local_name_len),
+        'trk_sym': _string(industry.trk_sym, industry.enc_trk_sym, industry.trk_sym_len),
+        'process_in_blocks': bool(industry.process_in_blocks),
+        'tracks': [{field: getattr(track, field) for field in TRACK_FIELDS} for track in industry.track],
+        'producers': [producer_record(prod, cartypes) for prod in industry.producer],
+    }
+
+
+def iter_industries(indfile, cartypes=None):
+    """Yield the exported dict of each industry in file order"""
+    for position, industry in enumerate(indfile.industries):
+        yield industry_record(industry, position, cartypes)
+
+
+def iter_producers(indfile, cartypes=None):
+    """Yield one flat dict per producer, with the industry it belongs to"""
+    for record in iter_industries(indfile, cartypes):
+        for prod in record['producers']:
+            row = {'record': record['record'], 'industry': _text(record['name']),
+                   'local_name': _text(record['local_name']), 'trk_sym': _text(record['trk_sym'])}
+            row.update(prod)
+            yield row
+
+
+def iter_csv_rows(indfile, level=LEVEL_INDUSTRY, cartypes=None):
+    """Yield CSV rows (header first) with one industry or one producer per row"""
+    if level == LEVEL_PRODUCER:
+        yield PRODUCER_COLUMNS
+        for row in iter_producers(indfile, cartypes):
+            yield [row['record'], row['industry'], row['local_name'], row['trk_sym'], row['car_id'],
+                   row['car_type'], int(row['produce_empties']), row['proc_hours'], row['capacity'],
+                   ' '.join(_text(tag) for tag in row['tags']), ' '.join(_text(f) for f in row['filters'])]
+    else:
+        yield INDUSTRY_COLUMNS
+        for record in iter_industries(indfile, cartypes):
+            yield [record['record'], _text(record['name']), _text(record['local_name']),
+                   _text(record['trk_sym']), int(record['process_in_blocks']), len(record['tracks']),
+                   len(record['producers'])]
+
+
+def write_ndjson(indfile, fp, level=LEVEL_INDUSTRY, cartypes=None):
+    records = iter_producers(indfile, cartypes) if level == LEVEL_PRODUCER else iter_industries(indfile, cartypes)
+    for record in records:
+        fp.write(json.dumps(record, ensure_ascii=False))
+        fp.write('\n')
+
+
+def write_csv(indfile, fp, level=LEVEL_INDUSTRY, cartypes=None):
+    csv.writer(fp, lineterminator='\n').writerows(iter_csv_rows(indfile, level, cartypes))
+
+
+def write_json(indfile, fp, cartypes=None):
+    """Write a JSON document that read_json() turns back into the same file
+
+    The document is written one industry at a time, never held in memory as a whole.
+    """
+    fp.write(f'{{"format": "{JSON_FORMAT}", "version": {JSON_VERSION}, '
+             f'"unk1": "{bytes(indfile.unk1).hex()}", "industries": [\n')
+    first = True
+    for record in iter_industries(indfile, cartypes):
+        if not first:
+            fp.write(',\n')
+        fp.write(json.dumps(record, ensure_ascii=False))
+        first = False
+    fp.write('\n]}\n')
+
+
+def export(indfile, fp, fmt, level=LEVEL_INDUSTRY, cartypes=None):
+    """Write indfile to the text stream fp as 'ndjson', 'csv' or 'json' (json is always per industry)"""
+    if fmt == 'ndjson':
+        write_ndjson(indfile, fp, level, cartypes)
+    elif fmt == 'csv':
+        write_csv(indfile, fp, level, cartypes)
+    elif fmt == 'json':
+        write_json(indfile, fp, cartypes)
+    else:
+        raise ValueError(f'Unknown export format "{fmt}" (expected one of {", ".join(FORMATS)})')
+
+
+def export_file(indfile, path, fmt, level=LEVEL_INDUSTRY, cartypes=None):
+    with open(path, mode='w', encoding='utf-8', newline='', buffering=WRITE_BUFFER) as fp:
+        export(indfile, fp, fmt, level, cartypes)
+
+
+def record_bytes(record):
+    """Return the .ind bytes of one exported industry dict"""
+    barray = bytearray()
+    barray += bytes.fromhex(record['unk1'])
+    barray += _string_bytes(record['name'])
+    barray += _string_bytes(record['local_name'])
+    barray += _string_bytes(record['trk_sym'])
+    barray += int(bool(record['process_in_blocks'])).to_bytes(BYTLEN, 'little')
+    barray += len(record['tracks']).to_bytes(INTLEN, 'little', signed=True)
+    for track in record['tracks']:
+        for field in TRACK_FIELDS:
+            barray += int(track[field]).to_bytes(INTLEN, 'little', signed=True)
+    barray += len(record['producers']).to_bytes(INTLEN, 'little', signed=True)
+    for prod in record['producers']:
+        barray += int(prod['rec_type']).to_bytes(INTLEN, 'little', signed=True)
+        barray += int(prod['car_id']).to_bytes(BYTLEN, 'little')
+        barray += int(bool(prod['produce_empties'])).to_bytes(BYTLEN, 'little')
+        barray += int(prod['proc_hours']).to_bytes(INTLEN, 'little', signed=True)
+        barray += int(prod['capacity']).to_bytes(INTLEN, 'little', signed=True)
+        barray += len(prod['tags']).to_bytes(INTLEN, 'little', signed=True)
+        for tag in prod['tags']:
+            barray += _string_bytes(tag)
+        barray += len(prod['filters']).to_bytes(INTLEN, 'little', signed=True)
+        for name in prod['filters']:
+            barray += _string_bytes(name)
+    return barray
+
+
+def read_json(fp):
+    """Rebuild an IndustryFile from a JSON export; raises ValueError for anything else
+
+    The result writes the same bytes as saving the exported file would. That is
+    the original file byte for byte unless it has legacy records: tags holding
+    spaces are split and flag bytes other than 0/1 become 1 when a file is read,
+    so the export only holds the normalised form.
+    """
+    try:
+        document = json.load(fp)
+    except json.JSONDecodeError as e:
+        raise ValueError(f'Not a JSON file [{e}]') from None
+    if not isinstance(document, dict) or document.get('format') != JSON_FORMAT:
+        raise ValueError(f'Not a JSON export of an industry file (missing "format": "{JSON_FORMAT}")')
+    records = document.get('industries', [])
+    barray = bytearray(bytes.fromhex(document.get('unk1', '00000000')))
+    barray += len(records).to_bytes(INTLEN, 'little')
+    try:
+        for c, record in enumerate(records):
+            barray += record_bytes(record)
+    except (KeyError, TypeError, ValueError, OverflowError) as e:
+        raise ValueError(f'Industry entry {c} is incomplete or invalid [{e}]') from None
+    indfile = IndustryFile()
+    indfile.from_bytes(bytes(barray))
+    return indfile
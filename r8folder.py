@@ -0,0 +1,118 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from r8lib import scan_industries
+from r8search import SearchPattern, FIELD_NAME, FIELD_SYMBOL, FIELD_LOCAL, FIELD_TAG
+
+# Industry fields compared by a folder search, in the order they are reported
+NAME_FIELDS = [FIELD_NAME, FIELD_LOCAL, FIELD_SYMBOL]
+
+
+def find_ind_files(root):
+    """Return the paths of all .ind files below root, sorted"""
+    paths = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        for filename in filenames:
+            if filename.lower().endswith('.ind'):
+                paths.append(os.path.join(dirpath, filename))
+    return sorted(paths)
+
+
+class FolderMatch:
+    """Matches within one industry of a searched file
+
+    fields    : [(field, value)] for matching name fields
+    producers : [(bIndex, [matching tag names])] for producers with matching tags
+    """
+
+    def __init__(self, position, name, fields, producers):
+        self.position = position
+        self.name = name
+        self.fields = fields
+        self.producers = producers
+
+    def count(self):
+        return len(self.fields) + sum(len(tags) for bIndex, tags in self.producers)
+
+
+def search_file(path, text, mode, case_sensitive, fields):
+    """Search one .ind file with the header-only scanner
+
+    Returns (path, [FolderMatch], error message or None). Runs in a worker
+    process, so everything passed in and returned is plain picklable data.
+    """
+    try:
+        pattern = SearchPattern(text, mode, case_sensitive)
+        with open(path, 'rb') as ifp:
+            fcontent = ifp.read()
+        matches = []
+        search_tags = FIELD_TAG in fields
+        name_fields = [field for field in NAME_FIELDS if field in fields]
+        for summary in scan_industries(fcontent):
+            found_fields = [(field, getattr(summary, field)) for field in name_fields
+                            if pattern.matches(getattr(summary, field))]
+            found_producers = []
+            if search_tags:
+                for bIndex, tags in summary.producers:
+                    found_tags = [tag for tag in tags if pattern.matches(tag)]
+                    if found_tags:
+                        found_producers.append((bIndex, found_tags))
+            if found_fields or found_producers:
+                matches.append(FolderMatch(summary.position, summary.name, found_fields, found_producers))
+        return path, matches, None
+    except Exception as e:
+        # A damaged or foreign file must not stop the rest of the folder
+        return path, [], str(e)
+
+
+def search_folder(root, text, mode, case_sensitive=True, fields=(FIELD_TAG, FIELD_NAME), max_workers=None):
+    """Search every .ind file under root in a process pool
+
+    Yields (path, [FolderMatch], error) for each file as soon as its worker
+    finishes, so callers can show results while the rest are still running.
+    Raises ValueError up front for an invalid pattern.
+    """
+    SearchPattern(text, mode, case_sensitive)
+    paths = find_ind_files(root)
+    if not paths:
+        return
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(search_file, path, text, mode, case_sensitive, tuple(fields)) for path in paths]
+        try:
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            # Drop files not yet started if the caller stopped early
+            for future in futures:
+                future.cancel()
+
+
+def count_file_tags(path):
+    """Return (path, {tag name: number of uses}, error message or None) for one .ind file"""
+    try:
+        with open(path, 'rb') as ifp:
+            fcontent = ifp.read()
+        counts = dict()
+        for summary in scan_industries(fcontent):
+            for bIndex, tags in summary.producers:
+                for tag in tags:
+                    counts[tag] = counts.get(tag, 0) + 1
+        return path, counts, None
+    except Exception as e:
+        return path, {}, str(e)
+
+
+def count_folder_tags(root, max_workers=None):
+    """Return ({tag name: uses across every .ind file under root}, [(path, error)]) using a process pool"""
+    totals = dict()
+    errors = []
+    paths = find_ind_files(root)
+    if not paths:
+        return totals, errors
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        for path, counts, error in pool.map(count_file_tags, paths):
+            if error:
+                errors.append((path, error))
+            for tag, count in counts.items():
+                totals[tag] = totals.get(tag, 0) + count
+    return totals, errors
@@ -0,0 +1,271 @@
+"""Round-trip fuzzing of the industry file parser and serializer
+
+Each case is a random industry file, a damaged copy of one, or a truncated one,
+rebuilt from its case number so any failure can be replayed:
+
+    python r8fuzz.py --cases 1000000             # spread over all cores
+    python r8fuzz.py --replay 4711 -o case.ind   # rerun one case and keep its file
+
+Checked for every case:
+  - parsing either succeeds or raises ValueError; any other exception is a failure
+  - a truncated file never parses
+  - parse -> to_bytes -> parse gives the same industries, and writing those again
+    gives the same bytes; files without legacy space-delimited tags or
+    non-0/1 flags come back byte for byte
+  - record_spans() and scan_industries() agree with the full parse
+"""
+import argparse
+import random
+import struct
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+from r8lib import IndustryFile, record_spans, scan_industries, INTLEN
+
+KIND_VALID = 'valid'
+KIND_MUTATED = 'mutated'
+KIND_TRUNCATED = 'truncated'
+KINDS = [KIND_VALID, KIND_MUTATED, KIND_TRUNCATED]
+
+CHUNK = 2000  # Cases per worker task
+MAX_FAILURES = 20  # Failures kept per task
+
+_INT32 = struct.Struct('<i')
+_BOUNDARY_INTS = [0, 1, -1, 2, 0x7FFFFFFF, -0x80000000, 0xFFFF, 1 << 20]
+_WORDS = ['COAL', 'GRAIN', 'LUMBER', 'STEEL', 'X', 'A1', 'OIL', 'SAND']
+
+
+class Case:
+    """One generated buffer and what is expected of it"""
+
+    def __init__(self, number, kind, content, exact):
+        self.number = number
+        self.kind = kind
+        self.content = content
+        self.exact = exact  # Must survive a round trip byte for byte
+
+
+def _encode(codes):
+    out = bytearray()
+    for code in codes:
+        out += bytes((code >> 4, (code & 0x0F) << 4))
+    return bytes(out)
+
+
+def _random_string(rnd, state):
+    # Length-prefixed string: words, any latin-1 text, or raw bytes with any nibbles
+    choice = rnd.random()
+    if choice < 0.15:
+        enc = b''
+    elif choice < 0.6:
+        enc = _encode(map(ord, ' '.join(rnd.choices(_WORDS, k=rnd.randint(1, 3)))))
+    elif choice < 0.85:
+        enc = _encode(rnd.randrange(0x1000 if rnd.random() < 0.2 else 0x100) for i in range(rnd.randint(1, 12)))
+    else:
+        enc = rnd.randbytes(rnd.randint(1, 12) * 2)
+    return len(enc).to_bytes(INTLEN, 'little', signed=True) + enc
+
+
+def _has_space(enc):
+    return any(enc[n] == 0x02 and enc[n + 1] < 0x10 for n in range(0, len(enc) - 1, 2))
+
+
+def _tag(rnd, state):
+    enc = _random_string(rnd, state)
+    if _has_space(enc[INTLEN:]):
+        # Legacy space-delimited tags are split on reading, so they do not come back as written
+        state['exact'] = False
+    return enc
+
+
+def _flag(rnd, state):
+    if rnd.random() < 0.05:
+        state['exact'] = False  # Read as a bool, written back as 1
+        return bytes([rnd.randint(2, 255)])
+    return bytes([rnd.randint(0, 1)])
+
+
+def random_file(rnd):
+    """Return (bytes of a valid random industry file, whether it must round-trip byte for byte)"""
+    state = {'exact': True}
+    num_rec = rnd.choice([0, 1, 1, 2, 3, 5])
+    out = bytearray(rnd.randbytes(INTLEN)) + num_rec.to_bytes(INTLEN, 'little')
+    for i in range(num_rec):
+        out += rnd.randbytes(INTLEN)
+        for k in range(3):
+            out += _random_string(rnd, state)
+        out += _flag(rnd, state)
+        tracks = rnd.choice([0, 1, 2])
+        out += tracks.to_bytes(INTLEN, 'little', signed=True)
+        for t in range(tracks):
+            out += rnd.randbytes(INTLEN * 4)
+        producers = rnd.choice([0, 1, 2, 4])
+        out += producers.to_bytes(INTLEN, 'little', signed=True)
+        for p in range(producers):
+            out += _INT32.pack(rnd.choice([1, 2, rnd.randint(-5, 5)])) + bytes([rnd.randint(0, 255)])
+            out += _flag(rnd, state) + rnd.randbytes(2 * INTLEN)
+            for items in (rnd.choice([0, 1, 3]), rnd.choice([0, 0, 1])):  # tags, then filters
+                out += items.to_bytes(INTLEN, 'little', signed=True)
+                for n in range(items):
+                    out += _tag(rnd, state)
+    return bytes(out), state['exact']
+
+
+def mutate(rnd, content):
+    """Return a damaged copy of content"""
+    data = bytearray(content)
+    for i in range(rnd.randint(1, 3)):
+        choice = rnd.random()
+        if not data or choice < 0.15:
+            data += rnd.randbytes(rnd.randint(1, 8))
+        elif choice < 0.45:
+            pos = rnd.randrange(len(data))
+            data[pos] = rnd.randrange(256)
+        elif choice < 0.75 and len(data) >= INTLEN:
+            # A length or count field with a boundary value
+            pos = rnd.randrange(len(data) - INTLEN + 1)
+            data[pos:pos + INTLEN] = _INT32.pack(rnd.choice(_BOUNDARY_INTS))
+        elif choice < 0.9:
+            start = rnd.randrange(len(data))
+            del data[start:start + rnd.randint(1, 16)]
+        else:
+            start = rnd.randrange(len(data))
+            data[start:start] = data[start:start + rnd.randint(1, 16)]
+    return bytes(data)
+
+
+def make_case(number, seed=0):
+    """Rebuild case number of a run"""
+    rnd = random.Random(seed * 1_000_000_007 + number)
+    content, exact = random_file(rnd)
+    choice = rnd.random()
+    if choice < 0.4:
+        return Case(number, KIND_VALID, content, exact)
+    if choice < 0.6:
+        return Case(number, KIND_TRUNCATED, content[:rnd.randrange(len(content))], False)
+    return Case(number, KIND_MUTATED, mutate(rnd, content), False)
+
+
+def _state(industry):
+    # Everything read from an industry record, for comparing two parses
+    return (bytes(industry.unk1), industry.enc_name, industry.enc_local_name, industry.enc_trk_sym,
+            industry.name, industry.local_name, industry.trk_sym, industry.process_in_blocks,
+            [(t.unk1, t.route_prefix, t.track_section, t.track_direction) for t in industry.track],
+            [(p.rec_type, p.bIndex, p.produce_empties, p.proc_hours, p.capacity,
+              [(tag.enc_name, tag.name) for tag in p.tags], [(f.enc_name, f.name) for f in p.filter])
+             for p in industry.producer])
+
+
+def parse(content):
+    indfile = IndustryFile()
+    indfile.from_bytes(content)
+    return indfile
+
+
+def check_case(case):
+    """Return None if the case behaves, else a message saying what went wrong"""
+    try:
+        first = parse(case.content)
+    except ValueError:
+        if case.kind == KIND_VALID:
+            return 'valid file was rejected:\n' + traceback.format_exc()
+        return None
+    except Exception:
+        return 'parsing raised something other than ValueError:\n' + traceback.format_exc()
+    if case.kind == KIND_TRUNCATED:
+        return 'truncated file was accepted'
+
+    try:
+        written = bytes(first.to_bytes())
+        if case.exact and written != case.content:
+            return 'round trip changed the bytes'
+        second = parse(written)
+        if [_state(i) for i in second.industries] != [_state(i) for i in first.industries]:
+            return 'parse -> to_bytes -> parse changed the industries'
+        if bytes(second.to_bytes()) != written:
+            return 'writing a second time gave different bytes'
+
+        spans = record_spans(case.content)
+        if [industry._span for industry in first.industries] != spans:
+            return 'record_spans() disagrees with the parse'
+        summaries = list(scan_industries(case.content))
+        if [(s.name, s.local_name, s.trk_sym, [tags for bIndex, tags in s.producers]) for s in summaries] != \
+                [(i.name, i.local_name, i.trk_sym, [[tag.name for tag in p.tags] for p in i.producer])
+                 for i in first.industries]:
+            return 'scan_industries() disagrees with the parse'
+    except Exception:
+        return 'round trip failed:\n' + traceback.format_exc()
+    return None
+
+
+def run_chunk(start, count, seed):
+    """Run cases start .. start+count-1; returns ({kind: cases}, [(case number, kind, message)])"""
+    counts = dict.fromkeys(KINDS, 0)
+    failures = []
+    for number in range(start, start + count):
+        case = make_case(number, seed)
+        counts[case.kind] += 1
+        message = check_case(case)
+        if message and len(failures) < MAX_FAILURES:
+            failures.append((number, case.kind, message))
+    return counts, failures
+
+
+def run(cases, seed=0, workers=None, out=sys.stderr):
+    """Run cases over a process pool; returns ({kind: cases}, [(case number, kind, message)])"""
+    totals = dict.fromkeys(KINDS, 0)
+    failures = []
+    starts = range(0, cases, CHUNK)
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(run_chunk, starts, [min(CHUNK, cases - start) for start in starts], [seed] * len(starts))
+        for counts, chunk_failures in results:
+            for kind, count in counts.items():
+                totals[kind] += count
+            failures.extend(chunk_failures)
+            done = sum(totals.values())
+            print(f'\r{done} cases, {len(failures)} failures, {done / (time.perf_counter() - started):.0f} cases/s',
+                  end='', file=out)
+    print(file=out)
+    return totals, failures
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='r8fuzz', description='Round-trip fuzzing of the industry file parser.')
+    parser.add_argument('-n', '--cases', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=0, help='run number; a different seed gives different cases')
+    parser.add_argument('-j', '--workers', type=int, help='worker processes (default: one per core)')
+    parser.add_argument('--replay', type=int, metavar='CASE', help='run a single case and print the details')
+    parser.add_argument('-o', '--output', help='with --replay, write the case file here')
+    return parser
+
+
+def main(argv=None):
+    """Run the fuzzer; exit code 1 when a case failed"""
+    args = build_parser().parse_args(argv)
+    if args.replay is not None:
+        case = make_case(args.replay, args.seed)
+        print(f'case {case.number}: {case.kind}, {len(case.content)} bytes, exact={case.exact}')
+        if args.output:
+            with open(args.output, 'wb') as ofp:
+                ofp.write(case.content)
+        message = check_case(case)
+        print(message or 'OK')
+        return 1 if message else 0
+
+    started = time.perf_counter()
+    totals, failures = run(args.cases, args.seed, args.workers)
+    print(', '.join(f'{count} {kind}' for kind, count in totals.items()) +
+          f' in {time.perf_counter() - started:.1f} s')
+    for number, kind, message in failures[:MAX_FAILURES]:
+        print(f'FAILED case {number} ({kind}): {message}')
+    if failures:
+        print(f'{len(failures)} failures; replay one with: python r8fuzz.py --seed {args.seed} --replay CASE')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,13 +1,20 @@
-import csv
 import os
 import sys
 
-from r8lib import IndustryFile, Industry
+from r8cartypes import load_car_types
+from r8diff import diff_files
+from r8edit import plan_script
+from r8folder import search_folder, count_folder_tags
+from r8lib import IndustryFile
+from r8profile import PROFILER, PHASE_READ
+from r8search import MODES, MODE_EXACT, MODE_WILDCARD
+from r8stats import get_stats
+from r8validate import get_validation
+from r8typos import TypoChecker, get_typo_checker
 
 version = '0.01'
 last_update = '22-Oct-2024'
 fname = 'config.ind'
-carfile = 'r8CarTypes.csv'
 
 INTLEN = 4
 BYTLEN = 1
@@ -15,17 +22,18 @@ SHTLEN = 2
 UTFLEN = 2              # Length of UTF-16 char
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1:] != ['--profile']:
+        # Subcommands run headless; without arguments the interactive prompt starts
+        from r8cli import main
+        sys.exit(main())
+    PROFILER.enabled = '--profile' in sys.argv
+
     file_read = False
+    file2_read = False
     dir_scanned = False
     file_list = []
-    locals = []
     curr_dir = os.getcwd()
-    cardict = {}
-
-    with open(carfile, mode='r') as file:
-        csvFile = csv.reader(file)
-        for lines in csvFile:
-            cardict[lines[0]] = lines[1]
+    cartypes = load_car_types()
 
     print(f'+------------------------------------+\n'
           f'| Run 8 Industry Utility             |\n'
@@ -42,9 +50,12 @@ if __name__ == "__main__":
                 cmd = '?'
             if cmd[0] == '?':
                 print('List of commands: ')
-                print('c            : compare buffer 2 to buffer 1 locals')
+                print('c            : compare buffer 2 to buffer 1 (added, removed and changed industries)')
+                print('e <fn>       : apply edit script <fn> (.csv or .json)')
+                print('ed <fn>      : dry run edit script <fn>, listing the changes it would make')
                 print('l <fn>       : load industry file <fn>.ind')
                 print(' l           : load industry file "config.ind"')
+                print('l2 <fn>      : load industry file <fn>.ind into buffer 2 for comparing')
                 print('m <c> <n>    : Modify <c> field of record <n>:')
                 print('                 (n)ame, (l)ocal name, (s)ymbol')
                 print('n            : list names of all industry records')
@@ -52,11 +63,20 @@ if __name__ == "__main__":
                 print(' p           : print contents of all industry records')
                 print('pl           : print list of all local tags')
                 print('pi           : print list of all industry processed-to tags')
+                print('pt           : print all distinct processed-to tags with their use counts')
+                print('pf           : print the time spent per phase (start with --profile to collect timings)')
+                print(' pf <fn>     : save the phase timings to <fn>.json')
+                print('ps           : print statistics per local, per car type and per tag')
                 print('ri           : replace all industry processed-to tag <1> with <2> (leave <2> blank to delete)')
                 print('rl           : replace local name <1> with <2>')
                 print('q            : quit')
                 print('r 1          : report ')
+                print('sf <d> <t> [m]: search all .ind files under folder <d> for tag or name <t>')
+                print('                 (m)ode: exact (default, wildcard if <t> has * or ?), substring, wildcard, regex')
+                print('st           : list tags that look like misspellings of a more common tag')
+                print(' st <d>      : same, over all .ind files under folder <d>')
                 print('t <n>        : Show all track segments associated with record n')
+                print('v            : validate the loaded file (duplicates, capacities, unknown car types, ...)')
                 print('w <fn>       : Write industry file <fn>.ind')
                 print(' w           : Write industry file "config.ind"')
 
@@ -65,20 +85,60 @@ if __name__ == "__main__":
                     input_fname = cmd[1] + '.ind'
                 else:
                     input_fname = fname
-                ifp = open(input_fname, mode='rb')
-                mem_ptr = 0
-                fcontent = ifp.read()
+                with PROFILER.phase(PHASE_READ):
+                    ifp = open(input_fname, mode='rb')
+                    fcontent = ifp.read()
+                    ifp.close()
                 indFile1 = IndustryFile()
-                indFile1.unk1 = fcontent[mem_ptr:mem_ptr + INTLEN]
-                mem_ptr += INTLEN
-                indFile1.num_rec = int.from_bytes(fcontent[mem_ptr:mem_ptr + INTLEN], 'little')
-                mem_ptr += INTLEN
-                for i in range(0, indFile1.num_rec):
-                    indFile1.industries.append(Industry(fcontent, mem_ptr))
-                    mem_ptr += len(indFile1.industries[i])
+                indFile1.from_bytes(fcontent)
                 print(f'File read: {input_fname}\nRecords Found: {indFile1.num_rec}')
                 file_read = True
 
+            elif cmd[0] == 'l2':
+                if not (len(cmd) > 1):
+                    print('ERROR : Missing parameter(s)')
+                else:
+                    compare_fname = cmd[1] + '.ind'
+                    ifp = open(compare_fname, mode='rb')
+                    fcontent = ifp.read()
+                    ifp.close()
+                    indFile2 = IndustryFile()
+                    indFile2.from_bytes(fcontent)
+                    print(f'File read into buffer 2: {compare_fname}\nRecords Found: {indFile2.num_rec}')
+                    file2_read = True
+
+            elif cmd[0] == 'c':
+                if not file_read:
+                    print('ERROR : Must read in a file first')
+                elif not file2_read:
+                    print('ERROR : Must read a file into buffer 2 first (l2 <fn>)')
+                else:
+                    file_diff = diff_files(indFile1, indFile2)
+                    for line in file_diff.report(cartypes):
+                        print(line)
+                    print(file_diff.summary())
+
+            elif cmd[0] in ('e', 'ed'):
+                if not (len(cmd) > 1):
+                    print('ERROR : Missing parameter(s)')
+                elif not file_read:
+                    print('ERROR : Must read in a file first')
+                else:
+                    try:
+                        plan = plan_script(indFile1, cmd[1], cartypes)
+                    except (OSError, ValueError) as e:
+                        print(f'ERROR : Could not read edit script {cmd[1]} [{e}]')
+                    else:
+                        if cmd[0] == 'ed':
+                            for line in plan.diff(cartypes):
+                                print(line)
+                        for line in plan.summary():
+                            print(line)
+                        if cmd[0] == 'e':
+                            print(f'Applied {plan.apply()} changes')
+                        else:
+                            print('Dry run - no changes made')
+
             elif cmd[0] == 'm':
                 if not (len(cmd) > 2):
                     print('ERROR : Missing parameter(s)')
@@ -118,10 +178,68 @@ if __name__ == "__main__":
                     if len(cmd) == 1:
                         for c, industry in enumerate(indFile1.industries):
                             print(f'--- RECORD[{c}] ---')
-                            industry.printAttrs(cardict)
+                            industry.printAttrs(cartypes)
                     else:
                         print(f'--- Record[{int(cmd[1])}] ---')
-                        indFile1.industries[int(cmd[1])].printAttrs(cardict)
+                        indFile1.industries[int(cmd[1])].printAttrs(cartypes)
+
+            elif cmd[0] == 'sf':
+                if not (len(cmd) > 2):
+                    print('ERROR : Missing parameter(s)')
+                else:
+                    search_dir = cmd[1]
+                    search_text = cmd[2]
+                    if len(cmd) > 3:
+                        mode = {m.lower(): m for m in MODES}.get(cmd[3].lower())
+                    else:
+                        mode = MODE_WILDCARD if ('*' in search_text or '?' in search_text) else MODE_EXACT
+                    if mode is None:
+                        print(f'ERROR : Unknown mode {cmd[3]}')
+                    elif not os.path.isdir(search_dir):
+                        print(f'ERROR : {search_dir} is not a folder')
+                    else:
+                        total = 0
+                        files = 0
+                        try:
+                            # Results are printed file by file as the worker processes finish
+                            for path, matches, error in search_folder(search_dir, search_text, mode):
+                                if error:
+                                    print(f'{path}: could not be read [{error}]')
+                                    continue
+                                if not matches:
+                                    continue
+                                files += 1
+                                print(f'{path}:')
+                                for match in matches:
+                                    total += match.count()
+                                    print(f'  rec[{match.position}] {match.name}')
+                                    for field, value in match.fields:
+                                        print(f'      {field}: {value}')
+                                    for bIndex, tags in match.producers:
+                                        print(f'      {cartypes.label(bIndex)}: {", ".join(tags)}')
+                            print(f'{total} matches in {files} files')
+                        except ValueError as e:
+                            print(f'ERROR : {e}')
+
+            elif cmd[0] == 'st':
+                checker = None
+                if len(cmd) > 1:
+                    if not os.path.isdir(cmd[1]):
+                        print(f'ERROR : {cmd[1]} is not a folder')
+                    else:
+                        tag_counts, errors = count_folder_tags(cmd[1])
+                        for path, error in errors:
+                            print(f'{path}: could not be read [{error}]')
+                        checker = TypoChecker(tag_counts)
+                elif not file_read:
+                    print('ERROR : Must read in a file first')
+                else:
+                    checker = get_typo_checker(indFile1)
+                if checker is not None:
+                    lines = checker.report()
+                    for line in lines:
+                        print(line)
+                    print(f'{len(lines)} possible misspellings among {len(checker.counts)} distinct tags')
 
             elif cmd[0] == 't':
                 if not file_read:
@@ -135,14 +253,21 @@ if __name__ == "__main__":
                     for i in range(int(indFile1.industries[recnum].number_of_tracks)):
                         print(indFile1.industries[recnum].track[i].track_section)
 
+            elif cmd[0] == 'v':
+                if not file_read:
+                    print('ERROR : Must read in a file first')
+                else:
+                    report = get_validation(indFile1, cartypes)
+                    for line in report.report():
+                        print(line)
+                    print(report.summary())
+
             elif cmd[0] == 'pl':
                 if not file_read:
                     print('ERROR : Must read in a file first')
                 else:
-                    for c, industry in enumerate(indFile1.industries):
-                        if industry.local_name not in locals:
-                            locals.append(industry.local_name)
-                    for lname in locals:
+                    # Distinct local names of the loaded file, in order of first use
+                    for lname in dict.fromkeys(industry.local_name for industry in indFile1.industries):
                         print(lname)
 
             elif cmd[0] == 'rl':
@@ -153,11 +278,11 @@ if __name__ == "__main__":
                 else:
                     name1 = cmd[1]
                     name2 = cmd[2]
-                    # Search through existing local names
-                    for c, industry in enumerate(indFile1.industries):
-                        if industry.local_name == name1:
-                            print(f'Replacing local name {name1} in rec[{c}] (ind: {industry.name}) with {name2}')
-                            indFile1.industries[c].replaceLocalName(name2)
+                    # Look up the industries using this local name in the file's index
+                    for industry in indFile1.find('local_name', name1):
+                        c = indFile1.position(industry)
+                        print(f'Replacing local name {name1} in rec[{c}] (ind: {industry.name}) with {name2}')
+                        industry.replaceLocalName(name2)
 
             elif cmd[0] == 'q':
                 input('Press <enter> to close the session...')
@@ -174,7 +299,7 @@ if __name__ == "__main__":
                                 print(f'Track {i}: {industry.track[i].route_prefix}')
                     else:
                         print(f'--- Record[{int(cmd[1])}] ---')
-                        indFile1.industries[int(cmd[1])].printAttrs(cardict)
+                        indFile1.industries[int(cmd[1])].printAttrs(cartypes)
 
             elif cmd[0] == 'pi':
                 if not file_read:
@@ -187,6 +312,31 @@ if __name__ == "__main__":
                                 print(f'{producer.returnTags()}')
                         print('----------')
 
+            elif cmd[0] == 'pf':
+                if not PROFILER.enabled:
+                    print('ERROR : Profiling is off, start the utility with --profile')
+                elif len(cmd) > 1:
+                    PROFILER.dump_json(cmd[1] + '.json')
+                    print(f'Phase timings saved to {cmd[1]}.json')
+                else:
+                    for line in PROFILER.report():
+                        print(line)
+
+            elif cmd[0] == 'ps':
+                if not file_read:
+                    print('ERROR : Must read in a file first')
+                else:
+                    for line in get_stats(indFile1).report(cartypes):
+                        print(line)
+
+            elif cmd[0] == 'pt':
+                if not file_read:
+                    print('ERROR : Must read in a file first')
+                else:
+                    tag_counts = indFile1.tag_index.counts()
+                    for tag_name in sorted(tag_counts, key=str.lower):
+                        print(f'{tag_name:<30} {tag_counts[tag_name]}')
+
             elif cmd[0] == 'ri':
                 if not (len(cmd) > 1):
                     print('ERROR : Missing parameter(s)')
@@ -198,10 +348,11 @@ if __name__ == "__main__":
                         name2 = cmd[2]
                     else:
                         name2 = ''
-                    for industry in indFile1.industries:
-                        for producer in industry.producer:
-                            if producer.num_tags > 0:
-                                producer.replaceTag(name1, name2)
+                    # Only visit the producers that use the tag; each rewrites all its occurrences at once
+                    matches = indFile1.tag_index.lookup(name1)
+                    for producer in dict.fromkeys(producer for industry, producer, tag_pos in matches):
+                        producer.replaceTag(name1, name2)
+                    print(f'{"Replaced" if name2 else "Deleted"} {len(matches)} occurrences of {name1}')
 
             elif cmd[0] == 'w':
                 if not file_read:
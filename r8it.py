@@ -1,12 +1,17 @@
-import csv
 import sys
 import os
 import json
 import urllib.request
 import threading
+import multiprocessing
 from packaging import version as pkg_version
 
-from r8lib import IndustryFile, Industry
+from r8lib import IndustryFile
+from r8cartypes import load_car_types
+from r8edit import plan_script
+from r8validate import update_validation
+from r8watch import FileWatcher, file_stamp, reload_file, POLL_INTERVAL
+from r8profile import PROFILER, PHASE_READ, PHASE_MODEL
 
 from PySide6.QtWidgets import QApplication, QMainWindow, QFileDialog, QMessageBox, QPushButton, QHBoxLayout, QWidget, QLabel, QSizePolicy
 from PySide6.QtGui import QIcon
@@ -17,6 +22,11 @@ from industryDetailDialog import IndustryDetailDialog
 from instructionsDialog import InstructionsDialog
 from aboutDialog import AboutDialog
 from findReplaceDialog import FindReplaceDialog
+from editScriptDialog import EditScriptDialog
+from folderSearchDialog import FolderSearchDialog
+from statsDialog import StatsDialog
+from validationDialog import ValidationDialog
+from resultsPanel import ResultsPanel
 from version import VERSION
 
 
@@ -111,14 +121,32 @@ class MainWindow(QMainWindow):
 
         # Track the currently loaded file
         self.current_filename = None
+        # content_hash() of the industries and (mtime, size) of the file when it was last read or written
+        self.saved_hash = None
+        self.saved_stamp = None
 
         # Track any open industry detail dialog
         self.open_detail_dialog = None
 
+        # Single industry detail dialog, created on first use and rebound per industry
+        self.detail_dialog = None
+
+        # Dockable list of all hits of the last Find All, created on first use
+        self.results_panel = None
+
+        # Polls the loaded file while Tools > Watch File for Changes is checked
+        self.file_watcher = None
+        self.watch_timer = QTimer(self)
+        self.watch_timer.setInterval(int(POLL_INTERVAL * 1000))
+        self.watch_timer.timeout.connect(self.check_watched_file)
+
         # Initialize the table model
         self.table_model = DictTableModel()
         self.ui.tableView.setModel(self.table_model)
 
+        # Keep the table in step with edits made anywhere on the loaded file
+        indFile1.add_listener(self.on_industries_changed)
+
         # Add Find button in lower right
         button_layout = QHBoxLayout()
         button_layout.addStretch()
@@ -142,9 +170,18 @@ class MainWindow(QMainWindow):
             self.ui.actionQuit_2.triggered.connect(self.save_file_as)  # Save As...
         if hasattr(self.ui, 'actionQuit_3'):
             self.ui.actionQuit_3.triggered.connect(self.close)  # Quit
+        self.ui.actionEditScript.triggered.connect(self.run_edit_script)
+        self.ui.actionFolderSearch.triggered.connect(self.show_folder_search)
+        self.ui.actionStatistics.triggered.connect(self.show_statistics)
+        self.ui.actionValidate.triggered.connect(self.show_validation)
+        self.ui.actionWatchFile.toggled.connect(self.set_watching)
         self.ui.actionInstructions.triggered.connect(self.show_instructions)
         self.ui.actionCheckUpdates.triggered.connect(self.check_updates_manual)
         self.ui.actionAbout.triggered.connect(self.show_about)
+        self.ui.actionProfiling.setChecked(PROFILER.enabled)
+        self.ui.actionProfiling.toggled.connect(self.set_profiling)
+        self.ui.actionProfileNext.triggered.connect(self.profile_next_action)
+        self.ui.actionSaveProfile.triggered.connect(self.save_profile)
 
         # Add Ctrl+F shortcut for Find
         from PySide6.QtGui import QShortcut, QKeySequence
@@ -159,6 +196,13 @@ class MainWindow(QMainWindow):
         self.file_info_label.setMinimumWidth(300)  # Ensure enough space for filename and industry count
         self.menuBar().setCornerWidget(self.file_info_label, Qt.Corner.TopRightCorner)
 
+        # Timings of the last action, shown in the status bar while profiling is on
+        self.profile_label = QLabel()
+        self.statusBar().addPermanentWidget(self.profile_label)
+        self.profile_label.setVisible(PROFILER.enabled)
+        self._shown_cprofile = None
+        PROFILER.add_listener(self.on_profile_updated)
+
         # Disable Save and Save As until a file is loaded
         self.ui.actionSave.setEnabled(False)
         if hasattr(self.ui, 'actionQuit_2'):
@@ -184,73 +228,79 @@ class MainWindow(QMainWindow):
 
         file_name , _ = QFileDialog.getOpenFileName(self, 'Open File', '', 'Industry Files (*.ind);;All Files (*)')
         if file_name:
-            print(f'Selected file: {file_name}')
-            with open(file_name, 'rb') as ifp:
-                mem_ptr = 0
-                fcontent = ifp.read()
-                indFile1.unk1 = fcontent[mem_ptr:mem_ptr + INTLEN]
-                mem_ptr += INTLEN
-                indFile1.num_rec = int.from_bytes(fcontent[mem_ptr:mem_ptr + INTLEN], 'little')
-                mem_ptr += INTLEN
-                # Clear existing industries before loading new ones
-                indFile1.industries = []
-                for i in range(0, indFile1.num_rec):
-                    indFile1.industries.append(Industry(fcontent, mem_ptr))
-                    mem_ptr += len(indFile1.industries[i])
-
-            # Track the loaded filename
-            self.current_filename = file_name
+            try:
+                with PROFILER.action('open file'):
+                    self.load_file(file_name)
+            except (OSError, ValueError) as e:
+                # A damaged file leaves the loaded one as it was
+                QMessageBox.critical(self, "Open Failed", f"Could not read {os.path.basename(file_name)}:\n{str(e)}")
+
+    def load_file(self, file_name):
+        """Read an industry file and show it in the table"""
+        print(f'Selected file: {file_name}')
+        with PROFILER.phase(PHASE_READ), open(file_name, 'rb') as ifp:
+            fcontent = ifp.read()
+        # Parse the industries and build the lookup indexes
+        indFile1.from_bytes(fcontent)
+
+        # Populate the table with industry data
+        with PROFILER.phase(PHASE_MODEL):
+            industry_data = [ind.to_dict() for ind in indFile1.industries]
+            self.table_model.update_data(industry_data)
 
-            # Update file info label in menu bar corner (show filename only)
-            filename = os.path.basename(file_name)
-            self.file_info_label.setText(f'{filename}  [{indFile1.num_rec} industries]')
-            self.file_info_label.setToolTip(f'Full path: {file_name}')  # Show full path on hover
-            self.file_info_label.adjustSize()  # Resize label to fit content
+        # Track the loaded filename
+        self.current_filename = file_name
+        self.mark_saved()
 
-            # Show temporary message
-            self.statusBar().showMessage(f'Loaded {indFile1.num_rec} industries from {filename}', 3000)
+        # Update file info label in menu bar corner (show filename only)
+        filename = os.path.basename(file_name)
+        self.file_info_label.setText(f'{filename}  [{indFile1.num_rec} industries]')
+        self.file_info_label.setToolTip(f'Full path: {file_name}')  # Show full path on hover
+        self.file_info_label.adjustSize()  # Resize label to fit content
 
-            # Populate the table with industry data
-            industry_data = [ind.to_dict() for ind in indFile1.industries]
-            self.table_model.update_data(industry_data)
+        # Show temporary message
+        self.statusBar().showMessage(f'Loaded {indFile1.num_rec} industries from {filename}', 3000)
 
-            # Clear dirty rows since this is a fresh file load
-            self.table_model.clear_dirty_flags()
+        # Clear dirty rows since this is a fresh file load
+        self.table_model.clear_dirty_flags()
 
-            # Enable Save and Save As menu items now that data is loaded
-            self.ui.actionSave.setEnabled(True)
-            if hasattr(self.ui, 'actionQuit_2'):
-                self.ui.actionQuit_2.setEnabled(True)
+        if self.ui.actionWatchFile.isChecked():
+            self.file_watcher = FileWatcher(file_name)
+
+        # Enable Save and Save As menu items now that data is loaded
+        self.ui.actionSave.setEnabled(True)
+        if hasattr(self.ui, 'actionQuit_2'):
+            self.ui.actionQuit_2.setEnabled(True)
 
-            # Configure column widths after data is loaded
-            from PySide6.QtWidgets import QHeaderView
-            header = self.ui.tableView.horizontalHeader()
+        # Configure column widths after data is loaded
+        from PySide6.QtWidgets import QHeaderView
+        header = self.ui.tableView.horizontalHeader()
 
-            # Column 0: Name - wider
-            header.setSectionResizeMode(0, QHeaderView.ResizeMode.Interactive)
-            self.ui.tableView.setColumnWidth(0, 300)
+        # Column 0: Name - wider
+        header.setSectionResizeMode(0, QHeaderView.ResizeMode.Interactive)
+        self.ui.tableView.setColumnWidth(0, 300)
 
-            # Column 1: Tag - small fixed width
-            header.setSectionResizeMode(1, QHeaderView.ResizeMode.Fixed)
-            self.ui.tableView.setColumnWidth(1, 70)
+        # Column 1: Tag - small fixed width
+        header.setSectionResizeMode(1, QHeaderView.ResizeMode.Fixed)
+        self.ui.tableView.setColumnWidth(1, 70)
 
-            # Column 2: Local Name
-            header.setSectionResizeMode(2, QHeaderView.ResizeMode.Interactive)
-            self.ui.tableView.setColumnWidth(2, 150)
+        # Column 2: Local Name
+        header.setSectionResizeMode(2, QHeaderView.ResizeMode.Interactive)
+        self.ui.tableView.setColumnWidth(2, 150)
 
-            # Column 3: # Tracks Nodes
-            header.setSectionResizeMode(3, QHeaderView.ResizeMode.ResizeToContents)
+        # Column 3: # Tracks Nodes
+        header.setSectionResizeMode(3, QHeaderView.ResizeMode.ResizeToContents)
 
-            # Column 4: Incoming cars
-            header.setSectionResizeMode(4, QHeaderView.ResizeMode.ResizeToContents)
+        # Column 4: Incoming cars
+        header.setSectionResizeMode(4, QHeaderView.ResizeMode.ResizeToContents)
 
-            # Column 5: Process in Blocks
-            header.setSectionResizeMode(5, QHeaderView.ResizeMode.ResizeToContents)
+        # Column 5: Process in Blocks
+        header.setSectionResizeMode(5, QHeaderView.ResizeMode.ResizeToContents)
 
-            # Enable column sorting by clicking headers
-            self.ui.tableView.setSortingEnabled(True)
-            # Sort by industry name (column 0) ascending by default
-            self.ui.tableView.sortByColumn(0, Qt.SortOrder.AscendingOrder)
+        # Enable column sorting by clicking headers
+        self.ui.tableView.setSortingEnabled(True)
+        # Sort by industry name (column 0) ascending by default
+        self.ui.tableView.sortByColumn(0, Qt.SortOrder.AscendingOrder)
 
     def save_file(self):
         """Save the industry configuration to the currently loaded file"""
@@ -265,6 +315,12 @@ class MainWindow(QMainWindow):
             self.save_file_as()
             return
 
+        # Nothing to write when the industries are still what the file on disk holds
+        if indFile1.content_hash() == self.saved_hash and file_stamp(self.current_filename) == self.saved_stamp:
+            self.table_model.clear_dirty_flags()
+            self.statusBar().showMessage(f'No changes to save in {os.path.basename(self.current_filename)}', 3000)
+            return
+
         # Confirm overwrite
         reply = QMessageBox.question(
             self,
@@ -279,9 +335,12 @@ class MainWindow(QMainWindow):
 
         # Write the binary file
         try:
-            with open(self.current_filename, 'wb') as ofp:
+            with PROFILER.action('save file'), open(self.current_filename, 'wb') as ofp:
                 new_content = indFile1.to_bytes()
                 ofp.write(new_content)
+            if self.file_watcher is not None:
+                self.file_watcher.mark_current()  # Not a change made by another program
+            self.mark_saved()
 
             # Clear dirty flags since all changes are now saved
             self.table_model.clear_dirty_flags()
@@ -293,6 +352,11 @@ class MainWindow(QMainWindow):
         except Exception as e:
             QMessageBox.critical(self, "Save Failed", f"Failed to save file:\n{str(e)}")
 
+    def mark_saved(self):
+        # Remember what the current file holds, so saving it without changes can be skipped
+        self.saved_hash = indFile1.content_hash()
+        self.saved_stamp = file_stamp(self.current_filename)
+
     def save_file_as(self):
         """Save the industry configuration to a new file"""
         # Check if any data is loaded
@@ -314,7 +378,7 @@ class MainWindow(QMainWindow):
 
         # Write the binary file
         try:
-            with open(file_name, 'wb') as ofp:
+            with PROFILER.action('save file'), open(file_name, 'wb') as ofp:
                 new_content = indFile1.to_bytes()
                 ofp.write(new_content)
 
@@ -323,6 +387,9 @@ class MainWindow(QMainWindow):
 
             # Update current filename to the new file
             self.current_filename = file_name
+            self.mark_saved()
+            if self.ui.actionWatchFile.isChecked():
+                self.file_watcher = FileWatcher(file_name)
 
             # Update file info label in menu bar corner (show filename only)
             filename = os.path.basename(file_name)
@@ -345,12 +412,17 @@ class MainWindow(QMainWindow):
         display_row = index.row()
         # Get the original index in the data structure (before sorting)
         original_index = self.table_model.get_original_index(display_row)
+        self.open_industry(original_index)
 
+    def open_industry(self, original_index, producer=None):
+        """Open the detail dialog for an industry, optionally with one producer's tags selected"""
         if original_index < len(indFile1.industries):
             industry = indFile1.industries[original_index]
 
             # Open the detail dialog, passing the original index
-            dialog = IndustryDetailDialog(industry, cardict, self, industry_row=original_index)
+            dialog = self.get_detail_dialog(industry, original_index)
+            if producer is not None:
+                dialog.select_producer(producer)
 
             # Store reference to open dialog
             self.open_detail_dialog = dialog
@@ -360,15 +432,122 @@ class MainWindow(QMainWindow):
             # Clear reference when dialog closes
             self.open_detail_dialog = None
 
-            # If user clicked Save, refresh the table and mark as dirty
+            # If user clicked Save, the row was refreshed and marked dirty through on_industries_changed
             if result == IndustryDetailDialog.DialogCode.Accepted:
-                industry_data = [ind.to_dict() for ind in indFile1.industries]
-                self.table_model.update_data(industry_data)
-                # Find the new display row for this original index after re-sorting
-                new_display_row = self.table_model._original_indices.index(original_index)
-                self.table_model.mark_row_dirty(new_display_row)  # Mark this industry as having unsaved changes
                 self.statusBar().showMessage(f'Updated: {industry.name}', 3000)
 
+    def on_industries_changed(self, positions):
+        """Refresh and mark dirty the table rows of industries that were edited"""
+        changed_rows = {i: indFile1.industries[i].to_dict() for i in positions}
+        self.table_model.update_rows(changed_rows)
+        if self.results_panel is not None:
+            self.results_panel.model.refresh()
+
+    def set_watching(self, checked):
+        """Start or stop reloading the loaded file when another program changes it"""
+        if checked:
+            # With no file loaded yet, watching starts with the next file opened
+            self.file_watcher = FileWatcher(self.current_filename) if self.current_filename else None
+            self.watch_timer.start()
+            self.statusBar().showMessage('Watching the loaded file for changes', 3000)
+        else:
+            self.watch_timer.stop()
+            self.file_watcher = None
+
+    def check_watched_file(self):
+        """Reload only the records that changed when the watched file was rewritten"""
+        if self.file_watcher is None or not self.current_filename or not self.file_watcher.changed():
+            return
+        filename = os.path.basename(self.current_filename)
+        if self.table_model._dirty_rows:
+            reply = QMessageBox.question(
+                self,
+                'File Changed',
+                f'{filename} was changed by another program.\n\n'
+                f'Reload it and discard your {len(self.table_model._dirty_rows)} unsaved changes?',
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+                QMessageBox.StandardButton.No
+            )
+            if reply == QMessageBox.StandardButton.No:
+                return
+        with PROFILER.action('reload file'):
+            try:
+                result = reload_file(indFile1, self.current_filename)
+            except (OSError, ValueError) as e:
+                # Usually a file still being written; it is read again on its next change
+                self.statusBar().showMessage(f'Could not reload {filename}: {e}', 5000)
+                return
+            with PROFILER.phase(PHASE_MODEL):
+                if result.moved or len(result.removed) != len(result.added):
+                    self.table_model.update_data([ind.to_dict() for ind in indFile1.industries])
+                else:
+                    self.table_model.update_rows({i: industry.to_dict() for i, industry in result.added},
+                                                 mark_dirty=False)
+        self.table_model.clear_dirty_flags()
+        self.mark_saved()
+        update_validation(indFile1, result, cartypes)
+        if self.results_panel is not None:
+            self.results_panel.model.refresh()
+        self.file_info_label.setText(f'{filename}  [{indFile1.num_rec} industries]')
+        self.statusBar().showMessage(f'Reloaded {filename}: {result.summary()}', 5000)
+
+    def set_profiling(self, checked):
+        """Turn collecting phase timings on or off (also set by the --profile option)"""
+        PROFILER.enabled = checked
+        if checked:
+            PROFILER.reset()
+            self.profile_label.setText('Profiling: no timings yet')
+        self.profile_label.setVisible(checked)
+
+    def profile_next_action(self):
+        PROFILER.profile_next()
+        self.statusBar().showMessage('The next open, save, sort or find runs under cProfile', 5000)
+
+    def on_profile_updated(self, profiler):
+        if profiler.enabled:
+            self.profile_label.setText(f'Profiling: {profiler.summary()}')
+        if profiler.last_cprofile is not None and profiler.last_cprofile is not self._shown_cprofile:
+            # The console shows the full report; it is also part of Save Profile Timings
+            self._shown_cprofile = profiler.last_cprofile
+            print(profiler.last_cprofile)
+            self.statusBar().showMessage('cProfile report printed to the console', 5000)
+
+    def save_profile(self):
+        """Write the collected timings and the last cProfile report to a JSON file"""
+        file_name, _ = QFileDialog.getSaveFileName(self, 'Save Profile Timings', 'r8profile.json',
+                                                   'JSON Files (*.json);;All Files (*)')
+        if not file_name:
+            return
+        try:
+            PROFILER.dump_json(file_name)
+        except OSError as e:
+            QMessageBox.critical(self, "Save Failed", f"Failed to save profile timings:\n{str(e)}")
+            return
+        self.statusBar().showMessage(f'Saved profile timings to {os.path.basename(file_name)}', 3000)
+
+    def industry_file(self):
+        return indFile1
+
+    def industry_position(self, industry):
+        """Return the original index of an industry in the loaded file, or -1"""
+        return indFile1.position(industry)
+
+    def show_search_results(self, hits, pattern, description, replace_text=""):
+        """List every hit of a search in the dockable results panel"""
+        if self.results_panel is None:
+            self.results_panel = ResultsPanel(self, cartypes)
+            self.addDockWidget(Qt.DockWidgetArea.BottomDockWidgetArea, self.results_panel)
+        file_name = os.path.basename(self.current_filename) if self.current_filename else ""
+        self.results_panel.show_results(hits, pattern, description, replace_text, file_name)
+
+    def get_detail_dialog(self, industry, industry_row=None):
+        """Return the shared industry detail dialog bound to the given industry"""
+        if self.detail_dialog is None:
+            self.detail_dialog = IndustryDetailDialog(industry, cartypes, self, industry_row=industry_row)
+        else:
+            self.detail_dialog.set_industry(industry, industry_row)
+        return self.detail_dialog
+
     def show_instructions(self):
         """Show the instructions dialog (non-modal)"""
         dialog = InstructionsDialog(self)
@@ -384,6 +563,44 @@ class MainWindow(QMainWindow):
         dialog = FindReplaceDialog(self)
         dialog.show()  # Use show() instead of exec() to allow non-modal operation
 
+    def show_folder_search(self):
+        """Show the search in folder dialog (non-modal)"""
+        dialog = FolderSearchDialog(cartypes, self)
+        dialog.show()
+
+    def show_statistics(self):
+        """Show statistics of the loaded file (non-modal)"""
+        dialog = StatsDialog(cartypes, self)
+        dialog.show()
+
+    def show_validation(self):
+        """Show the problems found by the validation rules (non-modal)"""
+        dialog = ValidationDialog(cartypes, self)
+        dialog.show()
+
+    def run_edit_script(self):
+        """Load an edit script, preview its changes and apply them if confirmed"""
+        if indFile1.num_rec == 0:
+            QMessageBox.warning(self, "No Data", "No industry data loaded. Please open a file first.")
+            return
+
+        file_name, _ = QFileDialog.getOpenFileName(self, 'Open Edit Script', '',
+                                                   'Edit Scripts (*.csv *.json);;All Files (*)')
+        if not file_name:
+            return
+
+        try:
+            plan = plan_script(indFile1, file_name, cartypes)
+        except (OSError, ValueError) as e:
+            QMessageBox.critical(self, "Edit Script Error", f"Failed to read edit script:\n{str(e)}")
+            return
+
+        dialog = EditScriptDialog(plan, os.path.basename(file_name), cartypes, self)
+        if dialog.exec() == EditScriptDialog.DialogCode.Accepted:
+            # Changed rows are refreshed and marked dirty through on_industries_changed
+            count = plan.apply()
+            self.statusBar().showMessage(f'Edit script applied: {count} changes', 3000)
+
     def check_updates_on_startup(self):
         """Check for updates on startup in background thread"""
         # Create worker and keep reference to prevent garbage collection
@@ -490,13 +707,16 @@ class MainWindow(QMainWindow):
 
 
 if __name__ == "__main__":
-    cardict = {}
-    indFile1 = IndustryFile()
+    # Folder search runs worker processes; needed when frozen by PyInstaller
+    multiprocessing.freeze_support()
+
+    if '--profile' in sys.argv:
+        # Start with Help > Profiling switched on
+        sys.argv.remove('--profile')
+        PROFILER.enabled = True
 
-    with open(carfile, mode='r') as file:
-        csvFile = csv.reader(file)
-        for lines in csvFile:
-            cardict[lines[0]] = lines[1]
+    cartypes = load_car_types(carfile)
+    indFile1 = IndustryFile()
 
     app = QApplication(sys.argv)
     window = MainWindow()
@@ -1,4 +1,10 @@
+import hashlib
 import struct
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+from r8profile import PROFILER, PHASE_HEADER, PHASE_RECORDS, PHASE_DECODE, PHASE_SERIALIZE
 
 version = '1.10'
 last_update = '19-Sep-2024'
@@ -10,16 +16,30 @@ INTLEN = 4
 SHTLEN = 2
 UTFLEN = 2  # Length of UTF-16 char
 SP_REC_PAD_LEN = 30  # Total of constant-length fields in SpawnPoint record
+MIN_PRODUCER_LEN = 3 * INTLEN + 2 * BYTLEN + 2 * INTLEN  # producer without tags or filters
+MIN_INDUSTRY_LEN = 4 * INTLEN + BYTLEN + 2 * INTLEN  # Industry with empty strings, no tracks and no producers
 
 
 def encode_run8string(in_string):
+    # Each character becomes two bytes holding its code rotated right by 4 bits, so codes up to 0xFFF fit
     b_temp_string = bytearray()
-    for k in range(0, len(in_string)):
-        b_temp_string += (ord(in_string[k]).to_bytes()[0] >> 4).to_bytes()
-        b_temp_string += ((ord(in_string[k]).to_bytes()[0] & 0x0F) << 4).to_bytes()
+    for ch in in_string:
+        code = ord(ch)
+        if code > 0xFFF:
+            raise ValueError(f"Character '{ch}' cannot be stored in a Run8 file")
+        b_temp_string.append(code >> 4)
+        b_temp_string.append((code & 0x0F) << 4)
     return b_temp_string
 
 
+def _check_count(mem_map, ptr, count, item_size, what):
+    # Reject a length or count read from a file that is negative or needs more bytes than are left
+    if count < 0 or ptr + count * item_size > len(mem_map):
+        if ptr > len(mem_map):
+            raise ValueError(f'{what} at offset {ptr} is past the end of the data ({len(mem_map)} bytes)')
+        raise ValueError(f'{what} {count} at offset {ptr} does not fit in the remaining {len(mem_map) - ptr} bytes')
+
+
 class SpawnPoint:
     '''
     Size in bytes of SpawnPoint attributes:
@@ -241,15 +261,19 @@ class industry_tag:
         ptr = mem_offset
         self.name_len = int.from_bytes(mem_map[ptr:ptr + INTLEN], 'little', signed=True)
         ptr += INTLEN
+        _check_count(mem_map, ptr, self.name_len, BYTLEN, 'Tag name length')
         self.enc_name = bytes(mem_map[ptr:ptr + self.name_len])  # name in encoded (4-bit rotated) format
         ptr += self.name_len
         self.name = ''
         # Decode characters of name via left-rotating 2 bytes (UTF-16) by 4 bits
         # This routine takes two consecutive bytes and decodes them to a single character byte (UTF-8)
-        for n in range(mem_offset + 4, mem_offset + 4 + self.name_len, 2):
+        for n in range(mem_offset + 4, mem_offset + 3 + self.name_len, 2):
             self.name += chr(mem_map[n] << 4 | mem_map[n + 1] >> 4)
+        if self.name_len % 2:
+            self.name += chr(mem_map[ptr - 1] << 4)  # Damaged odd length: the missing byte counts as 0
 
         self.len_in_bytes = ptr - mem_offset
+        self.owner = None  # producer holding this tag
 
     def __len__(self):
         return self.len_in_bytes
@@ -270,6 +294,14 @@ class industry_tag:
 
     def replaceName(self, new_name):
         """Replace the tag name with a new name"""
+        old_name = self.name
+        self._setName(new_name)
+        if self.owner is not None:
+            self.owner._tagRenamed(self, old_name)
+            self.owner.touch()
+
+    def _setName(self, new_name):
+        # Change the name without notifying the owning producer
         self.name = new_name
         self.enc_name = encode_run8string(new_name)
         self.name_len = len(self.enc_name)
@@ -285,13 +317,16 @@ class industry_filter:
         ptr = mem_offset
         self.name_len = int.from_bytes(mem_map[ptr:ptr + INTLEN], 'little', signed=True)
         ptr += INTLEN
+        _check_count(mem_map, ptr, self.name_len, BYTLEN, 'Filter name length')
         self.enc_name = bytes(mem_map[ptr:ptr + self.name_len])  # name in encoded (4-bit rotated) format
         ptr += self.name_len
         self.name = ''
         # Decode characters of name via left-rotating 2 bytes (UTF-16) by 4 bits
         # This routine takes two consecutive bytes and decodes them to a single character byte (UTF-8)
-        for n in range(mem_offset + 4, mem_offset + 4 + self.name_len, 2):
+        for n in range(mem_offset + 4, mem_offset + 3 + self.name_len, 2):
             self.name += chr(mem_map[n] << 4 | mem_map[n + 1] >> 4)
+        if self.name_len % 2:
+            self.name += chr(mem_map[ptr - 1] << 4)  # Damaged odd length: the missing byte counts as 0
 
         self.len_in_bytes = ptr - mem_offset
 
@@ -341,6 +376,7 @@ class producer:
         ptr += INTLEN
         self.num_tags = int.from_bytes(mem_map[ptr:ptr + INTLEN], 'little', signed=True)
         ptr += INTLEN
+        _check_count(mem_map, ptr, self.num_tags, INTLEN, 'Number of tags')
         # Always initialize tags list (even if empty)
         self.tags = list()
         if self.num_tags > 0:
@@ -371,8 +407,14 @@ class producer:
             # Update num_tags to reflect the actual number after splitting
             self.num_tags = len(self.tags)
 
+        self.owner = None  # Industry holding this producer
+        for tag in self.tags:
+            tag.owner = self
+        self._countTags()
+
         self.num_filters = int.from_bytes(mem_map[ptr:ptr + INTLEN], 'little', signed=True)
         ptr += INTLEN
+        _check_count(mem_map, ptr, self.num_filters, INTLEN, 'Number of filters')
         # Always initialize filter list (even if empty)
         self.filter = list()
         if self.num_filters > 0:
@@ -391,31 +433,125 @@ class producer:
             retStr += f'{tag.name}, '
         return retStr[:-2] if retStr else ''
 
+    def touch(self):
+        # Report a change of this producer to the file holding it
+        if self.owner is not None:
+            self.owner.touch()
+
+    def tagIndex(self):
+        # Return the TagIndex of the file this producer belongs to (None when detached)
+        industry = self.owner
+        if industry is None or industry.owner is None:
+            return None
+        return industry.owner.tag_index
+
+    def _countTags(self):
+        # Rebuild the tag name -> occurrences map used for membership tests
+        self._tag_counts = dict()
+        for tag in self.tags:
+            self._tag_counts[tag.name] = self._tag_counts.get(tag.name, 0) + 1
+
+    def _tagRenamed(self, tag, old_name):
+        # Called by industry_tag.replaceName: keep the counts and the file's tag index current
+        self._tag_counts[old_name] -= 1
+        if not self._tag_counts[old_name]:
+            del self._tag_counts[old_name]
+        self._tag_counts[tag.name] = self._tag_counts.get(tag.name, 0) + 1
+        tag_index = self.tagIndex()
+        if tag_index is not None:
+            tag_index.rename(tag, old_name)
+
+    def hasTag(self, name):
+        return name in self._tag_counts
+
+    def replace_tags(self, mapping):
+        """Rename tags in one pass: mapping is {old name: new name}, an empty new name deletes
+
+        Every occurrence of a mapped name is changed (duplicated tags included)
+        and the remaining tags keep their order. Returns the number of tags changed.
+        """
+        # Membership test against the counts first so untouched producers cost O(distinct tags)
+        if not any(name in mapping for name in self._tag_counts):
+            return 0
+        tag_index = self.tagIndex()
+        kept = list()
+        changed = 0
+        for tag in self.tags:
+            new_name = mapping.get(tag.name)
+            if new_name is None or new_name == tag.name:
+                kept.append(tag)
+                continue
+            changed += 1
+            if new_name:
+                old_name = tag.name
+                tag._setName(new_name)
+                if tag_index is not None:
+                    tag_index.rename(tag, old_name)
+                kept.append(tag)
+            else:
+                if tag_index is not None:
+                    tag_index.remove(tag)
+                tag.owner = None
+        if changed:
+            self.tags = kept
+            self.num_tags = len(self.tags)
+            self._countTags()
+            self.touch()
+        return changed
+
+    def delete_tags(self, names):
+        """Delete every occurrence of each tag name in names; returns the number of tags removed"""
+        return self.replace_tags(dict.fromkeys(names, ''))
+
+    def removeTag(self, tag):
+        """Delete one particular tag object (a single occurrence of a duplicated name)"""
+        if tag.owner is not self:
+            return
+        self.tags.remove(tag)
+        self.num_tags = len(self.tags)
+        tag_index = self.tagIndex()
+        if tag_index is not None:
+            tag_index.remove(tag)
+        tag.owner = None
+        self._countTags()
+        self.touch()
+
     def deleteTag(self, tag):
-        for i in range(self.num_tags):
-            if self.tags[i].name == tag:
-                self.tags.pop(i)
-                self.num_tags -= 1
-                break  # What happens here if a tag is duplicated?
+        # Every occurrence is removed so a duplicated tag does not survive the delete
+        self.delete_tags((tag,))
 
     def replaceTag(self, orig_tag, new_tag=''):
-        if not new_tag:
-            self.deleteTag(orig_tag)
-            return
-        for i in range(self.num_tags):
-            if self.tags[i].name == orig_tag:
-                self.tags[i].name = new_tag
-                self.tags[i].enc_name = encode_run8string(new_tag)
-                self.tags[i].name_len = len(self.tags[i].enc_name)
-                break
+        self.replace_tags({orig_tag: new_tag})
 
-    def returnAttrs(self, prefix, cardict):
+    def setTags(self, tag_names):
+        """Replace all tags of this producer with the given list of names"""
+        tag_index = self.tagIndex()
+        for tag in self.tags:
+            if tag_index is not None:
+                tag_index.remove(tag)
+            tag.owner = None
+        self.tags = list()
+        for tag_name in tag_names:
+            tag_data = bytearray()
+            enc_tag = encode_run8string(tag_name)
+            tag_data.extend(len(enc_tag).to_bytes(INTLEN, 'little', signed=True))
+            tag_data.extend(enc_tag)
+            new_tag = industry_tag(tag_data, 0)
+            new_tag.owner = self
+            self.tags.append(new_tag)
+            if tag_index is not None:
+                tag_index.add(self.owner, self, new_tag)
+        self.num_tags = len(self.tags)
+        self._countTags()
+        self.touch()
+
+    def returnAttrs(self, prefix, cartypes):
         retstr = ''
         if self.num_tags == 0:
             retstr += f'{prefix}<null producer>'
             return retstr
         retstr += f'{prefix}Header      : {self.rec_type}\n'
-        retstr += f'{prefix}Car type id : {self.bIndex} ({cardict[str(self.bIndex)]})\n'
+        retstr += f'{prefix}Car type id : {self.bIndex} ({cartypes.name(self.bIndex)})\n'
         retstr += f'{prefix}Prod Mty    : {self.produce_empties}\n'
         retstr += f'{prefix}Hours       : {self.proc_hours}\n'
         retstr += f'{prefix}Capacity    : {self.capacity}\n'
@@ -650,9 +786,15 @@ class Industry:
     def _decodeString(self, mem_map, range_start, range_end):
         # Decode characters of name via left-rotating 2 bytes (UTF-16) by 4 bits
         # This routine takes two consecutive bytes and decodes them to a single character byte (UTF-8)
+        if PROFILER.enabled:
+            start = time.perf_counter_ns()
         retstr = ''
-        for n in range(range_start, range_end, 2):
+        for n in range(range_start, range_end - 1, 2):
             retstr += chr(mem_map[n] << 4 | mem_map[n + 1] >> 4)
+        if (range_end - range_start) % 2:
+            retstr += chr(mem_map[range_end - 1] << 4)  # Damaged odd length: the missing byte counts as 0
+        if PROFILER.enabled:
+            PROFILER.accumulate(PHASE_DECODE, time.perf_counter_ns() - start)
         return retstr
 
     def __init__(self, mem_map, mem_offset):
@@ -661,18 +803,21 @@ class Industry:
         ptr += INTLEN
         self.name_len = int.from_bytes(mem_map[ptr:ptr + INTLEN], 'little', signed=True)
         ptr += INTLEN
+        _check_count(mem_map, ptr, self.name_len, BYTLEN, 'Name length')
         self.enc_name = bytes(mem_map[ptr:ptr + self.name_len])  # name in encoded (4-bit rotated) format
         ptr += self.name_len
         self.name = self._decodeString(mem_map, mem_offset + 8, mem_offset + 8 + self.name_len)
         self.local_name_len = int.from_bytes(mem_map[ptr:ptr + INTLEN], 'little', signed=True)
         ptr += INTLEN
+        _check_count(mem_map, ptr, self.local_name_len, BYTLEN, 'Local name length')
         self.enc_local_name = bytes(mem_map[ptr:ptr + self.local_name_len])  # name in encoded (4-bit rotated) format
         ptr += self.local_name_len
         self.local_name = self._decodeString(mem_map, mem_offset + 12 + self.name_len,
                                              mem_offset + 12 + self.name_len + self.local_name_len)
         self.trk_sym_len = int.from_bytes(mem_map[ptr:ptr + INTLEN], 'little', signed=True)
         ptr += INTLEN
-        self.enc_trk_sym = bytes(mem_map[ptr:ptr + self.name_len])  # name in encoded (4-bit rotated) format
+        _check_count(mem_map, ptr, self.trk_sym_len, BYTLEN, 'Track symbol length')
+        self.enc_trk_sym = bytes(mem_map[ptr:ptr + self.trk_sym_len])  # name in encoded (4-bit rotated) format
         ptr += self.trk_sym_len
         self.trk_sym = self._decodeString(mem_map, mem_offset + 16 + self.name_len + self.local_name_len,
                                           mem_offset + 16 + self.name_len + self.local_name_len + self.trk_sym_len)
@@ -680,21 +825,34 @@ class Industry:
         ptr += BYTLEN
         self.number_of_tracks = int.from_bytes(mem_map[ptr:ptr + INTLEN], 'little', signed=True)
         ptr += INTLEN
+        _check_count(mem_map, ptr, self.number_of_tracks, INTLEN * 4, 'Number of tracks')
+        # Always initialize track list (even if empty)
+        self.track = list()
         if self.number_of_tracks > 0:
-            self.track = list()
             for i in range(self.number_of_tracks):
                 self.track.append(industry_track(mem_map, ptr))
                 ptr += len(self.track[-1])
 
         self.num_producers = int.from_bytes(mem_map[ptr:ptr + INTLEN], 'little', signed=True)
         ptr += INTLEN
+        _check_count(mem_map, ptr, self.num_producers, MIN_PRODUCER_LEN, 'Number of producers')
+        # Always initialize producer list (even if empty)
+        self.producer = list()
         if self.num_producers > 0:
-            self.producer = list()
             for i in range(self.num_producers):
                 self.producer.append(producer(mem_map, ptr))
+                self.producer[-1].owner = self
                 ptr += len(self.producer[-1])
 
+        if ptr > len(mem_map):
+            raise ValueError(f'Record runs past the end of the data ({ptr - len(mem_map)} bytes missing)')
         self.len_in_bytes = ptr - mem_offset
+        self.owner = None  # IndustryFile holding this industry
+        # Where this record was parsed from, so unchanged records can be compared without decoding
+        self._source = mem_map
+        self._span = (mem_offset, ptr)
+        self.modified = False
+        self._hash = None  # content_hash(), computed on first use
 
     def __str__(self):
         return str(self.__class__) + ": " + str(self.__dict__)
@@ -702,13 +860,38 @@ class Industry:
     def __len__(self):
         return self.len_in_bytes
 
+    def to_bytes(self):
+        # Return a bytearray of this industry record
+        barray = bytearray()
+        barray += self.unk1
+        barray += self.name_len.to_bytes(INTLEN, 'little')
+        # Unpack name
+        for j in range(0, self.name_len):
+            barray += self.enc_name[j].to_bytes(BYTLEN, 'little')
+        barray += self.local_name_len.to_bytes(INTLEN, 'little')
+        # Unpack local name
+        for j in range(0, self.local_name_len):
+            barray += self.enc_local_name[j].to_bytes(BYTLEN, 'little')
+        barray += self.trk_sym_len.to_bytes(INTLEN, 'little')
+        # Unpack track symbol
+        for j in range(0, self.trk_sym_len):
+            barray += self.enc_trk_sym[j].to_bytes(BYTLEN, 'little')
+        barray += self.process_in_blocks.to_bytes(BYTLEN, 'little')
+        barray += self.number_of_tracks.to_bytes(INTLEN, 'little')
+        for j in range(0, self.number_of_tracks):
+            barray += self.track[j].to_bytes()
+        barray += self.num_producers.to_bytes(INTLEN, 'little')
+        for j in range(0, self.num_producers):
+            barray += self.producer[j].to_bytes()
+        return barray
+
     def dumpAttrs(self):
         return [self.name, self.local_name, self.trk_sym]
 
     def dumpHeader(self):
         return
 
-    def printAttrs(self, cardict):
+    def printAttrs(self, cartypes):
         print(f'Name            : {self.name}')
         print(f'local           : {self.local_name}')
         print(f'Symbol          : {self.trk_sym}\n')
@@ -720,22 +903,63 @@ class Industry:
         print(f'---------------------')
         for i in range(self.num_producers):
             if self.producer[i].num_tags > 0:
-                print(self.producer[i].returnAttrs(f'P{i + 1}> ', cardict))
+                print(self.producer[i].returnAttrs(f'P{i + 1}> ', cartypes))
+
+    def touch(self):
+        # Report a change of this industry to the file holding it
+        self.modified = True
+        self._hash = None
+        if self.owner is not None:
+            self.owner.touch(self)
+
+    def source_bytes(self):
+        """Return the bytes this industry was parsed from, or None once it has been modified"""
+        if self.modified:
+            return None
+        start, end = self._span
+        return self._source[start:end]
+
+    def content_hash(self):
+        """Return a 16-byte hash of this industry's record, kept until the industry is modified
+
+        Taken over the bytes the record was parsed from, or once modified over what
+        to_bytes() writes, so records with the same bytes have the same hash in any file.
+        """
+        if self._hash is None:
+            source = self.source_bytes()
+            self._hash = record_digest(source if source is not None else self.to_bytes())
+        return self._hash
+
+    def batch(self):
+        # Group several edits of this industry into one change notification
+        return self.owner.batch() if self.owner is not None else nullcontext()
 
     def replaceName(self, new_name):
+        old_name = self.name
         self.name = new_name
         self.enc_name = encode_run8string(new_name)
         self.name_len = len(self.enc_name)
+        self._reindex('name', old_name)
 
     def replaceLocalName(self, new_name):
+        old_name = self.local_name
         self.local_name = new_name
         self.enc_local_name = encode_run8string(new_name)
         self.local_name_len = len(self.enc_local_name)
+        self._reindex('local_name', old_name)
 
     def replaceSymbol(self, new_name):
+        old_name = self.trk_sym
         self.trk_sym = new_name
         self.enc_trk_sym = encode_run8string(new_name)
         self.trk_sym_len = len(self.enc_trk_sym)
+        self._reindex('trk_sym', old_name)
+
+    def _reindex(self, attr, old_value):
+        # Move this industry within the file's lookup index for attr, then report the change
+        if self.owner is not None:
+            self.owner.reindex(self, attr, old_value)
+        self.touch()
 
     def to_dict(self):
         """Convert Industry to dictionary for table display"""
@@ -749,36 +973,490 @@ class Industry:
         }
 
 
+class FieldIndex:
+    '''
+    Hash index of one Industry attribute (name, local_name or trk_sym): value -> industries.
+    Kept current by Industry.replaceName / replaceLocalName / replaceSymbol.
+    '''
+
+    def __init__(self, attr):
+        self.attr = attr
+        self._entries = dict()  # value -> {industry: None} (an insertion-ordered set)
+
+    def build(self, industries):
+        self._entries = dict()
+        for industry in industries:
+            self.add(industry)
+
+    def add(self, industry):
+        self._entries.setdefault(getattr(industry, self.attr), dict())[industry] = None
+
+    def remove(self, industry, value):
+        entries = self._entries.get(value)
+        if entries is not None:
+            entries.pop(industry, None)
+            if not entries:
+                del self._entries[value]
+
+    def move(self, industry, old_value):
+        self.remove(industry, old_value)
+        self.add(industry)
+
+    def lookup(self, value):
+        return list(self._entries.get(value, ()))
+
+    def count(self, value):
+        return len(self._entries.get(value, ()))
+
+    def values(self):
+        return self._entries.keys()
+
+
+class TagIndex:
+    '''
+    Inverted index of processed tags: tag name -> every (industry, producer, tag) using it.
+    Built once when a file is loaded and kept current by industry_tag.replaceName,
+    producer.replace_tags / delete_tags / removeTag / setTags.
+    '''
+
+    def __init__(self):
+        self._entries = dict()  # name -> {industry_tag: (industry, producer)}
+        self._order = dict()  # industry -> position in the file
+
+    def build(self, industries):
+        self._entries = dict()
+        self._order = dict()
+        for i, industry in enumerate(industries):
+            self._order[industry] = i
+            for prod in industry.producer:
+                for tag in prod.tags:
+                    self._entries.setdefault(tag.name, dict())[tag] = (industry, prod)
+
+    def add(self, industry, prod, tag):
+        self._entries.setdefault(tag.name, dict())[tag] = (industry, prod)
+
+    def remove(self, tag, name=None):
+        name = tag.name if name is None else name
+        entries = self._entries.get(name)
+        if entries is not None:
+            entries.pop(tag, None)
+            if not entries:
+                del self._entries[name]
+
+    def rename(self, tag, old_name):
+        entries = self._entries.get(old_name)
+        if entries is None or tag not in entries:
+            return
+        owners = entries[tag]
+        self.remove(tag, old_name)
+        self._entries.setdefault(tag.name, dict())[tag] = owners
+
+    def reorder(self, industries):
+        # Record new file positions after industries were inserted or removed
+        self._order = {industry: i for i, industry in enumerate(industries)}
+
+    def locate(self, name):
+        """Return [(industry, producer position, producer, tag position)] for a tag name, in file order"""
+        # Group the uses by industry, then walk each industry's producers and the tags
+        # of the matching ones once, instead of searching the lists for every use
+        entries = self._entries.get(name, {})
+        owners = dict()  # industry -> {producer: None}
+        for industry, prod in entries.values():
+            owners.setdefault(industry, dict())[prod] = None
+        matches = []
+        for industry in sorted(owners, key=lambda ind: self._order.get(ind, -1)):
+            producers = owners[industry]
+            for prod_pos, prod in enumerate(industry.producer):
+                if prod in producers:
+                    matches.extend((industry, prod_pos, prod, tag_pos)
+                                   for tag_pos, tag in enumerate(prod.tags) if tag in entries)
+        return matches
+
+    def lookup(self, name):
+        """Return [(industry, producer, tag position)] for a tag name, in file order"""
+        return [(industry, prod, tag_pos) for industry, prod_pos, prod, tag_pos in self.locate(name)]
+
+    def count(self, name):
+        return len(self._entries.get(name, ()))
+
+    def counts(self):
+        """Return {tag name: number of uses} for every distinct tag"""
+        return {name: len(entries) for name, entries in self._entries.items()}
+
+    def position(self, industry):
+        return self._order.get(industry, -1)
+
+
+class IndustrySummary:
+    '''
+    Names and processed tags of one industry record, as read by scan_industries.
+        producers       : [(bIndex, [tag names])] in file order
+    '''
+
+    def __init__(self, position, name, local_name, trk_sym, producers):
+        self.position = position
+        self.name = name
+        self.local_name = local_name
+        self.trk_sym = trk_sym
+        self.producers = producers
+
+
+_INT32 = struct.Struct('<i')
+_HIGH_NIBBLE = bytes((b << 4) & 0xFF for b in range(256))
+_LOW_NIBBLE = bytes(b >> 4 for b in range(256))
+
+
+def _scanString(mem_map, ptr):
+    # Decode a length-prefixed run8 string at ptr, returning (string, offset after it)
+    str_len = int.from_bytes(mem_map[ptr:ptr + INTLEN], 'little', signed=True)
+    ptr += INTLEN
+    _check_count(mem_map, ptr, str_len, BYTLEN, 'String length')
+    raw = bytes(mem_map[ptr:ptr + str_len])
+    high = raw[0::2]
+    if str_len % 2 or high and max(high) > 0x0F:
+        # Characters above 0xFF, or a damaged odd length: decode one at a time like Industry._decodeString
+        chars = [chr(raw[n] << 4 | raw[n + 1] >> 4) for n in range(0, str_len - 1, 2)]
+        if str_len % 2:
+            chars.append(chr(raw[-1] << 4))
+        return ''.join(chars), ptr + str_len
+    # Rotate every character with two table lookups and one OR over the whole string
+    high = high.translate(_HIGH_NIBBLE)
+    low = raw[1::2].translate(_LOW_NIBBLE)
+    value = int.from_bytes(high, 'big') | int.from_bytes(low, 'big')
+    return value.to_bytes(len(low), 'big').decode('latin-1'), ptr + str_len
+
+
+def _skipString(mem_map, ptr):
+    # Return the offset after a length-prefixed run8 string without decoding it
+    str_len = int.from_bytes(mem_map[ptr:ptr + INTLEN], 'little', signed=True)
+    _check_count(mem_map, ptr + INTLEN, str_len, BYTLEN, 'String length')
+    return ptr + INTLEN + str_len
+
+
+def scan_industries(fcontent):
+    """Yield an IndustrySummary for each industry of an .ind file
+
+    Only the name fields and processed tags are decoded; track records and
+    filters are skipped by their lengths, which makes this much cheaper than
+    a full IndustryFile parse when a file only needs to be searched.
+    """
+    mem_ptr = INTLEN
+    num_rec = int.from_bytes(fcontent[mem_ptr:mem_ptr + INTLEN], 'little')
+    mem_ptr += INTLEN
+    for i in range(num_rec):
+        ptr = mem_ptr + INTLEN  # unk1
+        name, ptr = _scanString(fcontent, ptr)
+        local_name, ptr = _scanString(fcontent, ptr)
+        trk_sym, ptr = _scanString(fcontent, ptr)
+        ptr += BYTLEN  # process_in_blocks
+        number_of_tracks = int.from_bytes(fcontent[ptr:ptr + INTLEN], 'little', signed=True)
+        _check_count(fcontent, ptr + INTLEN, number_of_tracks, INTLEN * 4, 'Number of tracks')
+        ptr += INTLEN + number_of_tracks * INTLEN * 4
+        num_producers = int.from_bytes(fcontent[ptr:ptr + INTLEN], 'little', signed=True)
+        ptr += INTLEN
+        _check_count(fcontent, ptr, num_producers, MIN_PRODUCER_LEN, 'Number of producers')
+        producers = list()
+        for j in range(num_producers):
+            bIndex = fcontent[ptr + INTLEN]
+            ptr += INTLEN + 2 * BYTLEN + 2 * INTLEN  # rec_type, bIndex, produce_empties, proc_hours, capacity
+            num_tags = int.from_bytes(fcontent[ptr:ptr + INTLEN], 'little', signed=True)
+            ptr += INTLEN
+            _check_count(fcontent, ptr, num_tags, INTLEN, 'Number of tags')
+            tags = list()
+            for k in range(num_tags):
+                tag_name, ptr = _scanString(fcontent, ptr)
+                # Legacy space-delimited tags are split the same way producer() does
+                tags.extend(tag_name.split() if ' ' in tag_name else [tag_name])
+            num_filters = int.from_bytes(fcontent[ptr:ptr + INTLEN], 'little', signed=True)
+            ptr += INTLEN
+            _check_count(fcontent, ptr, num_filters, INTLEN, 'Number of filters')
+            for k in range(num_filters):
+                ptr = _skipString(fcontent, ptr)
+            producers.append((bIndex, tags))
+        if ptr > len(fcontent):
+            raise ValueError(f'Industry record {i} runs past the end of the file')
+        mem_ptr = ptr
+        yield IndustrySummary(i, name, local_name, trk_sym, producers)
+
+
+def _check_length(length, ptr, size):
+    # Return length, or fail record_spans() when it is negative or reaches past size
+    if length < 0 or ptr + length > size:
+        raise struct.error
+    return length
+
+
+def record_spans(fcontent):
+    """Return [(start, end)] of every industry record of an .ind file, found from the lengths alone"""
+    read_int = _INT32.unpack_from
+    size = len(fcontent)
+    num_rec = int.from_bytes(fcontent[INTLEN:2 * INTLEN], 'little')
+    mem_ptr = 2 * INTLEN
+    spans = list()
+    try:
+        for i in range(num_rec):
+            ptr = mem_ptr + INTLEN  # unk1
+            for k in range(3):  # name, local name, track symbol
+                ptr += INTLEN + _check_length(read_int(fcontent, ptr)[0], ptr + INTLEN, size)
+            ptr += BYTLEN  # process_in_blocks
+            number_of_tracks = read_int(fcontent, ptr)[0]
+            ptr += INTLEN + _check_length(number_of_tracks * INTLEN * 4, ptr + INTLEN, size)
+            num_producers = read_int(fcontent, ptr)[0]
+            ptr += INTLEN
+            _check_length(num_producers * MIN_PRODUCER_LEN, ptr, size)
+            for j in range(num_producers):
+                ptr += INTLEN + 2 * BYTLEN + 2 * INTLEN  # rec_type, bIndex, produce_empties, proc_hours, capacity
+                for k in range(2):  # tags, then filters
+                    count = read_int(fcontent, ptr)[0]
+                    ptr += INTLEN
+                    _check_length(count * INTLEN, ptr, size)
+                    for n in range(count):
+                        ptr += INTLEN + _check_length(read_int(fcontent, ptr)[0], ptr + INTLEN, size)
+            if ptr > size:
+                raise struct.error
+            spans.append((mem_ptr, ptr))
+            mem_ptr = ptr
+    except struct.error:
+        raise ValueError(f'Industry record {i} runs past the end of the file') from None
+    return spans
+
+
+def parse_industry(fcontent, offset, position):
+    """Parse the industry record at offset, raising ValueError naming the record when it is damaged"""
+    try:
+        return Industry(fcontent, offset)
+    except (ValueError, IndexError) as e:
+        raise ValueError(f'Industry record {position} at offset {offset}: {e}') from None
+
+
+def record_digest(record):
+    # Hash identifying the bytes of one industry record
+    return hashlib.blake2b(record, digest_size=16).digest()
+
+
+class ReloadResult:
+    """What IndustryFile.reload_from_bytes() changed
+
+    added   : [(position, industry)] records parsed from the new contents
+    removed : [industry] records no longer in the file
+    reused  : number of records kept because their bytes did not change
+    moved   : True when kept records changed position (records were inserted or removed)
+    """
+
+    def __init__(self, added, removed, reused, moved):
+        self.added = added
+        self.removed = removed
+        self.reused = reused
+        self.moved = moved
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.moved)
+
+    def summary(self):
+        return f'{len(self.added)} records parsed, {len(self.removed)} replaced or removed, {self.reused} unchanged'
+
+
 class IndustryFile:
     def __init__(self):
         self.unk1 = bytes(INTLEN)  # Unknown 4 bytes
         self.num_rec = 0  # Number of industries defined in the file
         self.industries = list()
+        self.tag_index = TagIndex()
+        self.name_index = FieldIndex('name')
+        self.local_index = FieldIndex('local_name')
+        self.symbol_index = FieldIndex('trk_sym')
+        self._field_indexes = {index.attr: index for index in (self.name_index, self.local_index, self.symbol_index)}
+        self.generation = 0  # Bumped on every change so derived data knows when to rebuild
+        self._positions = dict()  # industry -> position in self.industries
+        self._listeners = list()  # callables notified with the positions of changed industries
+        self._batch_depth = 0
+        self._batch_changed = set()
+        self._hash = None  # (generation, content_hash()) of the last call
+
+    def from_bytes(self, fcontent):
+        # Parse the contents of an industry file into this object
+        # Raises ValueError for damaged or truncated contents, leaving this object as it was
+        mem_ptr = 0
+        with PROFILER.phase(PHASE_HEADER):
+            if len(fcontent) < 2 * INTLEN:
+                raise ValueError(f'{len(fcontent)} bytes is too short for an industry file')
+            unk1 = fcontent[mem_ptr:mem_ptr + INTLEN]
+            mem_ptr += INTLEN
+            num_rec = int.from_bytes(fcontent[mem_ptr:mem_ptr + INTLEN], 'little')
+            mem_ptr += INTLEN
+            _check_count(fcontent, mem_ptr, num_rec, MIN_INDUSTRY_LEN, 'Number of industries')
+        with PROFILER.phase(PHASE_RECORDS):
+            industries = list()
+            for i in range(0, num_rec):
+                industries.append(parse_industry(fcontent, mem_ptr, i))
+                industries[i].owner = self
+                mem_ptr += len(industries[i])
+        self.unk1 = unk1
+        self.num_rec = num_rec
+        self.industries = industries
+        self.build_indexes()
+
+    def reload_from_bytes(self, fcontent):
+        """Bring this file up to date with new contents, parsing only the records whose bytes changed
+
+        Every record of the new contents is hashed and matched against the bytes the
+        current industries were read from (industries edited since are never kept).
+        Matching industries are kept as they are; the rest are parsed, and the lookup
+        indexes are updated for just the added and removed industries.
+        Returns a ReloadResult. Listeners are not notified; the caller refreshes its views.
+        """
+        spans = record_spans(fcontent)
+        unchanged = dict()  # digest -> deque of industries read from those bytes
+        for industry in self.industries:
+            if not industry.modified:
+                unchanged.setdefault(industry.content_hash(), deque()).append(industry)
+
+        industries = list()
+        added = list()
+        kept = dict()
+        for position, (start, end) in enumerate(spans):
+            digest = record_digest(fcontent[start:end])
+            candidates = unchanged.get(digest)
+            if candidates:
+                industry = candidates.popleft()
+                kept[industry] = (start, end)
+            else:
+                industry = parse_industry(fcontent, start, position)
+                industry.owner = self
+                industry._hash = digest
+                added.append((position, industry))
+            industries.append(industry)
+        removed = [industry for industry in self.industries if industry not in kept]
+        moved = any(self.position(industry) != position for position, industry in enumerate(industries)
+                    if industry in kept)
+
+        # Nothing is changed before here, so a damaged file leaves this one as it was
+        for industry, span in kept.items():
+            industry._source = fcontent
+            industry._span = span
+        for industry in removed:
+            self._unindex(industry)
+            industry.owner = None
+        self.unk1 = fcontent[:INTLEN]
+        self.num_rec = len(industries)
+        self.industries = industries
+        self._positions = {industry: i for i, industry in enumerate(industries)}
+        self.tag_index.reorder(industries)
+        for position, industry in added:
+            self._index(industry)
+        self.generation += 1
+        return ReloadResult(added, removed, len(kept), moved)
+
+    def _index(self, industry):
+        for index in self._field_indexes.values():
+            index.add(industry)
+        for prod in industry.producer:
+            for tag in prod.tags:
+                self.tag_index.add(industry, prod, tag)
+
+    def _unindex(self, industry):
+        for index in self._field_indexes.values():
+            index.remove(industry, getattr(industry, index.attr))
+        for prod in industry.producer:
+            for tag in prod.tags:
+                self.tag_index.remove(tag)
+
+    def build_indexes(self):
+        self._positions = {industry: i for i, industry in enumerate(self.industries)}
+        self.tag_index.build(self.industries)
+        for index in self._field_indexes.values():
+            index.build(self.industries)
+        self.generation += 1
+
+    def reindex(self, industry, attr, old_value):
+        # Keep the lookup index of attr current after an industry field was renamed
+        index = self._field_indexes.get(attr)
+        if index is not None and self.position(industry) >= 0:
+            index.move(industry, old_value)
+
+    def find(self, attr, value):
+        """Return the industries whose attr ('name', 'local_name' or 'trk_sym') equals value, in file order"""
+        matches = self._field_indexes[attr].lookup(value)
+        matches.sort(key=self.position)
+        return matches
+
+    def position(self, industry):
+        # Return the position of an industry in this file (-1 if it is not part of it)
+        return self._positions.get(industry, -1)
+
+    def content_hash(self):
+        """Return a 16-byte hash of the whole file: the header and every industry's content_hash()
+
+        Only the industries modified since the last call are hashed again, so
+        comparing the hash before and after a set of edits is cheap.
+        """
+        if self._hash is None or self._hash[0] != self.generation:
+            digest = hashlib.blake2b(self.unk1, digest_size=16)
+            digest.update(self.num_rec.to_bytes(INTLEN, 'little'))
+            for industry in self.industries:
+                digest.update(industry.content_hash())
+            self._hash = (self.generation, digest.digest())
+        return self._hash[1]
+
+    def duplicate_industries(self):
+        """Return [[positions]] of the industries whose records are byte for byte the same"""
+        positions = dict()
+        for i, industry in enumerate(self.industries):
+            positions.setdefault(industry.content_hash(), list()).append(i)
+        return [group for group in positions.values() if len(group) > 1]
+
+    def add_listener(self, callback):
+        """Register callback(positions) to be told which industries changed"""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def touch(self, industry=None):
+        # Called whenever an industry of this file is modified
+        self.generation += 1
+        if industry is None:
+            return
+        position = self.position(industry)
+        if position < 0:
+            return
+        if self._batch_depth:
+            self._batch_changed.add(position)
+        else:
+            self._notify([position])
+
+    @contextmanager
+    def batch(self):
+        """Group edits so listeners get one notification when the outermost batch ends
+
+            with indFile.batch():
+                for industry in matches:
+                    industry.replaceLocalName(new_name)
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0 and self._batch_changed:
+                changed = sorted(self._batch_changed)
+                self._batch_changed = set()
+                self._notify(changed)
+
+    def _notify(self, positions):
+        for callback in list(self._listeners):
+            callback(positions)
 
     def to_bytes(self):
         # Return a bytearray of this object
+        with PROFILER.phase(PHASE_SERIALIZE):
+            return self._to_bytes()
+
+    def _to_bytes(self):
         barray = bytearray()
         barray += self.unk1
         barray += self.num_rec.to_bytes(INTLEN, 'little')
         for industry in self.industries:
-            barray += industry.unk1
-            barray += industry.name_len.to_bytes(INTLEN, 'little')
-            # Unpack name
-            for j in range(0, industry.name_len):
-                barray += industry.enc_name[j].to_bytes(BYTLEN, 'little')
-            barray += industry.local_name_len.to_bytes(INTLEN, 'little')
-            # Unpack local name
-            for j in range(0, industry.local_name_len):
-                barray += industry.enc_local_name[j].to_bytes(BYTLEN, 'little')
-            barray += industry.trk_sym_len.to_bytes(INTLEN, 'little')
-            # Unpack track symbol
-            for j in range(0, industry.trk_sym_len):
-                barray += industry.enc_trk_sym[j].to_bytes(BYTLEN, 'little')
-            barray += industry.process_in_blocks.to_bytes(BYTLEN, 'little')
-            barray += industry.number_of_tracks.to_bytes(INTLEN, 'little')
-            for j in range(0, industry.number_of_tracks):
-                barray += industry.track[j].to_bytes()
-            barray += industry.num_producers.to_bytes(INTLEN, 'little')
-            for j in range(0, industry.num_producers):
-                barray += industry.producer[j].to_bytes()
+            barray += industry.to_bytes()
         return barray
@@ -0,0 +1,222 @@
+"""Memory accounting of a loaded industry file, per record type
+
+Loads a file under tracemalloc and adds up what every parsed object holds, so
+the effect of making records smaller can be measured:
+
+    python r8industryUtility.py memory Config.ind
+"""
+import json
+import sys
+import tracemalloc
+
+from r8lib import IndustryFile, Industry, producer, industry_tag, industry_filter, industry_track
+
+RECORD_TYPES = [Industry, producer, industry_tag, industry_filter, industry_track]
+
+# Categories of the report besides the record types
+ENCODED = 'encoded strings (enc_*)'
+DECODED = 'decoded strings'
+INDEXES = 'file indexes'
+ROWS = 'table rows (to_dict)'
+CATEGORIES = [cls.__name__ for cls in RECORD_TYPES] + [ENCODED, DECODED, INDEXES, ROWS]
+
+TOP_LINES = 10  # Source lines listed by allocated size
+_SKIPPED_ATTRS = ('owner', '_source')  # Back references, and the file content shared by all records
+
+
+def format_bytes(size):
+    if size >= 1 << 20:
+        return f'{size / (1 << 20):.1f} MiB'
+    if size >= 1 << 10:
+        return f'{size / (1 << 10):.1f} KiB'
+    return f'{size} B'
+
+
+class Usage:
+    """Objects and bytes counted for one category"""
+
+    def __init__(self):
+        self.count = 0  # Records, strings, or rows
+        self.bytes = 0
+        self.duplicates = 0  # Strings equal to one counted before, but a separate object
+        self.duplicate_bytes = 0
+        self._values = set()
+
+    def to_dict(self):
+        return {'count': self.count, 'bytes': self.bytes, 'duplicates': self.duplicates,
+                'duplicate_bytes': self.duplicate_bytes}
+
+
+class MemoryReport:
+    """Bytes held by the objects of one loaded file
+
+    Every object is counted once, under the first category it is found in;
+    strings and small ints shared between records are not counted again.
+    """
+
+    def __init__(self):
+        self.usage = {name: Usage() for name in CATEGORIES}
+        self.industries = 0
+        self.content_bytes = 0  # The file content, kept by the records for change detection
+        self.traced_load = 0  # Bytes tracemalloc saw allocated and kept by parsing
+        self.traced_peak = 0  # Highest traced memory while parsing
+        self.traced_rows = 0  # Bytes kept by building the table rows
+        self.top_lines = []  # [(file:line, bytes, blocks)] kept by parsing, largest first
+        self._seen = set()
+
+    def _sizeof(self, obj):
+        # Size of obj, or 0 if it was counted before
+        if id(obj) in self._seen:
+            return 0
+        self._seen.add(id(obj))
+        return sys.getsizeof(obj)
+
+    def add_string(self, value, category):
+        size = self._sizeof(value)
+        if not size:
+            return
+        usage = self.usage[category]
+        usage.count += 1
+        usage.bytes += size
+        if value in usage._values:
+            usage.duplicates += 1
+            usage.duplicate_bytes += size
+        else:
+            usage._values.add(value)
+
+    def add_value(self, value, category):
+        """Count value and whatever it contains, stopping at records and strings"""
+        if isinstance(value, tuple(RECORD_TYPES)):
+            return
+        if isinstance(value, str):
+            self.add_string(value, DECODED)
+            return
+        size = self._sizeof(value)
+        if not size:
+            return
+        self.usage[category].bytes += size
+        if isinstance(value, dict):
+            for key, item in value.items():
+                self.add_value(key, category)
+                self.add_value(item, category)
+        elif isinstance(value, (list, tuple, set, frozenset)):
+            for item in value:
+                self.add_value(item, category)
+
+    def add_record(self, record):
+        usage = self.usage[type(record).__name__]
+        usage.count += 1
+        usage.bytes += self._sizeof(record) + self._sizeof(record.__dict__)
+        for attr, value in record.__dict__.items():
+            if attr in _SKIPPED_ATTRS:
+                continue
+            if attr.startswith('enc_') and isinstance(value, (bytes, bytearray)):
+                self.add_string(value, ENCODED)
+            elif isinstance(value, str):
+                self.add_string(value, DECODED)
+            else:
+                self.add_value(value, type(record).__name__)
+
+    def add_file(self, indfile):
+        self.industries = len(indfile.industries)
+        for industry in indfile.industries:
+            self.add_record(industry)
+            for track in industry.track:
+                self.add_record(track)
+            for prod in industry.producer:
+                self.add_record(prod)
+                for tag in prod.tags:
+                    self.add_record(tag)
+                for filt in prod.filter:
+                    self.add_record(filt)
+        for index in (indfile.tag_index, indfile.name_index, indfile.local_index, indfile.symbol_index):
+            self.add_value(index.__dict__, INDEXES)
+        self.add_value(indfile._positions, INDEXES)
+
+    def add_rows(self, rows):
+        # rows as held by DictTableModel: (row dicts, display -> original index, original -> display row)
+        self.usage[ROWS].count = len(rows[0])
+        for part in rows:
+            self.add_value(part, ROWS)
+
+    def total(self):
+        return sum(usage.bytes for usage in self.usage.values())
+
+    def report(self):
+        """Return the report as printable lines"""
+        lines = [f'{"Category":<26} {"Count":>9} {"Bytes":>11} {"Per item":>9} {"Duplicates":>17}']
+        for name, usage in self.usage.items():
+            per_item = f'{usage.bytes / usage.count:.0f} B' if usage.count else ''
+            duplicates = f'{usage.duplicates} ({format_bytes(usage.duplicate_bytes)})' if usage.duplicates else ''
+            count = usage.count if usage.count or not usage.bytes else ''
+            lines.append(f'{name:<26} {count:>9} {format_bytes(usage.bytes):>11} {per_item:>9} '
+                         f'{duplicates:>17}')
+        lines.append(f'{"Total counted":<26} {"":>9} {format_bytes(self.total()):>11}')
+        lines.append(f'File content: {format_bytes(self.content_bytes)}, kept once by the records for change detection')
+        lines.append(f'tracemalloc: parsing kept {format_bytes(self.traced_load)} '
+                     f'(peak {format_bytes(self.traced_peak)}), table rows {format_bytes(self.traced_rows)}')
+        if self.top_lines:
+            lines.append('Largest allocations kept by parsing:')
+            for where, size, blocks in self.top_lines:
+                lines.append(f'  {format_bytes(size):>11} {blocks:>9} blocks  {where}')
+        return lines
+
+    def to_dict(self):
+        return {
+            'industries': self.industries,
+            'categories': {name: usage.to_dict() for name, usage in self.usage.items()},
+            'total_bytes': self.total(),
+            'content_bytes': self.content_bytes,
+            'traced_load_bytes': self.traced_load,
+            'traced_peak_bytes': self.traced_peak,
+            'traced_rows_bytes': self.traced_rows,
+            'top_lines': [{'where': where, 'bytes': size, 'blocks': blocks} for where, size, blocks in self.top_lines],
+        }
+
+    def dump_json(self, path):
+        with open(path, 'w') as ofp:
+            json.dump(self.to_dict(), ofp, indent=2)
+
+
+def table_rows(indfile):
+    """Build the table rows the way DictTableModel.update_data holds them"""
+    rows = [industry.to_dict() for industry in indfile.industries]
+    return rows, list(range(len(rows))), {i: i for i in range(len(rows))}
+
+
+def measure(fcontent, top=TOP_LINES):
+    """Parse fcontent under tracemalloc and return the MemoryReport of the result
+
+    Raises ValueError when fcontent is not a valid industry file.
+    """
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        before = tracemalloc.take_snapshot()
+        base = tracemalloc.get_traced_memory()[0]
+        indfile = IndustryFile()
+        indfile.from_bytes(fcontent)
+        loaded, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+        rows = table_rows(indfile)
+        with_rows = tracemalloc.get_traced_memory()[0]
+    finally:
+        if started:
+            tracemalloc.stop()
+
+    report = MemoryReport()
+    report.content_bytes = sys.getsizeof(fcontent)
+    report.traced_load = loaded - base
+    report.traced_peak = peak - base
+    report.traced_rows = with_rows - loaded
+    # Leave out the allocations of tracemalloc itself
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    stats = after.filter_traces(ignore).compare_to(before.filter_traces(ignore), 'lineno')
+    report.top_lines = [(str(stat.traceback[0]), stat.size_diff, stat.count_diff)
+                        for stat in stats[:top] if stat.size_diff > 0]
+    report._seen.add(id(fcontent))
+    report.add_file(indfile)
+    report.add_rows(rows)
+    return report
@@ -0,0 +1,238 @@
+"""Record-level binary patches between two industry files
+
+A patch holds the new file's header and a list of operations walking through
+the base file's records in order:
+
+    COPY n      keep the next n base records
+    SKIP n      drop the next n base records
+    REPLACE n   drop the next n base records and write n records from the patch
+    INSERT n    write n records from the patch
+
+followed by any bytes after the last record. Only added and changed records
+are stored, and the operations are zlib-compressed, so a patch stays small
+however big the file is. The hashes of the base and the result make sure a
+patch is only applied to the file it was made from.
+"""
+import bisect
+import hashlib
+import struct
+import zlib
+
+from r8diff import diff_files, pair_by
+from r8lib import IndustryFile, record_spans, INTLEN
+
+MAGIC = b'R8IPATCH'
+VERSION = 1
+DIGEST_SIZE = 32
+
+OP_END = 0
+OP_COPY = 1
+OP_SKIP = 2
+OP_REPLACE = 3
+OP_INSERT = 4
+OP_NAMES = {OP_COPY: 'copy', OP_SKIP: 'skip', OP_REPLACE: 'replace', OP_INSERT: 'insert'}
+
+# magic, version, base digest, base size, result digest, result size, result header (unk1, num_rec)
+_HEADER = struct.Struct(f'<8sB{DIGEST_SIZE}sQ{DIGEST_SIZE}sQ{2 * INTLEN}s')
+_OP = struct.Struct('<BI')
+_LENGTH = struct.Struct('<I')
+
+
+def file_digest(content):
+    """Hash identifying the whole contents of a file"""
+    return hashlib.blake2b(content, digest_size=DIGEST_SIZE).digest()
+
+
+class Patch:
+    """A decoded patch: its header fields and the operations [(op, count, [record bytes])]"""
+
+    def __init__(self, base_digest, base_size, result_digest, result_size, header, ops, tail):
+        self.base_digest = base_digest
+        self.base_size = base_size
+        self.result_digest = result_digest
+        self.result_size = result_size
+        self.header = header  # First 8 bytes of the result: unk1 and the number of industries
+        self.ops = ops
+        self.tail = tail  # Bytes after the last record of the result
+
+    def counts(self):
+        """Return {operation name: records}"""
+        counts = dict.fromkeys(OP_NAMES.values(), 0)
+        for op, count, records in self.ops:
+            counts[OP_NAMES[op]] += count
+        return counts
+
+    def summary(self):
+        return ', '.join(f'{count} {name}' for name, count in self.counts().items())
+
+    def to_bytes(self):
+        body = bytearray()
+        for op, count, records in self.ops:
+            body += _OP.pack(op, count)
+            for record in records:
+                body += _LENGTH.pack(len(record)) + record
+        body += _OP.pack(OP_END, 0) + self.tail
+        return _HEADER.pack(MAGIC, VERSION, self.base_digest, self.base_size, self.result_digest,
+                            self.result_size, self.header) + zlib.compress(bytes(body), 9)
+
+
+def read_patch(content):
+    """Decode the bytes of a patch into a Patch; raises ValueError when they are not one"""
+    if len(content) < _HEADER.size or content[:len(MAGIC)] != MAGIC:
+        raise ValueError('not an industry file patch')
+    magic, version, base_digest, base_size, result_digest, result_size, header = _HEADER.unpack_from(content)
+    if version != VERSION:
+        raise ValueError(f'patch format version {version} is not supported')
+    try:
+        body = memoryview(zlib.decompress(content[_HEADER.size:]))
+    except zlib.error as e:
+        raise ValueError(f'damaged patch [{e}]')
+    ops = list()
+    ptr = 0
+    try:
+        while True:
+            op, count = _OP.unpack_from(body, ptr)
+            ptr += _OP.size
+            if op == OP_END:
+                break
+            if op not in OP_NAMES:
+                raise ValueError(f'unknown patch operation {op} at offset {ptr - _OP.size}')
+            records = list()
+            if op in (OP_REPLACE, OP_INSERT):
+                for n in range(count):
+                    length = _LENGTH.unpack_from(body, ptr)[0]
+                    ptr += _LENGTH.size
+                    if ptr + length > len(body):
+                        raise ValueError('damaged patch: record runs past the end')
+                    records.append(body[ptr:ptr + length])
+                    ptr += length
+            ops.append((op, count, records))
+    except struct.error:
+        raise ValueError('damaged patch: operations run past the end') from None
+    return Patch(base_digest, base_size, result_digest, result_size, header, ops, body[ptr:])
+
+
+def _parse(content, what):
+    indfile = IndustryFile()
+    try:
+        indfile.from_bytes(content)
+    except ValueError as e:
+        raise ValueError(f'{what} is not a valid industry file [{e}]') from None
+    return indfile
+
+
+def _in_order(pairs):
+    """Return the longest run of (base position, new position) pairs increasing in both, as (new, base)
+
+    pairs come in base order; a record moved elsewhere then only costs its own
+    insertion instead of breaking every pair after it.
+    """
+    tails = list()  # tails[k]: index in pairs of the smallest new position ending a run of k + 1 pairs
+    tail_positions = list()  # The new positions of tails, for bisect
+    previous = [-1] * len(pairs)
+    for i, (base_position, new_position) in enumerate(pairs):
+        k = bisect.bisect_left(tail_positions, new_position)
+        if k:
+            previous[i] = tails[k - 1]
+        if k == len(tails):
+            tails.append(i)
+            tail_positions.append(new_position)
+        else:
+            tails[k] = i
+            tail_positions[k] = new_position
+    run = list()
+    i = tails[-1] if tails else -1
+    while i >= 0:
+        run.append((pairs[i][1], pairs[i][0]))
+        i = previous[i]
+    return run[::-1]
+
+
+def make_patch(base_content, new_content):
+    """Return (Patch turning base_content into new_content, FileDiff of the two files)
+
+    Records with identical bytes are paired with the diff engine's hash join;
+    pairs kept in order are copied from the base, and everything in between is
+    replaced, skipped or inserted. Raises ValueError when either file does not parse.
+    """
+    base_file = _parse(base_content, 'base file')
+    new_file = _parse(new_content, 'new file')
+    base_records = [(industry.content_hash(), position) for position, industry in enumerate(base_file.industries)]
+    new_records = [(industry.content_hash(), position) for position, industry in enumerate(new_file.industries)]
+    pairs = pair_by(base_records, new_records, lambda record: record[0])[0]
+    copied = dict(_in_order([(base_position, new_position) for (digest, base_position), (digest, new_position)
+                             in pairs]))  # new position -> base position, increasing in both
+
+    ops = list()
+    cursor = 0  # Next base record
+    pending = list()  # New records since the last copied one
+
+    def flush(base_position):
+        # Turn the records between two copied ones into replace / skip / insert operations
+        dropped = base_position - cursor
+        replaced = min(dropped, len(pending))
+        if replaced:
+            ops.append((OP_REPLACE, replaced, pending[:replaced]))
+        if dropped > replaced:
+            ops.append((OP_SKIP, dropped - replaced, []))
+        if len(pending) > replaced:
+            ops.append((OP_INSERT, len(pending) - replaced, pending[replaced:]))
+        pending.clear()
+
+    for new_position, industry in enumerate(new_file.industries):
+        base_position = copied.get(new_position)
+        if base_position is None:
+            pending.append(industry.source_bytes())
+            continue
+        flush(base_position)
+        if ops and ops[-1][0] == OP_COPY:
+            ops[-1] = (OP_COPY, ops[-1][1] + 1, [])
+        else:
+            ops.append((OP_COPY, 1, []))
+        cursor = base_position + 1
+    flush(len(base_records))
+
+    tail = new_content[new_file.industries[-1]._span[1] if new_file.industries else 2 * INTLEN:]
+    patch = Patch(file_digest(base_content), len(base_content), file_digest(new_content), len(new_content),
+                  bytes(new_content[:2 * INTLEN]), ops, bytes(tail))
+    return patch, diff_files(base_file, new_file)
+
+
+def apply_patch(base_content, patch, out):
+    """Write the result of patch applied to base_content to the binary stream out
+
+    Base records are found from their lengths alone and copied as byte spans
+    without being parsed. Raises ValueError when base_content is not the file
+    the patch was made from, or when the result does not match the patch's hash
+    (out may then hold a partial result). Returns the number of bytes written.
+    """
+    if len(base_content) != patch.base_size or file_digest(base_content) != patch.base_digest:
+        raise ValueError('the patch was made for a different base file')
+    spans = record_spans(base_content)
+    base = memoryview(base_content)
+    digest = hashlib.blake2b(digest_size=DIGEST_SIZE)
+    written = 0
+
+    def write(chunk):
+        nonlocal written
+        digest.update(chunk)
+        out.write(chunk)
+        written += len(chunk)
+
+    write(patch.header)
+    cursor = 0
+    for op, count, records in patch.ops:
+        if op != OP_INSERT:
+            if cursor + count > len(spans):
+                raise ValueError(f'the patch {OP_NAMES[op]}s records past the end of the base file')
+            if op == OP_COPY and count:
+                write(base[spans[cursor][0]:spans[cursor + count - 1][1]])
+            cursor += count
+        for record in records:
+            write(record)
+    if cursor != len(spans):
+        raise ValueError(f'the patch leaves {len(spans) - cursor} base records unaccounted for')
+    write(patch.tail)
+    if written != patch.result_size or digest.digest() != patch.result_digest:
+        raise ValueError('the patched file does not match the hash recorded in the patch')
+    return written
@@ -0,0 +1,185 @@
+import cProfile
+import io
+import json
+import pstats
+import time
+from contextlib import contextmanager
+
+# Timed phases, in the order a file goes through them
+PHASE_READ = 'file read'
+PHASE_HEADER = 'header parse'
+PHASE_RECORDS = 'record parse'
+PHASE_DECODE = 'decode'  # Part of record parse
+PHASE_MODEL = 'model build'
+PHASE_SORT = 'sort'
+PHASE_SEARCH = 'search'
+PHASE_SERIALIZE = 'serialize'
+PHASES = [PHASE_READ, PHASE_HEADER, PHASE_RECORDS, PHASE_DECODE, PHASE_MODEL, PHASE_SORT, PHASE_SEARCH,
+          PHASE_SERIALIZE]
+
+CPROFILE_LINES = 30  # Functions listed in a cProfile report
+
+
+def format_ns(ns):
+    if ns >= 1_000_000_000:
+        return f'{ns / 1e9:.2f} s'
+    return f'{ns / 1e6:.1f} ms'
+
+
+class PhaseTiming:
+    """Calls and wall-clock time of one phase, in nanoseconds"""
+
+    def __init__(self):
+        self.calls = 0
+        self.total_ns = 0
+        self.last_ns = 0
+        self.max_ns = 0
+
+    def add(self, ns):
+        self.calls += 1
+        self.total_ns += ns
+        self.last_ns = ns
+        self.max_ns = max(self.max_ns, ns)
+
+    def to_dict(self):
+        return {'calls': self.calls, 'total_ns': self.total_ns, 'last_ns': self.last_ns, 'max_ns': self.max_ns,
+                'total_ms': round(self.total_ns / 1e6, 3), 'last_ms': round(self.last_ns / 1e6, 3)}
+
+
+class Profiler:
+    """Collects time.perf_counter_ns() timings per phase while enabled
+
+    Code marks its work with phase() and user actions (open, save, find, ...)
+    with action(). After profile_next() the next outermost one of either also
+    runs under cProfile. Listeners are called with the profiler whenever an
+    outermost phase or action ends. While disabled both cost one attribute check.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.phases = dict()  # phase -> PhaseTiming, for the phases that ran since reset()
+        self.actions = dict()  # action -> PhaseTiming
+        self.last_action = None
+        self.last_run = dict()  # phase -> ns spent in it during the last outermost action or phase
+        self.last_cprofile = None  # Report of the last action run under cProfile
+        self._cprofile_next = False
+        self._pending = dict()  # phase -> ns accumulated by accumulate(), not yet counted
+        self._run = dict()
+        self._depth = 0
+        self._listeners = list()
+
+    def add_listener(self, callback):
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def reset(self):
+        self.phases.clear()
+        self.actions.clear()
+        self.last_action = None
+        self.last_run = dict()
+
+    def add(self, name, ns, timings=None):
+        """Record one call of a phase taking ns nanoseconds"""
+        timings = self.phases if timings is None else timings
+        timing = timings.get(name)
+        if timing is None:
+            timing = timings[name] = PhaseTiming()
+        timing.add(ns)
+        if timings is self.phases:
+            self._run[name] = self._run.get(name, 0) + ns
+
+    def accumulate(self, name, ns):
+        # For work too fine-grained for phase(): counted as one call when the enclosing phase ends
+        self._pending[name] = self._pending.get(name, 0) + ns
+
+    def profile_next(self, armed=True):
+        # Run the next outermost action or phase under cProfile
+        self._cprofile_next = armed
+
+    def phase(self, name):
+        return self._measure(name, self.phases)
+
+    def action(self, name):
+        return self._measure(name, self.actions)
+
+    @contextmanager
+    def _measure(self, name, timings):
+        if not (self.enabled or self._cprofile_next):
+            yield
+            return
+        profile = None
+        if self._depth == 0:
+            self._run = dict()
+            if self._cprofile_next:
+                self._cprofile_next = False
+                profile = cProfile.Profile()
+        self._depth += 1
+        start = time.perf_counter_ns()
+        if profile is not None:
+            profile.enable()
+        try:
+            yield
+        finally:
+            if profile is not None:
+                profile.disable()
+                self.last_cprofile = cprofile_report(profile, f'cProfile of {name}')
+            elapsed = time.perf_counter_ns() - start
+            self._depth -= 1
+            if self.enabled:
+                for pending, ns in self._pending.items():
+                    self.add(pending, ns)
+                self._pending.clear()
+                self.add(name, elapsed, timings)
+            if self._depth == 0:
+                self.last_action = name if timings is self.actions and self.enabled else None
+                self.last_run = self._run
+                self._notify()
+
+    def _notify(self):
+        for callback in list(self._listeners):
+            callback(self)
+
+    def summary(self):
+        """Return the time of the last action and of the phases it went through as one line"""
+        parts = []
+        if self.last_action is not None:
+            parts.append(f'{self.last_action} {format_ns(self.actions[self.last_action].last_ns)}')
+        parts.extend(f'{name} {format_ns(self.last_run[name])}' for name in PHASES if name in self.last_run)
+        return ' | '.join(parts) if parts else 'no timings yet'
+
+    def report(self):
+        """Return the timings as printable lines"""
+        lines = [f'{"Phase":<16} {"Calls":>7} {"Total":>11} {"Last":>11} {"Max":>11}']
+        for name, timing in [(name, self.phases[name]) for name in PHASES if name in self.phases] + \
+                            [(name, timing) for name, timing in self.actions.items()]:
+            lines.append(f'{name:<16} {timing.calls:>7} {format_ns(timing.total_ns):>11} '
+                         f'{format_ns(timing.last_ns):>11} {format_ns(timing.max_ns):>11}')
+        if PHASE_DECODE in self.phases:
+            lines.append(f'({PHASE_DECODE} is included in {PHASE_RECORDS})')
+        return lines
+
+    def to_dict(self):
+        return {
+            'phases': {name: self.phases[name].to_dict() for name in PHASES if name in self.phases},
+            'actions': {name: timing.to_dict() for name, timing in self.actions.items()},
+            'cprofile': self.last_cprofile,
+        }
+
+    def dump_json(self, path):
+        with open(path, 'w') as ofp:
+            json.dump(self.to_dict(), ofp, indent=2)
+
+
+def cprofile_report(profile, title, lines=CPROFILE_LINES):
+    """Return the functions taking the most cumulative time in a cProfile.Profile as text"""
+    stream = io.StringIO()
+    stream.write(title + '\n')
+    pstats.Stats(profile, stream=stream).sort_stats('cumulative').print_stats(lines)
+    return stream.getvalue()
+
+
+# Shared by the GUI, the command line and the parsing code
+PROFILER = Profiler()
@@ -0,0 +1,186 @@
+import fnmatch
+import re
+
+from r8profile import PROFILER, PHASE_SEARCH
+
+# Search modes offered by the find/replace dialogs
+MODE_EXACT = 'Exact'
+MODE_SUBSTRING = 'Substring'
+MODE_WILDCARD = 'Wildcard'
+MODE_REGEX = 'Regex'
+MODES = [MODE_EXACT, MODE_SUBSTRING, MODE_WILDCARD, MODE_REGEX]
+
+# Searchable fields of an IndustryFile
+FIELD_NAME = 'name'
+FIELD_SYMBOL = 'trk_sym'
+FIELD_LOCAL = 'local_name'
+FIELD_TAG = 'tag'
+FIELDS = [FIELD_NAME, FIELD_SYMBOL, FIELD_LOCAL, FIELD_TAG]
+
+NGRAM = 3  # Length of the n-grams used to narrow substring queries
+
+
+class SearchPattern:
+    """A compiled search in one of the MODES
+
+    Exact and wildcard patterns match (and replace) the entire field.
+    Substring and regex patterns match anywhere in the field and replace only
+    the matched part; regex replacements may use group references (\\1, \\g<name>).
+    """
+
+    def __init__(self, text, mode=MODE_EXACT, case_sensitive=True):
+        self.text = text
+        self.mode = mode
+        self.case_sensitive = case_sensitive
+        self.folded = text if case_sensitive else text.lower()
+        flags = 0 if case_sensitive else re.IGNORECASE
+        try:
+            if mode == MODE_EXACT:
+                self.regex = None
+            elif mode == MODE_SUBSTRING:
+                self.regex = re.compile(re.escape(text), flags)
+            elif mode == MODE_WILDCARD:
+                self.regex = re.compile(fnmatch.translate(text), flags)
+            elif mode == MODE_REGEX:
+                self.regex = re.compile(text, flags)
+            else:
+                raise ValueError(f'Unknown search mode: {mode}')
+        except re.error as e:
+            raise ValueError(f'Invalid pattern "{text}": {e}') from None
+
+    def matches(self, value):
+        """Return True if the field value matches this pattern"""
+        if self.mode == MODE_EXACT:
+            return (value if self.case_sensitive else value.lower()) == self.folded
+        if self.mode == MODE_SUBSTRING:
+            return self.folded in (value if self.case_sensitive else value.lower())
+        if self.mode == MODE_WILDCARD:
+            return self.regex.match(value) is not None
+        return self.regex.search(value) is not None
+
+    def check_replacement(self, replacement):
+        """Raise ValueError if replacement is not a valid template for this pattern"""
+        if self.mode != MODE_REGEX:
+            return
+        try:
+            # The template is parsed before any matching, so an empty value is enough
+            self.regex.sub(replacement, '')
+        except (re.error, IndexError) as e:
+            raise ValueError(f'Invalid replacement "{replacement}": {e}') from None
+
+    def replace(self, value, replacement):
+        """Return the new field value for a matching value"""
+        if self.mode in (MODE_EXACT, MODE_WILDCARD):
+            return replacement
+        if self.mode == MODE_SUBSTRING:
+            # Literal replacement, no group expansion
+            return self.regex.sub(lambda m: replacement, value)
+        return self.regex.sub(replacement, value)
+
+    def span(self, value):
+        """Return (start, length) of the matched part of a value, or None"""
+        if self.mode in (MODE_EXACT, MODE_WILDCARD):
+            return (0, len(value)) if self.matches(value) else None
+        m = self.regex.search(value)
+        return (m.start(), m.end() - m.start()) if m else None
+
+
+class FieldCorpus:
+    """Distinct values of one field, with their lowercase forms and an n-gram index"""
+
+    def __init__(self, values):
+        self.values = list(values)
+        self.lowered = [value.lower() for value in self.values]
+        self.exact = {value: i for i, value in enumerate(self.values)}
+        self.folded = dict()  # lowercase value -> [value ids]
+        for i, low in enumerate(self.lowered):
+            self.folded.setdefault(low, []).append(i)
+        self._ngrams = None  # Built on the first substring query
+
+    def _ngram_index(self):
+        if self._ngrams is None:
+            self._ngrams = dict()
+            for i, low in enumerate(self.lowered):
+                for k in range(len(low) - NGRAM + 1):
+                    self._ngrams.setdefault(low[k:k + NGRAM], set()).add(i)
+        return self._ngrams
+
+    def _candidates(self, pattern):
+        # Narrow the values worth testing before the pattern is applied to each one
+        if pattern.mode == MODE_EXACT:
+            if pattern.case_sensitive:
+                i = self.exact.get(pattern.text)
+                return [] if i is None else [i]
+            return self.folded.get(pattern.folded, [])
+        if pattern.mode == MODE_SUBSTRING and len(pattern.text) >= NGRAM:
+            needle = pattern.text.lower()
+            ngrams = self._ngram_index()
+            postings = []
+            for k in range(len(needle) - NGRAM + 1):
+                posting = ngrams.get(needle[k:k + NGRAM])
+                if not posting:
+                    return []
+                postings.append(posting)
+            postings.sort(key=len)
+            return sorted(set.intersection(*postings))
+        return range(len(self.values))
+
+    def search(self, pattern):
+        """Return the distinct values matching a SearchPattern"""
+        return [self.values[i] for i in self._candidates(pattern) if pattern.matches(self.values[i])]
+
+
+class SearchCorpus:
+    """Precomputed search corpus over the industry name, symbol, local name and tag fields
+
+    Queries run over distinct values only; matches are then expanded to the
+    industries (or tag occurrences) holding each value.
+    """
+
+    def __init__(self, indfile):
+        self.indfile = indfile
+        self.generation = indfile.generation
+        # Distinct values come straight from the file's hash indexes
+        self.fields = {
+            FIELD_NAME: FieldCorpus(indfile.name_index.values()),
+            FIELD_SYMBOL: FieldCorpus(indfile.symbol_index.values()),
+            FIELD_LOCAL: FieldCorpus(indfile.local_index.values()),
+            FIELD_TAG: FieldCorpus(indfile.tag_index.counts()),
+        }
+
+    def search(self, field, pattern):
+        """Return the distinct values of a field matching a SearchPattern"""
+        return self.fields[field].search(pattern)
+
+    def industries(self, field, value):
+        """Return the positions of the industries whose field holds value"""
+        return [self.indfile.position(industry) for industry in self.indfile.find(field, value)]
+
+
+def search_values(indfile, field, pattern):
+    """Return the distinct values of a field matching a SearchPattern
+
+    Case-sensitive exact searches are answered from the file's hash indexes
+    without building the search corpus.
+    """
+    with PROFILER.phase(PHASE_SEARCH):
+        return _search_values(indfile, field, pattern)
+
+
+def _search_values(indfile, field, pattern):
+    if pattern.mode == MODE_EXACT and pattern.case_sensitive:
+        if field == FIELD_TAG:
+            found = indfile.tag_index.count(pattern.text) > 0
+        else:
+            found = len(indfile.find(field, pattern.text)) > 0
+        return [pattern.text] if found else []
+    return get_corpus(indfile).search(field, pattern)
+
+
+def get_corpus(indfile):
+    """Return the search corpus of an IndustryFile, rebuilding it only after the file changed"""
+    corpus = getattr(indfile, '_search_corpus', None)
+    if corpus is None or corpus.generation != indfile.generation:
+        corpus = SearchCorpus(indfile)
+        indfile._search_corpus = corpus
+    return corpus
@@ -0,0 +1,101 @@
+from collections import Counter
+
+from r8cartypes import NO_CAR_TYPES
+
+
+class IndustryStats:
+    """Aggregate statistics of an IndustryFile, computed in a single pass over its producers
+
+    industries_per_local : Counter {local name: industries}
+    producers_per_car    : Counter {car type ID: producers}
+    capacity_per_local   : Counter {local name: total capacity}
+    hours_per_local      : Counter {local name: total processing hours}
+    capacity_per_car     : Counter {car type ID: total capacity}
+    hours_per_car        : Counter {car type ID: total processing hours}
+    tag_counts           : Counter {processed tag: uses}
+    empties_per_car      : Counter {car type ID: producers making empties}
+    loads_per_car        : Counter {car type ID: producers making loads}
+    """
+
+    def __init__(self, indfile):
+        self.industries = len(indfile.industries)
+        self.producers = 0
+        self.industries_per_local = Counter()
+        self.producers_per_car = Counter()
+        self.capacity_per_local = Counter()
+        self.hours_per_local = Counter()
+        self.capacity_per_car = Counter()
+        self.hours_per_car = Counter()
+        self.tag_counts = Counter()
+        self.empties_per_car = Counter()
+        self.loads_per_car = Counter()
+
+        for industry in indfile.industries:
+            local_name = industry.local_name
+            self.industries_per_local[local_name] += 1
+            for prod in industry.producer:
+                car = prod.bIndex
+                self.producers += 1
+                self.producers_per_car[car] += 1
+                self.capacity_per_local[local_name] += prod.capacity
+                self.hours_per_local[local_name] += prod.proc_hours
+                self.capacity_per_car[car] += prod.capacity
+                self.hours_per_car[car] += prod.proc_hours
+                if prod.produce_empties:
+                    self.empties_per_car[car] += 1
+                else:
+                    self.loads_per_car[car] += 1
+                self.tag_counts.update(tag.name for tag in prod.tags)
+
+    def empties(self):
+        return sum(self.empties_per_car.values())
+
+    def loads(self):
+        return sum(self.loads_per_car.values())
+
+    def local_rows(self):
+        """Return [(local name, industries, capacity, hours)], most industries first"""
+        return [(local_name, count, self.capacity_per_local[local_name], self.hours_per_local[local_name])
+                for local_name, count in sorted(self.industries_per_local.items(),
+                                                key=lambda item: (-item[1], item[0].lower()))]
+
+    def car_rows(self):
+        """Return [(car type ID, producers, capacity, hours, empties, loads)], most producers first"""
+        return [(car, count, self.capacity_per_car[car], self.hours_per_car[car],
+                 self.empties_per_car[car], self.loads_per_car[car])
+                for car, count in sorted(self.producers_per_car.items(), key=lambda item: (-item[1], item[0]))]
+
+    def tag_rows(self):
+        """Return [(tag, uses)], most used first"""
+        return sorted(self.tag_counts.items(), key=lambda item: (-item[1], item[0].lower()))
+
+    def report(self, cartypes=None):
+        """Return the statistics as printable lines"""
+        cartypes = cartypes or NO_CAR_TYPES
+        lines = [f'{self.industries} industries, {len(self.industries_per_local)} locals, '
+                 f'{self.producers} producers, {len(self.tag_counts)} distinct tags',
+                 f'Empties / loads: {self.empties()} / {self.loads()}',
+                 '',
+                 f'{"Local":<30} {"Industries":>10} {"Capacity":>10} {"Hours":>10}']
+        for local_name, count, capacity, hours in self.local_rows():
+            lines.append(f'{local_name:<30} {count:>10} {capacity:>10} {hours:>10}')
+        lines.append('')
+        lines.append(f'{"Car type":<30} {"Producers":>10} {"Capacity":>10} {"Hours":>10} {"Empties":>8} {"Loads":>8}')
+        for car, count, capacity, hours, empties, loads in self.car_rows():
+            car_name = cartypes.label(car)
+            lines.append(f'{car_name:<30} {count:>10} {capacity:>10} {hours:>10} {empties:>8} {loads:>8}')
+        lines.append('')
+        lines.append(f'{"Tag":<30} {"Uses":>10}')
+        for tag_name, count in self.tag_rows():
+            lines.append(f'{tag_name:<30} {count:>10}')
+        return lines
+
+
+def get_stats(indfile):
+    """Return the statistics of an IndustryFile, recomputing them only after the file changed"""
+    stats = getattr(indfile, '_stats', None)
+    if stats is None or stats.generation != indfile.generation:
+        stats = IndustryStats(indfile)
+        stats.generation = indfile.generation
+        indfile._stats = stats
+    return stats
@@ -0,0 +1,150 @@
+"""Writes synthetic industry files in the Run8 .ind layout, for benchmarks and trying out changes
+
+    python r8synth.py big.ind --industries 20000 --producers 4 --tags 6 --vocabulary 2000
+"""
+import argparse
+import random
+import struct
+import sys
+
+from r8cartypes import CarTypeRegistry, load_car_types, default_carfile
+from r8lib import encode_run8string, INTLEN
+
+# Words industry names and processed tags are made of
+WORDS = ['LUMBER', 'GRAIN', 'COAL', 'STEEL', 'PAPER', 'CHEM', 'OIL', 'SAND', 'SCRAP', 'AUTO', 'FOOD', 'BEER',
+         'CEMENT', 'STONE', 'PIPE', 'WIRE', 'GLASS', 'SALT', 'CLAY', 'CORN', 'SOY', 'MILL', 'FEED', 'GAS']
+KINDS = ['Yard', 'Mill', 'Plant', 'Elevator', 'Terminal', 'Warehouse', 'Mine', 'Refinery', 'Co-op', 'Works']
+DEFAULT_CAR_TYPES = list(range(1, 32))
+
+_HEADER = struct.Struct('<ii')
+_TRACK = struct.Struct('<iiii')
+_PRODUCER = struct.Struct('<iBBii')
+
+
+class SynthSpec:
+    """Shape of a synthetic file; counts per record are drawn around the given means"""
+
+    def __init__(self, industries=1000, producers=3, tags=4, vocabulary=500, locals_=40, tracks=2, filters=0.05,
+                 seed=1, car_types=None):
+        self.industries = industries
+        self.producers = producers  # Mean producers per industry
+        self.tags = tags  # Mean processed tags per producer
+        self.vocabulary = vocabulary  # Distinct processed tags
+        self.locals = locals_  # Distinct local names
+        self.tracks = tracks  # Mean track segments per industry
+        self.filters = filters  # Share of producers with a filter (record type 2)
+        self.seed = seed
+        self.car_types = car_types or car_type_ids()
+
+    def to_dict(self):
+        return {'industries': self.industries, 'producers': self.producers, 'tags': self.tags,
+                'vocabulary': self.vocabulary, 'locals': self.locals, 'tracks': self.tracks,
+                'filters': self.filters, 'seed': self.seed}
+
+
+def _string(text):
+    enc = encode_run8string(text)
+    return len(enc).to_bytes(INTLEN, 'little', signed=True) + enc
+
+
+def _count(rnd, mean):
+    # Small counts spread around the mean, never negative
+    return max(0, round(rnd.gauss(mean, mean / 2))) if mean > 0 else 0
+
+
+def tag_vocabulary(rnd, size):
+    """Return size distinct tag names, most common first"""
+    tags = dict()
+    while len(tags) < size:
+        word = rnd.choice(WORDS)
+        tags.setdefault(word if len(tags) < len(WORDS) else f'{word}{rnd.randint(1, 9999)}', None)
+    return list(tags)
+
+
+def generate(spec):
+    """Return the bytes of a synthetic industry file"""
+    rnd = random.Random(spec.seed)
+    vocabulary = tag_vocabulary(rnd, spec.vocabulary)
+    # Tag use follows a Zipf-like curve: a few tags are everywhere, most are rare
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    locals_ = [f'L{rnd.choice(WORDS)[:3]}{n:02d}' for n in range(spec.locals)]
+    car_types = spec.car_types
+
+    out = bytearray(_HEADER.pack(1, spec.industries))
+    for i in range(spec.industries):
+        out += bytes(INTLEN)  # unk1
+        out += _string(f'{rnd.choice(WORDS).title()} {rnd.choice(KINDS)} {i}')
+        out += _string(rnd.choice(locals_))
+        out += _string(f'{chr(65 + i % 26)}{i // 26 % 1000}')
+        out += bytes([rnd.random() < 0.2])
+        tracks = _count(rnd, spec.tracks)
+        out += tracks.to_bytes(INTLEN, 'little', signed=True)
+        for t in range(tracks):
+            out += _TRACK.pack(0, rnd.randint(1, 300), rnd.randint(1, 20000), rnd.randint(0, 1))
+        cars = rnd.sample(car_types, min(len(car_types), _count(rnd, spec.producers)))
+        out += len(cars).to_bytes(INTLEN, 'little', signed=True)
+        for car in cars:
+            filtered = rnd.random() < spec.filters
+            out += _PRODUCER.pack(2 if filtered else 1, car, rnd.random() < 0.4, rnd.randint(1, 48), rnd.randint(1, 12))
+            tags = dict.fromkeys(rnd.choices(vocabulary, weights, k=_count(rnd, spec.tags)))
+            out += len(tags).to_bytes(INTLEN, 'little', signed=True)
+            for tag in tags:
+                out += _string(tag)
+            if filtered:
+                out += (1).to_bytes(INTLEN, 'little', signed=True) + _string(rnd.choice(vocabulary))
+            else:
+                out += bytes(INTLEN)
+    return bytes(out)
+
+
+def car_type_ids(path=None):
+    """Return the car type IDs of a car types csv
+
+    Without a path the csv shipped next to this module is used, or DEFAULT_CAR_TYPES
+    if it is missing. A given path must be readable and list at least one car type
+    (raises OSError or ValueError), so generated files never use unknown IDs by accident.
+    """
+    if path is None:
+        return load_car_types(default_carfile()).ids() or DEFAULT_CAR_TYPES
+    ids = CarTypeRegistry.from_csv(path).ids()
+    if not ids:
+        raise ValueError(f'{path} lists no car types')
+    return ids
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='r8synth', description='Write a synthetic industry file.')
+    parser.add_argument('output', help="file to write ('-' for stdout)")
+    parser.add_argument('-n', '--industries', type=int, default=1000)
+    parser.add_argument('-p', '--producers', type=float, default=3, help='mean producers per industry')
+    parser.add_argument('-t', '--tags', type=float, default=4, help='mean processed tags per producer')
+    parser.add_argument('-v', '--vocabulary', type=int, default=500, help='distinct processed tags')
+    parser.add_argument('-l', '--locals', type=int, default=40, help='distinct local names')
+    parser.add_argument('--tracks', type=float, default=2, help='mean track segments per industry')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--cartypes', default=default_carfile(),
+                        help='car types csv to draw car type IDs from (default: %(default)s)')
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        car_types = car_type_ids(args.cartypes)
+    except (OSError, ValueError) as e:
+        parser.error(f'cannot read car types from {args.cartypes} [{e}]')
+    spec = SynthSpec(args.industries, args.producers, args.tags, args.vocabulary, args.locals, args.tracks,
+                     seed=args.seed, car_types=car_types)
+    content = generate(spec)
+    if args.output == '-':
+        sys.stdout.buffer.write(content)
+    else:
+        with open(args.output, 'wb') as ofp:
+            ofp.write(content)
+        print(f'{args.output}: {spec.industries} industries, {len(content)} bytes', file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
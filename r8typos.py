@@ -0,0 +1,150 @@
+MAX_DISTANCE = 2  # Largest edit distance treated as a possible typo
+MIN_RATIO = 3  # A suspect tag is used at most 1/MIN_RATIO as often as the tag it resembles
+
+
+def edit_distance(a, b, limit):
+    """Return the edit distance between a and b, or limit + 1 once it is known to exceed limit
+
+    Insertions, deletions, substitutions and swaps of two adjacent characters
+    (COAL / COLA) each count as one edit.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    before = None
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, start=1):
+        current = [i]
+        for j, cb in enumerate(b, start=1):
+            d = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb))
+            if before is not None and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                d = min(d, before[j - 2] + 1)
+            current.append(d)
+        if min(current) > limit:
+            return limit + 1
+        before = previous
+        previous = current
+    return previous[-1]
+
+
+def allowed_distance(tag, max_distance=MAX_DISTANCE):
+    # Short tags differ by one character all the time (CP1 / CP2), so they get a smaller budget
+    if len(tag) < 3:
+        return 0
+    if len(tag) < 6:
+        return min(1, max_distance)
+    return max_distance
+
+
+def deletions(word, depth):
+    """Return every string made by deleting up to depth characters from word (word included)"""
+    found = {word}
+    frontier = {word}
+    for _ in range(depth):
+        frontier = {w[:k] + w[k + 1:] for w in frontier for k in range(len(w))}
+        found |= frontier
+    return found
+
+
+class NeighbourIndex:
+    """Symmetric-delete index over distinct strings for edit-distance neighbour queries
+
+    Two strings within edit distance d always share a string reachable from
+    both by at most d deletions, so a query only verifies the words that share
+    one of its deletion variants instead of comparing against every word.
+    """
+
+    def __init__(self, words=(), max_distance=MAX_DISTANCE):
+        self.max_distance = max_distance
+        self._variants = dict()  # deletion variant -> [words]
+        for word in words:
+            self.add(word)
+
+    def add(self, word):
+        for variant in deletions(word, self.max_distance):
+            self._variants.setdefault(variant, []).append(word)
+
+    def search(self, word, radius):
+        """Return [(distance, word)] for every stored word within radius (at most max_distance) of word"""
+        radius = min(radius, self.max_distance)
+        candidates = set()
+        for variant in deletions(word, radius):
+            candidates.update(self._variants.get(variant, ()))
+        found = []
+        for candidate in candidates:
+            d = edit_distance(word, candidate, radius)
+            if d <= radius:
+                found.append((d, candidate))
+        return found
+
+
+class TypoSuspect:
+    """A rarely used tag that is within a small edit distance of more common tags"""
+
+    def __init__(self, tag, count, suggestions):
+        self.tag = tag
+        self.count = count
+        self.suggestions = suggestions  # [(tag, count, distance)], best first
+
+    def best(self):
+        return self.suggestions[0][0]
+
+
+class TypoChecker:
+    """Finds likely misspelled tags among the distinct tags of a file or a region
+
+    counts is {tag name: number of uses}, e.g. TagIndex.counts().
+    """
+
+    def __init__(self, counts, max_distance=MAX_DISTANCE, min_ratio=MIN_RATIO):
+        self.counts = dict(counts)
+        self.max_distance = max_distance
+        self.min_ratio = min_ratio
+        self.highest = max(self.counts.values(), default=0)
+        # Only tags used at least min_ratio times can be suggested, so only those are indexed
+        self.index = NeighbourIndex((tag for tag, count in self.counts.items() if count >= min_ratio), max_distance)
+
+    def suggestions(self, tag):
+        """Return [(tag, count, distance)] of the tags this one is probably a misspelling of, best first"""
+        count = self.counts.get(tag, 0)
+        radius = allowed_distance(tag, self.max_distance)
+        if radius == 0:
+            return []
+        if max(count, 1) * self.min_ratio > self.highest:
+            return []  # No tag is common enough to be the intended one
+        result = []
+        for distance, other in self.index.search(tag, radius):
+            other_count = self.counts[other]
+            if distance > 0 and other_count >= max(count, 1) * self.min_ratio:
+                result.append((other, other_count, distance))
+        result.sort(key=lambda s: (s[2], -s[1], s[0]))
+        return result
+
+    def suspects(self):
+        """Return a TypoSuspect for each tag that looks like a misspelling, rarest first"""
+        found = []
+        for tag, count in self.counts.items():
+            suggestions = self.suggestions(tag)
+            if suggestions:
+                found.append(TypoSuspect(tag, count, suggestions))
+        found.sort(key=lambda s: (s.count, s.tag.lower()))
+        return found
+
+    def report(self):
+        """Return the suspects as printable lines"""
+        lines = []
+        for suspect in self.suspects():
+            alternatives = ', '.join(f'{tag} ({count})' for tag, count, distance in suspect.suggestions[:3])
+            if len(suspect.suggestions) > 3:
+                alternatives += f', ... ({len(suspect.suggestions) - 3} more)'
+            lines.append(f'{suspect.tag} ({suspect.count}) -> {alternatives}')
+        return lines
+
+
+def get_typo_checker(indfile):
+    """Return the typo checker of an IndustryFile's tags, rebuilding it only after the file changed"""
+    checker = getattr(indfile, '_typo_checker', None)
+    if checker is None or checker.generation != indfile.generation:
+        checker = TypoChecker(indfile.tag_index.counts())
+        checker.generation = indfile.generation
+        indfile._typo_checker = checker
+    return checker
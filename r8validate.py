@@ -0,0 +1,226 @@
+from collections import Counter
+
+from r8cartypes import NO_CAR_TYPES
+
+ERROR = 'Error'
+WARNING = 'Warning'
+SEVERITIES = [ERROR, WARNING]
+
+RECORD_INDUSTRY = 'industry'
+RECORD_PRODUCER = 'producer'
+
+# Registered rules per record type: [(rule name, severity, check)]
+RULES = {RECORD_INDUSTRY: [], RECORD_PRODUCER: []}
+
+
+def rule(record_type, severity):
+    """Register a check for a record type
+
+    Industry checks are called as check(ctx, industry) and producer checks as
+    check(ctx, industry, producer). A check returns a message for a problem, or None.
+    """
+    def register(check):
+        RULES[record_type].append((check.__name__, severity, check))
+        return check
+    return register
+
+
+class Issue:
+    """One problem found in an industry, or in one of its producers"""
+
+    def __init__(self, severity, rule_name, position, industry, message, producer=None):
+        self.severity = severity
+        self.rule = rule_name
+        self.position = position
+        self.industry = industry
+        self.producer = producer
+        self.message = message
+
+    def __str__(self):
+        return f'{self.severity}: rec[{self.position}] {self.industry.name}: {self.message}'
+
+
+class ValidationContext:
+    """Shared state of one validation run: the file, its lookup indexes and the car types"""
+
+    def __init__(self, indfile, cartypes=None):
+        self.indfile = indfile
+        self.cartypes = cartypes or NO_CAR_TYPES
+        self.car_counts = Counter()  # car type ID -> producers in the current industry
+        self._hash_counts = None
+
+    def hash_counts(self):
+        # content_hash() -> industries with that record, counted on first use
+        if self._hash_counts is None:
+            self._hash_counts = Counter(industry.content_hash() for industry in self.indfile.industries)
+        return self._hash_counts
+
+    def car_name(self, bIndex):
+        return self.cartypes.label(bIndex)
+
+
+@rule(RECORD_INDUSTRY, ERROR)
+def empty_name(ctx, industry):
+    if not industry.name.strip():
+        return 'industry has no name'
+
+
+@rule(RECORD_INDUSTRY, WARNING)
+def duplicate_name(ctx, industry):
+    count = ctx.indfile.name_index.count(industry.name)
+    if count > 1 and industry.name.strip():
+        return f'name is used by {count} industries'
+
+
+@rule(RECORD_INDUSTRY, WARNING)
+def duplicate_record(ctx, industry):
+    count = ctx.hash_counts()[industry.content_hash()]
+    if count > 1:
+        return f'record is repeated byte for byte {count} times'
+
+
+@rule(RECORD_INDUSTRY, WARNING)
+def symbol_collision(ctx, industry):
+    count = ctx.indfile.symbol_index.count(industry.trk_sym)
+    if count > 1 and industry.trk_sym.strip():
+        return f'symbol {industry.trk_sym} is used by {count} industries'
+
+
+@rule(RECORD_INDUSTRY, WARNING)
+def no_tracks(ctx, industry):
+    if industry.number_of_tracks == 0:
+        return 'industry has no track segments'
+
+
+@rule(RECORD_INDUSTRY, WARNING)
+def duplicate_car_type(ctx, industry):
+    duplicates = [bIndex for bIndex, count in ctx.car_counts.items() if count > 1]
+    if duplicates:
+        return 'more than one producer for ' + ', '.join(ctx.car_name(bIndex) for bIndex in sorted(duplicates))
+
+
+@rule(RECORD_PRODUCER, WARNING)
+def unknown_car_type(ctx, industry, prod):
+    if ctx.cartypes and prod.bIndex not in ctx.cartypes:
+        return f'unknown car type ID {prod.bIndex}'
+
+
+@rule(RECORD_PRODUCER, ERROR)
+def bad_capacity(ctx, industry, prod):
+    if prod.num_tags > 0 and prod.capacity <= 0:
+        return f'{ctx.car_name(prod.bIndex)} has processed tags but capacity {prod.capacity}'
+
+
+@rule(RECORD_PRODUCER, ERROR)
+def negative_hours(ctx, industry, prod):
+    if prod.proc_hours < 0:
+        return f'{ctx.car_name(prod.bIndex)} has negative processing hours ({prod.proc_hours})'
+
+
+@rule(RECORD_PRODUCER, WARNING)
+def empty_tags(ctx, industry, prod):
+    if prod.capacity > 0 and prod.num_tags == 0:
+        return f'{ctx.car_name(prod.bIndex)} has capacity {prod.capacity} but no processed tags'
+
+
+def validate_industry(ctx, industry, position):
+    """Return the issues of one industry and its producers"""
+    issues = []
+    ctx.car_counts.clear()
+    for prod in industry.producer:
+        ctx.car_counts[prod.bIndex] += 1
+        for rule_name, severity, check in RULES[RECORD_PRODUCER]:
+            message = check(ctx, industry, prod)
+            if message:
+                issues.append(Issue(severity, rule_name, position, industry, message, prod))
+    for rule_name, severity, check in RULES[RECORD_INDUSTRY]:
+        message = check(ctx, industry)
+        if message:
+            issues.append(Issue(severity, rule_name, position, industry, message))
+    return issues
+
+
+class ValidationReport:
+    """Result of running every registered rule over a file in a single traversal"""
+
+    def __init__(self, indfile, cartypes=None):
+        self.indfile = indfile
+        self.cartypes = cartypes
+        ctx = ValidationContext(indfile, cartypes)
+        self.by_industry = dict()  # industry -> [Issue]
+        for position, industry in enumerate(indfile.industries):
+            issues = validate_industry(ctx, industry, position)
+            if issues:
+                self.by_industry[industry] = issues
+
+    @property
+    def issues(self):
+        """All issues in file order"""
+        return [issue for industry in self.indfile.industries for issue in self.by_industry.get(industry, ())]
+
+    def update(self, result):
+        """Re-run the rules after IndustryFile.reload_from_bytes() for the records it touched
+
+        Besides the added records, industries sharing a name or symbol with an added
+        or removed record are checked again, since their duplicate counts changed.
+        """
+        indfile = self.indfile
+        for industry in result.removed:
+            self.by_industry.pop(industry, None)
+        affected = dict.fromkeys(industry for position, industry in result.added)
+        for industry in [industry for position, industry in result.added] + result.removed:
+            affected.update(dict.fromkeys(indfile.find('name', industry.name)))
+            affected.update(dict.fromkeys(indfile.find('trk_sym', industry.trk_sym)))
+        ctx = ValidationContext(indfile, self.cartypes)
+        for industry in affected:
+            issues = validate_industry(ctx, industry, indfile.position(industry))
+            if issues:
+                self.by_industry[industry] = issues
+            else:
+                self.by_industry.pop(industry, None)
+        if result.moved:
+            for issues in self.by_industry.values():
+                for issue in issues:
+                    issue.position = indfile.position(issue.industry)
+
+    def count(self, severity):
+        return sum(1 for issue in self.issues if issue.severity == severity)
+
+    def errors(self):
+        return self.count(ERROR)
+
+    def warnings(self):
+        return self.count(WARNING)
+
+    def summary(self):
+        return f'{self.errors()} errors, {self.warnings()} warnings'
+
+    def report(self):
+        """Return the issues as printable lines, errors first"""
+        ordered = sorted(self.issues, key=lambda issue: (SEVERITIES.index(issue.severity), issue.position))
+        return [str(issue) for issue in ordered]
+
+
+def validate(indfile, cartypes=None):
+    """Return the ValidationReport of an IndustryFile"""
+    return ValidationReport(indfile, cartypes)
+
+
+def update_validation(indfile, result, cartypes=None):
+    """Update the cached validation report of a file after reload_from_bytes(), re-running only what changed"""
+    report = getattr(indfile, '_validation', None)
+    if report is None or report.generation != indfile.generation - 1:
+        return get_validation(indfile, cartypes)  # Not current before the reload: start over
+    report.update(result)
+    report.generation = indfile.generation
+    return report
+
+
+def get_validation(indfile, cartypes=None):
+    """Return the validation report of an IndustryFile, re-running the rules only after the file changed"""
+    report = getattr(indfile, '_validation', None)
+    if report is None or report.generation != indfile.generation:
+        report = ValidationReport(indfile, cartypes)
+        report.generation = indfile.generation
+        indfile._validation = report
+    return report
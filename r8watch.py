@@ -0,0 +1,51 @@
+import os
+
+POLL_INTERVAL = 1.0  # Seconds between checks of the watched file
+
+
+def file_stamp(path):
+    """Return (modification time, size) of path, or None when it cannot be read"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class FileWatcher:
+    """Polls a file's size and modification time to tell when it was rewritten
+
+    Polling needs nothing beyond the standard library and works the same on
+    Windows, Linux and network drives.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._stamp = self._read_stamp()
+
+    def _read_stamp(self):
+        # None while the file is missing during a rewrite; checked again on the next poll
+        return file_stamp(self.path)
+
+    def changed(self):
+        """Return True once each time the file changed since the last call"""
+        stamp = self._read_stamp()
+        if stamp is None or stamp == self._stamp:
+            return False
+        self._stamp = stamp
+        return True
+
+    def mark_current(self):
+        # Forget changes made by ourselves, e.g. after saving the file
+        self._stamp = self._read_stamp()
+
+
+def reload_file(indfile, path):
+    """Re-read path into indfile, parsing only the changed records; returns the ReloadResult
+
+    Raises OSError when the file cannot be read and ValueError when it is incomplete
+    (for instance while another program is still writing it).
+    """
+    with open(path, mode='rb') as ifp:
+        fcontent = ifp.read()
+    return indfile.reload_from_bytes(fcontent)
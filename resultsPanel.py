@@ -0,0 +1,244 @@
+from PySide6.QtWidgets import (QDockWidget, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit,
+                               QPushButton, QTableView, QAbstractItemView, QHeaderView, QMessageBox)
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, Signal
+from r8cartypes import NO_CAR_TYPES
+
+FETCH_BATCH = 500  # Rows added to the view per fetchMore() call
+
+
+class SearchHit:
+    """One search result: a field of an industry, or one processed tag of a producer"""
+    __slots__ = ('industry', 'producer', 'tag', 'attr')
+
+    def __init__(self, industry, producer=None, tag=None, attr=None):
+        self.industry = industry
+        self.producer = producer
+        self.tag = tag
+        self.attr = attr  # Industry attribute for field hits, None for tag hits
+
+    def value(self):
+        if self.tag is not None:
+            # A deleted tag no longer belongs to its producer
+            return self.tag.name if self.tag.owner is self.producer else ""
+        return getattr(self.industry, self.attr)
+
+
+class SearchResultsModel(QAbstractTableModel):
+    """Lazily populated table of search hits
+
+    Hits are pulled from an iterator FETCH_BATCH at a time as the view scrolls
+    (canFetchMore / fetchMore), and every cell is read from the live objects,
+    so 100k hits cost neither 100k widgets nor a stale copy of the data.
+    """
+    HEADERS = ['File', 'Industry', 'Producer', 'Car Type', 'Value']
+    fetched = Signal()  # Emitted after each fetchMore(), including the one that finds no more hits
+
+    def __init__(self, cartypes=None, parent=None):
+        super().__init__(parent)
+        self.cartypes = cartypes or NO_CAR_TYPES
+        self.file_name = ""
+        self._hits = []
+        self._pending = iter(())
+        self._exhausted = True
+
+    def set_hits(self, hits, file_name=""):
+        """Show the hits produced by an iterable of SearchHit"""
+        self.beginResetModel()
+        self.file_name = file_name
+        self._hits = []
+        self._pending = iter(hits)
+        self._exhausted = False
+        self.endResetModel()
+
+    def hit(self, row):
+        return self._hits[row]
+
+    def loaded_count(self):
+        return len(self._hits)
+
+    def is_complete(self):
+        return self._exhausted
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._hits)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._exhausted:
+            return
+        batch = []
+        for hit in self._pending:
+            batch.append(hit)
+            if len(batch) >= FETCH_BATCH:
+                break
+        else:
+            self._exhausted = True
+        if batch:
+            start = len(self._hits)
+            self.beginInsertRows(QModelIndex(), start, start + len(batch) - 1)
+            self._hits.extend(batch)
+            self.endInsertRows()
+        self.fetched.emit()
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        hit = self._hits[index.row()]
+        col = index.column()
+        if col == 0:
+            return self.file_name
+        elif col == 1:
+            return hit.industry.name
+        elif col == 2:
+            if hit.producer is None:
+                return ""
+            try:
+                return str(hit.industry.producer.index(hit.producer) + 1)
+            except ValueError:  # The producer was deleted since the search
+                return ""
+        elif col == 3:
+            return self.cartypes.name(hit.producer.bIndex) if hit.producer is not None else ""
+        elif col == 4:
+            return hit.value()
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole:
+            if orientation == Qt.Orientation.Horizontal:
+                return self.HEADERS[section]
+            else:
+                return str(section + 1)
+        return None
+
+    def refresh(self):
+        """Repaint the loaded rows after the underlying industries changed"""
+        if self._hits:
+            self.dataChanged.emit(self.index(0, 0), self.index(len(self._hits) - 1, len(self.HEADERS) - 1))
+
+
+class ResultsPanel(QDockWidget):
+    """Dockable list of every hit of a search, with jump-to and replace-selected"""
+
+    def __init__(self, main_window, cartypes=None):
+        super().__init__("Search Results", main_window)
+        self.setObjectName("searchResultsDock")
+        self.main_window = main_window
+        self.pattern = None
+
+        widget = QWidget()
+        layout = QVBoxLayout(widget)
+
+        self.summary_label = QLabel("")
+        layout.addWidget(self.summary_label)
+
+        self.model = SearchResultsModel(cartypes, self)
+        self.view = QTableView()
+        self.view.setModel(self.model)
+        self.view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.view.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.view.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.view.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        self.view.horizontalHeader().setStretchLastSection(True)
+        self.view.clicked.connect(self.jump_to)
+        self.view.doubleClicked.connect(self.open_hit)
+        layout.addWidget(self.view)
+
+        # Replace only the selected hits
+        replace_layout = QHBoxLayout()
+        replace_layout.addWidget(QLabel("Replace with:"))
+        self.replace_edit = QLineEdit()
+        self.replace_edit.setPlaceholderText("Leave empty to delete selected tags")
+        replace_layout.addWidget(self.replace_edit)
+        self.replace_button = QPushButton("Replace Selected")
+        self.replace_button.clicked.connect(self.replace_selected)
+        replace_layout.addWidget(self.replace_button)
+        layout.addLayout(replace_layout)
+
+        self.setWidget(widget)
+        self.model.fetched.connect(self.update_summary)
+        self.model.modelReset.connect(self.update_summary)
+
+    def show_results(self, hits, pattern, description, replace_text="", file_name=""):
+        """Replace the panel contents with a new search"""
+        self.pattern = pattern
+        self.description = description
+        self.replace_edit.setText(replace_text)
+        self.model.set_hits(hits, file_name)
+        # Load the first batch so the summary shows whether anything was found
+        if self.model.canFetchMore():
+            self.model.fetchMore()
+        self.show()
+        self.raise_()
+
+    def update_summary(self):
+        loaded = self.model.loaded_count()
+        more = "" if self.model.is_complete() else "+ (scroll for more)"
+        self.summary_label.setText(f"{self.description}: {loaded}{more} hits")
+
+    def jump_to(self, index):
+        """Select the industry of a hit in the main table"""
+        if not index.isValid():
+            return
+        hit = self.model.hit(index.row())
+        main_window = self.main_window
+        position = main_window.industry_position(hit.industry)
+        if position < 0:
+            return
+        display_row = main_window.table_model.get_display_row(position)
+        table_view = main_window.ui.tableView
+        table_view.selectRow(display_row)
+        table_view.scrollTo(main_window.table_model.index(display_row, 0))
+
+    def open_hit(self, index):
+        """Open the detail dialog of a hit's industry, on the producer holding a tag hit"""
+        if not index.isValid():
+            return
+        hit = self.model.hit(index.row())
+        position = self.main_window.industry_position(hit.industry)
+        if position >= 0:
+            self.main_window.open_industry(position, hit.producer)
+
+    def selected_hits(self):
+        rows = sorted({index.row() for index in self.view.selectionModel().selectedRows()})
+        return [self.model.hit(row) for row in rows]
+
+    def replace_selected(self):
+        """Apply the search pattern's replacement to the selected hits only"""
+        hits = self.selected_hits()
+        if not hits or self.pattern is None:
+            QMessageBox.warning(self, "Replace Selected", "Please select one or more results.")
+            return
+
+        from findReplaceDialog import replace_field
+        replace_text = self.replace_edit.text()
+        try:
+            self.pattern.check_replacement(replace_text)
+        except ValueError as e:
+            QMessageBox.warning(self, "Replace Selected", str(e))
+            return
+        replaced = 0
+        # One batch: the main table gets a single refresh for all selected hits
+        with self.main_window.industry_file().batch():
+            for hit in hits:
+                old_value = hit.value()
+                if not old_value or not self.pattern.matches(old_value):
+                    continue  # Already replaced or deleted
+                new_value = self.pattern.replace(old_value, replace_text)
+                if hit.tag is not None:
+                    if new_value.strip():
+                        hit.tag.replaceName(new_value)
+                    else:
+                        hit.producer.removeTag(hit.tag)
+                elif new_value.strip() and new_value != old_value:
+                    replace_field(hit.industry, hit.attr, new_value)
+                else:
+                    continue
+                replaced += 1
+
+        self.model.refresh()
+        self.main_window.statusBar().showMessage(f"Replaced {replaced} of {len(hits)} selected results", 5000)
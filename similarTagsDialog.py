@@ -0,0 +1,56 @@
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+                               QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView)
+from PySide6.QtCore import Signal
+
+
+class SimilarTagsDialog(QDialog):
+    """Report of processed tags that look like misspellings of more common tags"""
+    # Emitted with (suspect tag, suggested tag) when the user picks a row
+    tag_chosen = Signal(str, str)
+
+    def __init__(self, checker, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Similar Tags")
+        self.setModal(False)
+        self.resize(600, 400)
+
+        layout = QVBoxLayout(self)
+
+        self.suspects = checker.suspects()
+        if self.suspects:
+            text = (f"{len(self.suspects)} tags look like misspellings of a more common tag.\n"
+                    "Double-click a row to fill in Find/Replace with the suggested fix.")
+        else:
+            text = "No likely misspelled tags found."
+        layout.addWidget(QLabel(text))
+
+        self.table = QTableWidget(len(self.suspects), 4)
+        self.table.setHorizontalHeaderLabels(["Tag", "Uses", "Did you mean", "Uses"])
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.verticalHeader().setVisible(False)
+        for row, suspect in enumerate(self.suspects):
+            best, best_count, distance = suspect.suggestions[0]
+            self.table.setItem(row, 0, QTableWidgetItem(suspect.tag))
+            self.table.setItem(row, 1, QTableWidgetItem(str(suspect.count)))
+            others = ", ".join(tag for tag, count, d in suspect.suggestions[1:4])
+            self.table.setItem(row, 2, QTableWidgetItem(f"{best}  (or {others})" if others else best))
+            self.table.setItem(row, 3, QTableWidgetItem(str(best_count)))
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        header.setSectionResizeMode(1, QHeaderView.ResizeMode.ResizeToContents)
+        header.setSectionResizeMode(2, QHeaderView.ResizeMode.Stretch)
+        header.setSectionResizeMode(3, QHeaderView.ResizeMode.ResizeToContents)
+        self.table.cellDoubleClicked.connect(self.on_row_double_clicked)
+        layout.addWidget(self.table)
+
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        close_button = QPushButton("Close")
+        close_button.clicked.connect(self.accept)
+        button_layout.addWidget(close_button)
+        layout.addLayout(button_layout)
+
+    def on_row_double_clicked(self, row, column):
+        suspect = self.suspects[row]
+        self.tag_chosen.emit(suspect.tag, suspect.best())
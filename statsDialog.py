@@ -0,0 +1,76 @@
+import sys
+
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QTabWidget,
+                               QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView)
+from PySide6.QtCore import Qt
+from r8stats import get_stats
+from r8cartypes import NO_CAR_TYPES
+
+
+class StatsDialog(QDialog):
+    """Statistics of the loaded file per local, per car type and per processed tag"""
+
+    def __init__(self, cartypes=None, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Statistics")
+        self.setModal(False)  # Allow interaction with main window
+        self.resize(700, 500)
+        self.cartypes = cartypes or NO_CAR_TYPES
+
+        layout = QVBoxLayout(self)
+
+        self.summary_label = QLabel("")
+        layout.addWidget(self.summary_label)
+
+        self.tabs = QTabWidget()
+        self.locals_table = self.add_table("Locals", ["Local", "Industries", "Capacity", "Hours"])
+        self.cars_table = self.add_table("Car Types", ["Car Type", "ID", "Producers", "Capacity", "Hours",
+                                                       "Empties", "Loads"])
+        self.tags_table = self.add_table("Tags", ["Tag", "Uses"])
+        layout.addWidget(self.tabs)
+
+        button_layout = QHBoxLayout()
+        refresh_button = QPushButton("Refresh")
+        refresh_button.clicked.connect(self.refresh)
+        button_layout.addWidget(refresh_button)
+        button_layout.addStretch()
+        close_button = QPushButton("Close")
+        close_button.clicked.connect(self.accept)
+        button_layout.addWidget(close_button)
+        layout.addLayout(button_layout)
+
+        self.refresh()
+
+    def add_table(self, title, headers):
+        table = QTableWidget(0, len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        table.verticalHeader().setVisible(False)
+        table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.tabs.addTab(table, title)
+        return table
+
+    def fill_table(self, table, rows):
+        table.setSortingEnabled(False)  # Sorting while filling would move rows under us
+        table.setRowCount(len(rows))
+        for row, values in enumerate(rows):
+            for col, value in enumerate(values):
+                item = QTableWidgetItem()
+                # Numbers are stored as numbers so the columns sort numerically
+                item.setData(Qt.ItemDataRole.DisplayRole, value)
+                table.setItem(row, col, item)
+        table.setSortingEnabled(True)
+
+    def refresh(self):
+        """Recompute the statistics of the loaded file (only if it changed) and show them"""
+        indFile1 = sys.modules['__main__'].indFile1
+        stats = get_stats(indFile1)
+        self.summary_label.setText(
+            f"{stats.industries} industries, {len(stats.industries_per_local)} locals, {stats.producers} producers, "
+            f"{len(stats.tag_counts)} distinct tags. Empties / loads: {stats.empties()} / {stats.loads()}")
+        self.fill_table(self.locals_table, stats.local_rows())
+        self.fill_table(self.cars_table, [(self.cartypes.name(car), car, count, capacity, hours,
+                                           empties, loads)
+                                          for car, count, capacity, hours, empties, loads in stats.car_rows()])
+        self.fill_table(self.tags_table, stats.tag_rows())
@@ -0,0 +1,129 @@
+import sys
+
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QCheckBox,
+                               QTableView, QHeaderView, QAbstractItemView)
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PySide6.QtGui import QColor
+from r8validate import get_validation, ERROR, SEVERITIES
+from r8cartypes import NO_CAR_TYPES
+
+
+class IssueTableModel(QAbstractTableModel):
+    """Validation issues; cells are produced on demand so large reports stay fast"""
+    HEADERS = ['Severity', 'Record', 'Industry', 'Problem']
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._issues = []
+
+    def set_issues(self, issues):
+        self.beginResetModel()
+        self._issues = issues
+        self.endResetModel()
+
+    def issue(self, row):
+        return self._issues[row]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._issues)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        issue = self._issues[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            col = index.column()
+            if col == 0:
+                return issue.severity
+            elif col == 1:
+                return str(issue.position)
+            elif col == 2:
+                return issue.industry.name
+            elif col == 3:
+                return issue.message
+        elif role == Qt.ItemDataRole.ForegroundRole and index.column() == 0 and issue.severity == ERROR:
+            return QColor("red")
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+
+class ValidationDialog(QDialog):
+    """Problems found by the validation rules in the loaded file"""
+
+    def __init__(self, cartypes=None, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Validate")
+        self.setModal(False)  # Allow interaction with main window
+        self.resize(800, 500)
+        self.cartypes = cartypes or NO_CAR_TYPES
+        self.main_window = parent
+
+        layout = QVBoxLayout(self)
+
+        top_layout = QHBoxLayout()
+        self.summary_label = QLabel("")
+        top_layout.addWidget(self.summary_label)
+        top_layout.addStretch()
+        self.warnings_check = QCheckBox("Show warnings")
+        self.warnings_check.setChecked(True)
+        self.warnings_check.toggled.connect(self.show_issues)
+        top_layout.addWidget(self.warnings_check)
+        layout.addLayout(top_layout)
+
+        self.model = IssueTableModel(self)
+        self.view = QTableView()
+        self.view.setModel(self.model)
+        self.view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.view.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.view.verticalHeader().setVisible(False)
+        self.view.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        self.view.horizontalHeader().setStretchLastSection(True)
+        self.view.setColumnWidth(2, 200)
+        self.view.doubleClicked.connect(self.open_issue)
+        layout.addWidget(self.view)
+
+        layout.addWidget(QLabel("Double-click a problem to open the industry."))
+
+        button_layout = QHBoxLayout()
+        refresh_button = QPushButton("Refresh")
+        refresh_button.clicked.connect(self.refresh)
+        button_layout.addWidget(refresh_button)
+        button_layout.addStretch()
+        close_button = QPushButton("Close")
+        close_button.clicked.connect(self.accept)
+        button_layout.addWidget(close_button)
+        layout.addLayout(button_layout)
+
+        self.report = None
+        self.refresh()
+
+    def refresh(self):
+        """Validate the loaded file (only if it changed since the last run) and list the problems"""
+        indFile1 = sys.modules['__main__'].indFile1
+        self.report = get_validation(indFile1, self.cartypes)
+        self.show_issues()
+
+    def show_issues(self):
+        issues = self.report.issues
+        if not self.warnings_check.isChecked():
+            issues = [issue for issue in issues if issue.severity == ERROR]
+        self.model.set_issues(sorted(issues, key=lambda issue: (SEVERITIES.index(issue.severity), issue.position)))
+        if self.report.issues:
+            self.summary_label.setText(self.report.summary())
+        else:
+            self.summary_label.setText("No problems found.")
+
+    def open_issue(self, index):
+        if not index.isValid():
+            return
+        issue = self.model.issue(index.row())
+        position = self.main_window.industry_position(issue.industry)
+        if position >= 0:
+            self.main_window.open_industry(position, issue.producer)